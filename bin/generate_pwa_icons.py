@@ -1,75 +1,168 @@
-"""Generate PNG icons + iOS splash images for the ColorFlow PWA.
+"""Generate PNG/WebP icons + iOS splash images for the ColorFlow PWA.
 
 Run from the repository root:
     pip install cairosvg
-    python bin/generate_pwa_icons.py
+    python bin/generate_pwa_icons.py [--force] [--jobs N] [--update-manifest]
 
 Outputs into colorflow/assets/icons/:
-    icon-180.png, icon-192.png, icon-512.png, icon-512-maskable.png
-    splash-750x1334.png, splash-1170x2532.png, splash-2048x2732.png
+    icon-180, icon-192, icon-512, icon-512-maskable            (.png + .webp)
+    splash-750x1334, splash-1170x2532, splash-2048x2732        (.png + .webp)
+    icons.json — "icons" entries in web app manifest format (+ "splash")
+
+The build is incremental: .icons-build.json records a hash of every target's
+inputs (the SVG it renders, its size, encoder settings and versions) and of
+the files written. A target is rendered again only if its inputs changed or
+its outputs are missing or were edited, so a rerun without changes only
+hashes a few files. Stale targets render in a process pool, largest first.
+--update-manifest copies the PNG/WebP icons into colorflow/manifest.json.
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
+import io
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
 
-import cairosvg
-
 ROOT = Path(__file__).resolve().parent.parent
 ICON_SVG = ROOT / "colorflow" / "assets" / "icons" / "icon.svg"
 OUT_DIR = ROOT / "colorflow" / "assets" / "icons"
+BUILD_MANIFEST = OUT_DIR / ".icons-build.json"
+ICONS_JSON = OUT_DIR / "icons.json"
+APP_MANIFEST = ROOT / "colorflow" / "manifest.json"
+# src in icons.json is relative to colorflow/, like in manifest.json.
+PUBLIC_PREFIX = "./assets/icons/"
+
+# Bump when the rendering code changes in a way hashes can't see.
+PIPELINE_VERSION = 2
+
+SVG_NS = "http://www.w3.org/2000/svg"
+ET.register_namespace("", SVG_NS)
 
 # (filename, pixel size). 512 is the canonical PWA size; 192 for older Android;
 # 180 for iOS apple-touch-icon.
 APP_ICON_SIZES = [180, 192, 512]
+# Sizes listed in the web app manifest; 180 is only for apple-touch-icon.
+MANIFEST_ICON_SIZES = {192, 512}
 
+SPLASH_SIZES = [
+    (750, 1334),    # iPhone SE/8
+    (1170, 2532),   # iPhone 12/13/14 Pro
+    (2048, 2732),   # iPad Pro 12.9"
+]
 
-def _read_icon_svg() -> str:
-    return ICON_SVG.read_text(encoding="utf-8")
+# Icons are small and flat: lossless WebP is smaller than the PNG anyway.
+# Splashes are mostly gradient, where lossy is far smaller and looks the same.
+ICON_WEBP = {"lossless": True, "method": 6}
+SPLASH_WEBP = {"quality": 90, "method": 6}
 
 
-def _write_png(svg_text: str, out_path: Path, w: int, h: int) -> None:
-    cairosvg.svg2png(
-        bytestring=svg_text.encode("utf-8"),
-        write_to=str(out_path),
-        output_width=w,
-        output_height=h,
-    )
-    print(f"  wrote {out_path.relative_to(ROOT)} ({w}x{h})")
+@dataclass(frozen=True)
+class SourceIcon:
+    """icon.svg, read and parsed once."""
+
+    text: str
+    body: str
+    width: float
+    height: float
+
+    @classmethod
+    def load(cls, path: Path) -> SourceIcon:
+        text = path.read_text(encoding="utf-8")
+        root = ET.fromstring(text)
+        if root.tag != f"{{{SVG_NS}}}svg":
+            raise SystemExit(f"{path}: root element is not <svg>")
+        view_box = root.get("viewBox")
+        if view_box:
+            _, _, width, height = (float(part) for part in view_box.replace(",", " ").split())
+        else:
+            width = float(root.get("width", "512").removesuffix("px"))
+            height = float(root.get("height", "512").removesuffix("px"))
+        # Children re-serialized as-is: no string surgery on the <svg> tag.
+        body = "\n".join(ET.tostring(child, encoding="unicode") for child in root)
+        return cls(text=text, body=body, width=width, height=height)
+
+    def placed(self, x: float, y: float, size: float) -> str:
+        """The icon scaled into a size x size square at (x, y)."""
+        scale = size / max(self.width, self.height)
+        return f'<g transform="translate({x},{y}) scale({scale})">\n{self.body}\n</g>'
+
+
+@dataclass(frozen=True)
+class Target:
+    name: str
+    width: int
+    height: int
+    svg: str
+    webp: dict
+    purpose: str = "any"
+    # Listed in the web app manifest (the rest are linked from index.html).
+    in_manifest: bool = False
+    splash: bool = False
 
+    @property
+    def pixels(self) -> int:
+        return self.width * self.height
 
-def make_app_icons() -> None:
-    svg = _read_icon_svg()
-    for size in APP_ICON_SIZES:
-        _write_png(svg, OUT_DIR / f"icon-{size}.png", size, size)
+    def input_hash(self, versions: str) -> str:
+        digest = hashlib.sha256()
+        for part in (
+            str(PIPELINE_VERSION),
+            versions,
+            f"{self.width}x{self.height}",
+            json.dumps(self.webp, sort_keys=True),
+            self.svg,
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
 
+    def outputs(self) -> dict[str, Path]:
+        return {ext: OUT_DIR / f"{self.name}.{ext}" for ext in ("png", "webp")}
 
-def make_maskable_icon() -> None:
+
+def app_icon(source: SourceIcon, size: int) -> Target:
+    return Target(
+        name=f"icon-{size}",
+        width=size,
+        height=size,
+        svg=source.text,
+        webp=ICON_WEBP,
+        in_manifest=size in MANIFEST_ICON_SIZES,
+    )
+
+
+def maskable_icon(source: SourceIcon) -> Target:
     """Maskable icons need ~10% safe-zone padding so the OS can crop to circle/squircle."""
-    icon_svg = _read_icon_svg()
-    # Strip the wrapping <svg ...> — we re-wrap with our own viewport + padding.
-    body = icon_svg.split("<svg", 1)[1].split(">", 1)[1].rsplit("</svg>", 1)[0]
     pad = 64  # of 512 viewBox
-    inner = 512 - 2 * pad
-    wrapper = f'''
-<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 512 512">
+    svg = f'''
+<svg xmlns="{SVG_NS}" viewBox="0 0 512 512">
   <rect width="512" height="512" fill="#6366f1"/>
-  <g transform="translate({pad},{pad}) scale({inner / 512})">
-    {body}
-  </g>
+  {source.placed(pad, pad, 512 - 2 * pad)}
 </svg>'''
-    out = OUT_DIR / "icon-512-maskable.png"
-    _write_png(wrapper, out, 512, 512)
+    return Target(
+        name="icon-512-maskable",
+        width=512,
+        height=512,
+        svg=svg,
+        webp=ICON_WEBP,
+        purpose="maskable",
+        in_manifest=True,
+    )
 
 
-def make_splash(width: int, height: int) -> None:
-    icon_svg = _read_icon_svg()
-    body = icon_svg.split("<svg", 1)[1].split(">", 1)[1].rsplit("</svg>", 1)[0]
+def splash(source: SourceIcon, width: int, height: int) -> Target:
     icon_size = min(width, height) * 0.32
     icon_x = (width - icon_size) / 2
     icon_y = (height - icon_size) / 2
-    splash_svg = f'''
-<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}">
+    svg = f'''
+<svg xmlns="{SVG_NS}" viewBox="0 0 {width} {height}">
   <defs>
     <linearGradient id="bg" x1="0" y1="0" x2="1" y2="1">
       <stop offset="0%" stop-color="#0e0e16"/>
@@ -77,33 +170,198 @@ def make_splash(width: int, height: int) -> None:
     </linearGradient>
   </defs>
   <rect width="{width}" height="{height}" fill="url(#bg)"/>
-  <g transform="translate({icon_x},{icon_y}) scale({icon_size / 512})">
-    {body}
-  </g>
+  {source.placed(icon_x, icon_y, icon_size)}
 </svg>'''
-    name = f"splash-{width}x{height}.png"
-    _write_png(splash_svg, OUT_DIR / name, width, height)
+    return Target(
+        name=f"splash-{width}x{height}",
+        width=width,
+        height=height,
+        svg=svg,
+        webp=SPLASH_WEBP,
+        splash=True,
+    )
 
 
-SPLASH_SIZES = [
-    (750, 1334),    # iPhone SE/8
-    (1170, 2532),   # iPhone 12/13/14 Pro
-    (2048, 2732),   # iPad Pro 12.9"
-]
+def build_targets(source: SourceIcon) -> list[Target]:
+    return [
+        *(app_icon(source, size) for size in APP_ICON_SIZES),
+        maskable_icon(source),
+        *(splash(source, w, h) for w, h in SPLASH_SIZES),
+    ]
+
+
+def renderer_versions() -> str:
+    import cairosvg
+    import PIL
+
+    return f"cairosvg {cairosvg.__version__}; pillow {PIL.__version__}"
+
+
+def file_hash(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def render(target: Target) -> tuple[str, dict[str, str], float]:
+    """Renders one target to PNG and WebP. Runs in a worker process."""
+    import cairosvg
+    from PIL import Image
+
+    started = time.perf_counter()
+    png = cairosvg.svg2png(
+        bytestring=target.svg.encode("utf-8"),
+        output_width=target.width,
+        output_height=target.height,
+    )
+    webp = io.BytesIO()
+    with Image.open(io.BytesIO(png)) as image:
+        image.save(webp, "WEBP", **target.webp)
+    outputs = target.outputs()
+    hashes = {}
+    for ext, data in (("png", png), ("webp", webp.getvalue())):
+        _write_atomic(outputs[ext], data)
+        hashes[ext] = hashlib.sha256(data).hexdigest()
+    return target.name, hashes, time.perf_counter() - started
+
+
+def load_build_manifest() -> dict:
+    try:
+        return json.loads(BUILD_MANIFEST.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def is_fresh(target: Target, input_hash: str, recorded: dict | None) -> bool:
+    if not recorded or recorded.get("input") != input_hash:
+        return False
+    return all(
+        file_hash(path) == recorded.get("outputs", {}).get(ext)
+        for ext, path in target.outputs().items()
+    )
+
+
+def icons_json(targets: list[Target]) -> dict:
+    """Entries for the "icons" array of manifest.json, PNG first."""
+
+    def entry(target: Target, ext: str) -> dict:
+        item = {
+            "src": f"{PUBLIC_PREFIX}{target.name}.{ext}",
+            "sizes": f"{target.width}x{target.height}",
+            "type": f"image/{ext}",
+        }
+        if not target.splash:
+            item["purpose"] = target.purpose
+        return item
+
+    return {
+        "icons": [
+            entry(target, ext)
+            for ext in ("png", "webp")
+            for target in targets
+            if target.in_manifest
+        ],
+        "splash": [
+            entry(target, ext)
+            for ext in ("png", "webp")
+            for target in targets
+            if target.splash
+        ],
+    }
+
+
+def _write_json(path: Path, data: dict) -> bool:
+    """Writes pretty JSON; False if the file already had this content."""
+    text = json.dumps(data, ensure_ascii=False, indent=2) + "\n"
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except FileNotFoundError:
+        pass
+    _write_atomic(path, text.encode("utf-8"))
+    return True
+
+
+def update_app_manifest(icons: list[dict]) -> bool:
+    """Replaces the raster icons in manifest.json, keeping the SVG ones."""
+    manifest = json.loads(APP_MANIFEST.read_text(encoding="utf-8"))
+    kept = [icon for icon in manifest.get("icons", []) if icon.get("type") == "image/svg+xml"]
+    manifest["icons"] = kept + icons
+    return _write_json(APP_MANIFEST, manifest)
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--force", action="store_true", help="re-render every target")
+    parser.add_argument(
+        "--jobs", type=int, default=os.cpu_count() or 1,
+        help="worker processes (default: all cores)",
+    )
+    parser.add_argument(
+        "--update-manifest", action="store_true",
+        help=f"write the icons into {APP_MANIFEST.relative_to(ROOT)}",
+    )
+    args = parser.parse_args()
+
     if not ICON_SVG.exists():
         raise SystemExit(f"missing {ICON_SVG}")
     OUT_DIR.mkdir(parents=True, exist_ok=True)
-    print("App icons:")
-    make_app_icons()
-    print("Maskable:")
-    make_maskable_icon()
-    print("iOS splash:")
-    for w, h in SPLASH_SIZES:
-        make_splash(w, h)
-    print("Done.")
+    started = time.perf_counter()
+
+    source = SourceIcon.load(ICON_SVG)
+    targets = build_targets(source)
+    versions = renderer_versions()
+    recorded = load_build_manifest().get("targets", {})
+    input_hashes = {target.name: target.input_hash(versions) for target in targets}
+    stale = [
+        target
+        for target in targets
+        if args.force or not is_fresh(target, input_hashes[target.name], recorded.get(target.name))
+    ]
+    # Largest first: the iPad splash alone takes as long as the rest together.
+    stale.sort(key=lambda target: target.pixels, reverse=True)
+
+    results = {}
+    if len(stale) == 1 or args.jobs <= 1:
+        for target in stale:
+            name, hashes, seconds = render(target)
+            results[name] = hashes
+            print(f"  wrote {name}.png/.webp ({seconds:.2f}s)")
+    elif stale:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(stale))) as pool:
+            futures = [pool.submit(render, target) for target in stale]
+            for future in as_completed(futures):
+                name, hashes, seconds = future.result()
+                results[name] = hashes
+                print(f"  wrote {name}.png/.webp ({seconds:.2f}s)")
+
+    build = {
+        "versions": versions,
+        "targets": {
+            target.name: {
+                "input": input_hashes[target.name],
+                "outputs": results.get(target.name) or recorded[target.name]["outputs"],
+            }
+            for target in targets
+        },
+    }
+    _write_json(BUILD_MANIFEST, build)
+    icons = icons_json(targets)
+    if _write_json(ICONS_JSON, icons):
+        print(f"  wrote {ICONS_JSON.relative_to(ROOT)}")
+    if args.update_manifest and update_app_manifest(icons["icons"]):
+        print(f"  updated {APP_MANIFEST.relative_to(ROOT)}")
+    print(
+        f"Done: {len(stale)} rendered, {len(targets) - len(stale)} up to date "
+        f"({time.perf_counter() - started:.2f}s)."
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,17 @@
+#!/usr/bin/env bash
+# Запуск под ASGI (uvicorn) с асинхронными представлениями заявок.
+# На Render: startCommand "./bin/start-asgi.sh" вместо gunicorn.
+set -o errexit
+
+cd "$(dirname "$0")/../corp_site"
+
+export TICKETS_ASYNC_VIEWS="${TICKETS_ASYNC_VIEWS:-True}"
+# Под ASGI постоянные соединения с базой не переиспользуются.
+export DB_CONN_MAX_AGE="${DB_CONN_MAX_AGE:-0}"
+
+exec uvicorn corp_site.asgi:application \
+  --host 0.0.0.0 \
+  --port "${PORT:-8000}" \
+  --workers "${WEB_CONCURRENCY:-1}" \
+  --proxy-headers \
+  --forwarded-allow-ips '*'
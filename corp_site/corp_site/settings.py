@@ -1,3 +1,4 @@
+import copy
 import os
 from pathlib import Path
 
@@ -55,13 +56,17 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'corp_site.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Сбрасывает выбор реплики между запросами, после записи — cookie.
+    'tickets.routers.ReplicaMiddleware',
+    # Последним: замеряет только представление и рендеринг (бюджеты, метрики).
+    'tickets.middleware.RequestProfileMiddleware',
 ]
 
 ROOT_URLCONF = 'corp_site.urls'
@@ -91,10 +96,73 @@ WSGI_APPLICATION = 'corp_site.wsgi.application'
 DATABASES = {
     'default': dj_database_url.config(
         default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
-        conn_max_age=600,
+        # Под ASGI постоянные соединения не переиспользуются между
+        # запросами и только копятся: bin/start-asgi.sh ставит 0.
+        conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', '600')),
     )
 }
 
+# Реплика только для чтения: DATABASE_REPLICA_URL. На неё уходят чтения
+# списка, страницы заявки, выгрузки и статистики (tickets/routers.py).
+# Без неё алиас replica — копия default: чтения на него не уходят
+# (TICKETS_DB_REPLICA пуст), а тесты получают вторую базу той же СУБД
+# (SQLite в памяти или test_<имя>_replica на Postgres) и включают
+# маршрутизацию сами.
+DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL', '')
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = dj_database_url.parse(
+        DATABASE_REPLICA_URL,
+        conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', '600')),
+    )
+else:
+    DATABASES['replica'] = copy.deepcopy(DATABASES['default'])
+if DATABASES['replica']['ENGINE'] != 'django.db.backends.sqlite3':
+    DATABASES['replica']['TEST'] = {'NAME': f"test_{DATABASES['default']['NAME']}_replica"}
+DATABASE_ROUTERS = ['tickets.routers.ReplicaRouter']
+
+# Пул соединений psycopg 3 (Postgres, пакет psycopg[pool]): каждый процесс
+# держит от DB_POOL_MIN_SIZE до DB_POOL_MAX_SIZE соединений на базу и ждёт
+# свободное не дольше DB_POOL_TIMEOUT секунд. Постоянные соединения Django
+# с пулом не совместимы, поэтому CONN_MAX_AGE становится 0. DB_POOL=False —
+# без пула, как раньше.
+DB_POOL = os.environ.get('DB_POOL', 'True').lower() in ('true', '1', 'yes')
+DB_POOL_OPTIONS = {
+    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '1')),
+    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+    # Простаивающие дольше соединения (сверх min_size) закрываются.
+    'max_idle': float(os.environ.get('DB_POOL_MAX_IDLE', '600')),
+}
+for database in DATABASES.values():
+    if DB_POOL and database['ENGINE'] == 'django.db.backends.postgresql':
+        database['CONN_MAX_AGE'] = 0
+        database.setdefault('OPTIONS', {})['pool'] = dict(DB_POOL_OPTIONS)
+
+
+# Кэш: CACHE_URL=redis://host:6379/0 — Redis (нужен пакет redis),
+# file:///путь — файловый кэш, по умолчанию — память процесса.
+CACHE_URL = os.environ.get('CACHE_URL', '')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+elif CACHE_URL.startswith('file://'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_URL.removeprefix('file://'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 
@@ -141,3 +209,93 @@ LOGOUT_REDIRECT_URL = 'ticket_list'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+
+# Tickets
+# Поиск по заявкам: auto выбирает tsvector на Postgres и FTS5 на SQLite,
+# icontains — прежний LIKE-поиск без индекса.
+TICKETS_SEARCH_BACKEND = os.environ.get('TICKETS_SEARCH_BACKEND', 'auto')
+
+# Пагинация списка заявок: offset — номера страниц, cursor — только
+# «назад/вперёд», зато без COUNT(*) и OFFSET на больших таблицах.
+TICKETS_LIST_PAGINATION = os.environ.get('TICKETS_LIST_PAGINATION', 'offset')
+
+# Число найденных заявок при текстовом поиске: на Postgres выше этого порога
+# показывается оценка планировщика («около N») вместо точного COUNT(*).
+TICKETS_COUNT_ESTIMATE_THRESHOLD = int(os.environ.get('TICKETS_COUNT_ESTIMATE_THRESHOLD', '1000'))
+
+# Сколько последних комментариев показывать на странице заявки сразу;
+# более ранние подгружаются по кнопке.
+TICKETS_COMMENTS_PAGE_SIZE = int(os.environ.get('TICKETS_COMMENTS_PAGE_SIZE', '20'))
+
+# Кэш отрендеренных фрагментов страниц заявок (строки таблицы, блок
+# комментариев). Инвалидируется версиями, которые поднимают сигналы.
+TICKETS_CACHE_ALIAS = os.environ.get('TICKETS_CACHE_ALIAS', 'default')
+TICKETS_FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('TICKETS_FRAGMENT_CACHE_TIMEOUT', '300'))
+
+# Бюджеты SQL-запросов представлений (tickets/budgets.py): warn — писать
+# превышения в лог, raise — бросать исключение, off — не замерять.
+# Тесты всегда запускаются в режиме raise (tickets.testing.BudgetTestRunner).
+TICKETS_QUERY_BUDGETS = os.environ.get('TICKETS_QUERY_BUDGETS', 'warn' if DEBUG else 'off')
+TEST_RUNNER = 'tickets.testing.BudgetTestRunner'
+
+# Гистограммы времени запросов по представлениям на /metrics/ (для staff
+# или с заголовком «Authorization: Bearer <TICKETS_METRICS_TOKEN>»).
+# Воркеры gunicorn сбрасывают свои счётчики в TICKETS_METRICS_DIR, и страница
+# метрик складывает их; без каталога видны только счётчики одного процесса.
+TICKETS_METRICS = os.environ.get('TICKETS_METRICS', 'True').lower() in ('true', '1', 'yes')
+TICKETS_METRICS_DIR = os.environ.get('TICKETS_METRICS_DIR', '')
+TICKETS_METRICS_FLUSH_SECONDS = float(os.environ.get('TICKETS_METRICS_FLUSH_SECONDS', '10'))
+TICKETS_METRICS_TOKEN = os.environ.get('TICKETS_METRICS_TOKEN', '')
+
+# Выборочный cProfile: после каждых TICKETS_PROFILE_EVERY запросов к
+# представлению дольше TICKETS_PROFILE_SLOW_MS следующий медленный запрос
+# сохраняется профилем в TICKETS_PROFILE_DIR. 0 — выключено.
+TICKETS_PROFILE_EVERY = int(os.environ.get('TICKETS_PROFILE_EVERY', '0'))
+TICKETS_PROFILE_SLOW_MS = float(os.environ.get('TICKETS_PROFILE_SLOW_MS', '500'))
+TICKETS_PROFILE_DIR = os.environ.get('TICKETS_PROFILE_DIR', str(BASE_DIR / 'profiles'))
+
+# Живые обновления (SSE) страниц заявок; работают только под ASGI.
+# local — события видят клиенты своего процесса, postgres — всех процессов
+# через LISTEN/NOTIFY.
+TICKETS_EVENTS_BACKEND = os.environ.get('TICKETS_EVENTS_BACKEND', 'local')
+# Очередь клиента: кто не успевает её разбирать, отключается.
+TICKETS_EVENTS_QUEUE_SIZE = int(os.environ.get('TICKETS_EVENTS_QUEUE_SIZE', '100'))
+TICKETS_EVENTS_HEARTBEAT = float(os.environ.get('TICKETS_EVENTS_HEARTBEAT', '15'))
+
+# Асинхронные представления списка, страницы заявки и комментариев
+# (tickets/async_views.py). Имеет смысл только под ASGI: bin/start-asgi.sh
+# включает настройку сам.
+TICKETS_ASYNC_VIEWS = os.environ.get('TICKETS_ASYNC_VIEWS', 'False').lower() in ('true', '1', 'yes')
+
+# Лента изменений /api/changes/ (tickets/sync.py). Отдаются только изменения
+# старше TICKETS_SYNC_SETTLE_SECONDS, чтобы незавершённые транзакции не
+# оказались позади курсора. Удаления хранятся TICKETS_SYNC_TOMBSTONE_DAYS
+# дней (команда prune_tombstones); более старый курсор получает 410.
+TICKETS_SYNC_SETTLE_SECONDS = float(os.environ.get('TICKETS_SYNC_SETTLE_SECONDS', '5'))
+TICKETS_SYNC_TOMBSTONE_DAYS = int(os.environ.get('TICKETS_SYNC_TOMBSTONE_DAYS', '90'))
+
+# Чтения с реплики (алиас базы; пусто — всё читается с default). После
+# запроса, который мог что-то записать, браузер TICKETS_DB_STICKY_SECONDS
+# секунд читает с default: реплика может отставать, а свои изменения
+# пользователь должен видеть сразу.
+TICKETS_DB_REPLICA = 'replica' if DATABASE_REPLICA_URL else ''
+TICKETS_DB_STICKY_SECONDS = float(os.environ.get('TICKETS_DB_STICKY_SECONDS', '10'))
+
+# Подсказки заголовков в поле поиска (/api/tickets/autocomplete/): сколько
+# миллисекунд ждать базу (дольше — пустой ответ) и сколько секунд ответ на
+# тот же текст живёт в кэше и у браузера.
+TICKETS_AUTOCOMPLETE_TIMEOUT_MS = float(os.environ.get('TICKETS_AUTOCOMPLETE_TIMEOUT_MS', '150'))
+TICKETS_AUTOCOMPLETE_CACHE_SECONDS = int(os.environ.get('TICKETS_AUTOCOMPLETE_CACHE_SECONDS', '30'))
+
+# Фоновые задачи (tickets/jobs.py, команда run_worker): число попыток,
+# пауза перед первым повтором в секундах (дальше удваивается до
+# TICKETS_JOBS_RETRY_MAX_DELAY), через сколько секунд задача молчащего
+# воркера возвращается в очередь и как часто свободный воркер её опрашивает.
+TICKETS_JOBS_MAX_ATTEMPTS = int(os.environ.get('TICKETS_JOBS_MAX_ATTEMPTS', '5'))
+TICKETS_JOBS_RETRY_DELAY = float(os.environ.get('TICKETS_JOBS_RETRY_DELAY', '10'))
+TICKETS_JOBS_RETRY_MAX_DELAY = float(os.environ.get('TICKETS_JOBS_RETRY_MAX_DELAY', '3600'))
+TICKETS_JOBS_LEASE_SECONDS = float(os.environ.get('TICKETS_JOBS_LEASE_SECONDS', '900'))
+TICKETS_JOBS_POLL_SECONDS = float(os.environ.get('TICKETS_JOBS_POLL_SECONDS', '1'))
+# «Ко всем найденным» больше чем для стольких заявок выполняется воркером, а
+# не в запросе.
+TICKETS_BULK_INLINE_LIMIT = int(os.environ.get('TICKETS_BULK_INLINE_LIMIT', '2000'))
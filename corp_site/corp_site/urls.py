@@ -20,9 +20,13 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import RedirectView
 
+from tickets.views import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("accounts/", include("django.contrib.auth.urls")),
     path("tickets/", include("tickets.urls")),
+    path("api/", include("tickets.api.urls")),
+    path("metrics/", metrics, name="metrics"),
     path("", RedirectView.as_view(url="tickets/")),
 ]
@@ -0,0 +1,55 @@
+"""Денормализованные comment_count и last_activity_at у заявок."""
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .cache import ALL_VERSION, invalidate
+from .models import Comment, Ticket
+
+
+def comment_count_subquery():
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(ticket=OuterRef("pk"))
+            .order_by()
+            .values("ticket")
+            .annotate(n=Count("pk"))
+            .values("n")
+        ),
+        0,
+    )
+
+
+def last_activity_subquery():
+    # Без комментариев последней активностью считается создание заявки.
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(ticket=OuterRef("pk"))
+            .order_by("-created_at")
+            .values("created_at")[:1]
+        ),
+        F("created_at"),
+    )
+
+
+def rebuild_activity(queryset=None, batch_size=5000):
+    """Пересчитывает поля пачками по диапазонам id; возвращает число заявок."""
+    queryset = Ticket.objects.all() if queryset is None else queryset
+    ids = queryset.order_by("pk").values_list("pk", flat=True)
+    updated = 0
+    last_pk = 0
+    while True:
+        batch = list(ids.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            # Число комментариев выводится в закэшированных фрагментах.
+            invalidate(ALL_VERSION, using=queryset.db)
+            return updated
+        with transaction.atomic(using=queryset.db):
+            updated += Ticket.objects.using(queryset.db).filter(
+                pk__gte=batch[0], pk__lte=batch[-1]
+            ).update(
+                comment_count=comment_count_subquery(),
+                last_activity_at=last_activity_subquery(),
+            )
+        last_pk = batch[-1]
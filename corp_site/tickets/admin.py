@@ -1,10 +1,70 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.db.models import Q
 
-from .models import Comment, Ticket
+from .counts import bucket_count
+from .filters import TicketFilters
+from .history import recorded_as
+from .jobs import retry_jobs
+from .models import Comment, Job, Ticket, TicketChange
+from .pagination import EstimatedCountPaginator
+from .search import IContainsSearchBackend, get_search_backend
+
+
+class FastChangeList(ChangeList):
+    def get_results(self, request):
+        # Только выборка для страницы: действия над выбранными объектами
+        # берут полный queryset из get_queryset.
+        if self.model_admin.list_columns:
+            self.queryset = self.queryset.only(*self.model_admin.list_columns)
+        super().get_results(request)
+
+
+class FastChangeListMixin:
+    """Список объектов в админке за постоянное число запросов.
+
+    Страница читает только колонки ``list_columns`` (pk добавляется сам),
+    число строк на больших выборках — оценка планировщика, а полное число
+    без фильтров (``show_full_result_count``) не считается COUNT(*) по всей
+    таблице.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_columns = ()
+
+    def get_changelist(self, request, **kwargs):
+        return FastChangeList
+
+
+class TicketChangeList(FastChangeList):
+    def get_results(self, request):
+        super().get_results(request)
+        # Всего заявок — сумма счётчиков TicketCounter, а не COUNT(*).
+        self.full_result_count = bucket_count(
+            TicketFilters(), using=self.root_queryset.db
+        )
+        self.show_full_result_count = True
+        self.show_admin_actions = bool(self.full_result_count)
+
+
+class TicketChangeInline(admin.TabularInline):
+    model = TicketChange
+    fields = ("changed_at", "source", "author", "changes")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    verbose_name_plural = "История"
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("author")
 
 
 @admin.register(Ticket)
-class TicketAdmin(admin.ModelAdmin):
+class TicketAdmin(FastChangeListMixin, admin.ModelAdmin):
     list_display = (
         "title",
         "status",
@@ -13,13 +73,83 @@ class TicketAdmin(admin.ModelAdmin):
         "created_at",
     )
     list_filter = ("status", "priority", "due_date", "created_at")
+    list_columns = list_display
     search_fields = ("title", "description")
+    # Сортировка (с добавленным админкой -pk) и фильтр по датам идут по
+    # ticket_created_idx.
     ordering = ("-created_at",)
+    date_hierarchy = "created_at"
+    inlines = [TicketChangeInline]
+
+    def get_changelist(self, request, **kwargs):
+        return TicketChangeList
+
+    def save_model(self, request, obj, form, change):
+        # changeform_view уже идёт в транзакции: запись истории попадёт в неё.
+        with recorded_as(TicketChange.Source.ADMIN, request.user):
+            super().save_model(request, obj, form, change)
+
+    def get_search_results(self, request, queryset, search_term):
+        # search_fields остаётся для icontains-бэкенда и чтобы админка
+        # показывала поле поиска; остальные бэкенды ищут по своему индексу.
+        backend = get_search_backend(queryset.db)
+        if not search_term or isinstance(backend, IContainsSearchBackend):
+            return super().get_search_results(request, queryset, search_term)
+        return backend.search(queryset, search_term, ranked=False), False
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FastChangeListMixin, admin.ModelAdmin):
     list_display = ("ticket", "author_name", "created_at")
+    list_select_related = ("ticket",)
+    list_columns = ("ticket__title", "author_name", "created_at")
     list_filter = ("created_at",)
     search_fields = ("author_name", "message", "ticket__title")
+    # По comment_created_idx.
     ordering = ("-created_at",)
+    date_hierarchy = "created_at"
+
+    def get_search_results(self, request, queryset, search_term):
+        # Заявки ищутся по индексу поиска заявок, а не JOIN с LIKE по
+        # заголовку каждой; с icontains-бэкендом — как раньше.
+        backend = get_search_backend(queryset.db)
+        if not search_term or isinstance(backend, IContainsSearchBackend):
+            return super().get_search_results(request, queryset, search_term)
+        tickets = backend.search(
+            Ticket.objects.using(queryset.db), search_term, ranked=False
+        ).values("pk")
+        matched = (
+            Q(author_name__icontains=search_term)
+            | Q(message__icontains=search_term)
+            | Q(ticket__in=tickets)
+        )
+        return queryset.filter(matched), False
+
+
+@admin.register(Job)
+class JobAdmin(FastChangeListMixin, admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_at", "created_at")
+    list_columns = list_display
+    list_filter = ("status", "name")
+    readonly_fields = (
+        "name",
+        "payload",
+        "status",
+        "attempts",
+        "max_attempts",
+        "run_at",
+        "locked_by",
+        "locked_at",
+        "last_error",
+        "created_at",
+    )
+    ordering = ("-id",)
+    actions = ["retry"]
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Перезапустить выбранные задачи")
+    def retry(self, request, queryset):
+        count = retry_jobs(queryset.exclude(status=Job.Status.RUNNING))
+        self.message_user(request, f"Возвращено в очередь: {count}.")
@@ -0,0 +1,5 @@
+"""JSON API только для чтения: список, пакетная выборка и комментарии.
+
+Ответы собираются из ``.values()`` без создания моделей; набор полей
+задаётся параметром ``fields``.
+"""
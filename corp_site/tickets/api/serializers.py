@@ -0,0 +1,70 @@
+"""Выбор полей для ответов API."""
+
+TICKET_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "due_date",
+    "created_at",
+    "updated_at",
+    "comment_count",
+    "last_activity_at",
+)
+TICKET_DEFAULT_FIELDS = (
+    "id",
+    "title",
+    "status",
+    "priority",
+    "due_date",
+    "created_at",
+    "comment_count",
+)
+
+COMMENT_FIELDS = ("id", "ticket", "author_name", "message", "created_at")
+COMMENT_DEFAULT_FIELDS = ("id", "author_name", "message", "created_at")
+
+HISTORY_FIELDS = ("id", "changed_at", "source", "author", "changes")
+
+
+class FieldSelectionError(ValueError):
+    pass
+
+
+def parse_fields(raw, allowed, default):
+    """``?fields=id,title`` → список полей; без параметра — ``default``."""
+    if not raw:
+        return list(default)
+    fields = []
+    for name in raw.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in allowed:
+            raise FieldSelectionError(f"Неизвестное поле: {name}.")
+        if name not in fields:
+            fields.append(name)
+    return fields or list(default)
+
+
+class Selection:
+    """``.values()`` с полями ответа и служебными полями курсора.
+
+    Служебные поля, которых не просили, удаляются из строк перед ответом.
+    """
+
+    def __init__(self, fields, required=()):
+        self.fields = fields
+        self.hidden = [name for name in required if name not in fields]
+
+    def apply(self, queryset):
+        return queryset.values(*self.fields, *self.hidden)
+
+    def serialize(self, rows):
+        rows = list(rows)
+        if self.hidden:
+            for row in rows:
+                for name in self.hidden:
+                    del row[name]
+        return rows
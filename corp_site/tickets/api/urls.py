@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import views
+
+urlpatterns = [
+    path('tickets/', views.ticket_list, name='api_ticket_list'),
+    path('tickets/batch/', views.ticket_batch, name='api_ticket_batch'),
+    path('tickets/autocomplete/', views.ticket_autocomplete, name='api_ticket_autocomplete'),
+    path('tickets/<int:pk>/comments/', views.ticket_comments, name='api_ticket_comments'),
+    path('tickets/<int:pk>/history/', views.ticket_history, name='api_ticket_history'),
+    path('changes/', views.ticket_changes, name='api_ticket_changes'),
+]
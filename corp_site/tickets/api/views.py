@@ -0,0 +1,237 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils.cache import add_never_cache_headers, patch_cache_control
+from django.utils.http import urlencode
+from django.views.decorators.http import require_GET
+
+from ..autocomplete import suggest
+from ..counts import count_tickets
+from ..filters import TicketFilters
+from ..history import timeline
+from ..models import Comment, Ticket
+from ..pagination import CursorPaginator, decode_cursor
+from ..sync import CursorExpired, changes, is_changes_cursor
+from .serializers import (
+    COMMENT_DEFAULT_FIELDS,
+    COMMENT_FIELDS,
+    HISTORY_FIELDS,
+    TICKET_DEFAULT_FIELDS,
+    TICKET_FIELDS,
+    FieldSelectionError,
+    Selection,
+    parse_fields,
+)
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BATCH_IDS = 100
+AUTOCOMPLETE_SIZE = 10
+MAX_AUTOCOMPLETE_SIZE = 20
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def api_view(view):
+    """GET-only и ошибки ApiError → JSON с кодом ответа."""
+
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as exc:
+            return JsonResponse({"error": str(exc)}, status=exc.status)
+
+    return wrapper
+
+
+def get_fields(request, allowed, default):
+    try:
+        return parse_fields(request.GET.get("fields"), allowed, default)
+    except FieldSelectionError as exc:
+        raise ApiError(str(exc)) from exc
+
+
+def get_limit(request, default=PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    raw = request.GET.get("limit", "")
+    if not raw:
+        return default
+    if not raw.isdigit() or not 1 <= int(raw) <= maximum:
+        raise ApiError(f"limit — число от 1 до {maximum}.")
+    return int(raw)
+
+
+def get_cursor(request):
+    token = request.GET.get("cursor")
+    cursor = decode_cursor(token)
+    if token and cursor is None:
+        raise ApiError("Некорректный курсор.")
+    return cursor
+
+
+def page_url(request, token):
+    """Ссылка на соседнюю страницу: курсор плюс поля и размер страницы.
+
+    Фильтры повторять не нужно — они сохранены в курсоре.
+    """
+    if token is None:
+        return None
+    params = {key: request.GET[key] for key in ("fields", "limit") if key in request.GET}
+    params["cursor"] = token
+    return f"{request.path}?{urlencode(params)}"
+
+
+def page_payload(request, page, selection):
+    return {
+        "results": selection.serialize(page.object_list),
+        "next": page_url(request, page.next_token),
+        "previous": page_url(request, page.previous_token),
+    }
+
+
+@api_view
+def ticket_list(request):
+    """Заявки с фильтрами q, status, priority и sort, как у HTML-списка."""
+    fields = get_fields(request, TICKET_FIELDS, TICKET_DEFAULT_FIELDS)
+    limit = get_limit(request)
+    cursor = get_cursor(request)
+    filters = TicketFilters.from_params(cursor.params if cursor else request.GET)
+    queryset = filters.apply(Ticket.objects.all(), ranked=False)
+    selection = Selection(fields, required=("id", filters.sort_key))
+    paginator = CursorPaginator(
+        selection.apply(queryset),
+        limit,
+        key=filters.sort_key,
+        params=filters.as_params(),
+    )
+    payload = page_payload(request, paginator.page(cursor), selection)
+    if cursor is None:
+        # Число считается только для первой страницы — дальше оно не нужно.
+        count = count_tickets(queryset, filters)
+        payload["count"] = {"value": count.value, "estimated": count.estimated}
+    return JsonResponse(payload)
+
+
+@api_view
+def ticket_batch(request):
+    """Заявки по списку ``?ids=1,2,3`` одним запросом, в порядке ids."""
+    fields = get_fields(request, TICKET_FIELDS, TICKET_DEFAULT_FIELDS)
+    raw = [value.strip() for value in request.GET.get("ids", "").split(",")]
+    if not all(value.isdigit() for value in raw if value):
+        raise ApiError("ids — список id через запятую.")
+    ids = list(dict.fromkeys(int(value) for value in raw if value))
+    if not ids:
+        raise ApiError("Не указаны ids.")
+    if len(ids) > MAX_BATCH_IDS:
+        raise ApiError(f"Не больше {MAX_BATCH_IDS} ids за запрос.")
+    selection = Selection(fields, required=("id",))
+    rows = {
+        row["id"]: row
+        for row in selection.apply(Ticket.objects.filter(pk__in=ids).order_by())
+    }
+    return JsonResponse(
+        {
+            "results": selection.serialize(rows[pk] for pk in ids if pk in rows),
+            "missing": [pk for pk in ids if pk not in rows],
+        }
+    )
+
+
+@api_view
+def ticket_autocomplete(request):
+    """Заявки, чей заголовок похож на ``q``, — подсказки для поля поиска.
+
+    ``q`` возвращается в ответе: клиент отбрасывает ответы на уже
+    устаревший ввод. Браузер держит ответ в кэше столько же, сколько сервер,
+    поэтому стирание и повторный набор того же текста не идут на сервер.
+    """
+    query = request.GET.get("q", "")
+    limit = get_limit(request, default=AUTOCOMPLETE_SIZE, maximum=MAX_AUTOCOMPLETE_SIZE)
+    suggestions = suggest(query, limit)
+    response = JsonResponse(
+        {"q": query, "results": suggestions.results, "timed_out": suggestions.timed_out}
+    )
+    if suggestions.timed_out:
+        add_never_cache_headers(response)
+    else:
+        patch_cache_control(
+            response, private=True, max_age=settings.TICKETS_AUTOCOMPLETE_CACHE_SECONDS
+        )
+    return response
+
+
+@api_view
+def ticket_comments(request, pk):
+    """Комментарии заявки от новых к старым."""
+    fields = get_fields(request, COMMENT_FIELDS, COMMENT_DEFAULT_FIELDS)
+    limit = get_limit(request)
+    cursor = get_cursor(request)
+    if cursor is not None and cursor.params.get("ticket") != pk:
+        raise ApiError("Некорректный курсор.")
+    if cursor is None and not Ticket.objects.filter(pk=pk).exists():
+        raise ApiError("Заявка не найдена.", status=404)
+    selection = Selection(fields, required=("id", "created_at"))
+    paginator = CursorPaginator(
+        selection.apply(Comment.objects.filter(ticket_id=pk)),
+        limit,
+        params={"ticket": pk},
+    )
+    return JsonResponse(page_payload(request, paginator.page(cursor), selection))
+
+
+@api_view
+def ticket_history(request, pk):
+    """История заявки от новых изменений к старым: {поле: [было, стало]}."""
+    fields = get_fields(request, HISTORY_FIELDS, HISTORY_FIELDS)
+    limit = get_limit(request)
+    cursor = get_cursor(request)
+    if cursor is not None and cursor.params.get("history") != pk:
+        raise ApiError("Некорректный курсор.")
+    if cursor is None and not Ticket.objects.filter(pk=pk).exists():
+        raise ApiError("Заявка не найдена.", status=404)
+    selection = Selection(fields, required=("id", "changed_at"))
+    paginator = CursorPaginator(
+        selection.apply(timeline(pk)), limit, key="changed_at", params={"history": pk}
+    )
+    return JsonResponse(page_payload(request, paginator.page(cursor), selection))
+
+
+@api_view
+def ticket_changes(request):
+    """Изменения после курсора ``?since=``: заявки, комментарии, удаления.
+
+    Без ``since`` лента начинается с самой первой заявки. Пока ``has_more``,
+    клиент сразу запрашивает ``next``; потом сохраняет ``cursor`` и
+    опрашивает ленту с ним.
+    """
+    fields = get_fields(request, TICKET_FIELDS, TICKET_FIELDS)
+    limit = get_limit(request)
+    token = request.GET.get("since")
+    cursor = decode_cursor(token)
+    if token and (cursor is None or not is_changes_cursor(cursor)):
+        raise ApiError("Некорректный курсор.")
+    selection = Selection(fields, required=("id", "updated_at"))
+    try:
+        page = changes(cursor, selection, COMMENT_FIELDS, limit)
+    except CursorExpired:
+        raise ApiError(
+            "Курсор устарел: начните синхронизацию заново без since.", status=410
+        ) from None
+    params = {key: request.GET[key] for key in ("fields", "limit") if key in request.GET}
+    params["since"] = page.cursor
+    return JsonResponse(
+        {
+            "tickets": page.tickets,
+            "comments": page.comments,
+            "deleted": {"tickets": page.deleted_tickets, "comments": page.deleted_comments},
+            "cursor": page.cursor,
+            "has_more": page.has_more,
+            "next": f"{request.path}?{urlencode(params)}" if page.has_more else None,
+        }
+    )
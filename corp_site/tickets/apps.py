@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
 
 class TicketsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tickets'
 
+    def ready(self):
+        from . import signals, tasks  # noqa: F401
+        from .instrumentation import install_recorder
+        from .search import install_search_index
+
+        post_migrate.connect(install_search_index, sender=self)
+        connection_created.connect(install_recorder)
@@ -0,0 +1,137 @@
+"""Асинхронные варианты списка, страницы заявки и комментариев.
+
+Данные читаются через async ORM (aget, acount, асинхронная итерация), и
+ожидание базы не занимает поток воркера. Шаблоны те же: TemplateResponse
+Django рендерит уже после представления, поэтому кэш фрагментов работает
+как в синхронных представлениях — только строки страницы читаются всегда,
+даже если фрагмент найдётся в кэше.
+
+Включаются настройкой ``TICKETS_ASYNC_VIEWS`` и имеют смысл под ASGI
+(``bin/start-asgi.sh``); под WSGI каждое такое представление выполняется
+в собственном event loop и работает медленнее синхронного.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.db import transaction
+from django.http import Http404
+from django.shortcuts import redirect, render
+from django.utils.cache import add_never_cache_headers
+
+from .conditional import add_validators, has_pending_messages, not_modified
+from .counts import abucket_rows, acount_tickets
+from .forms import CommentForm
+from .models import Ticket
+from .pagination import decode_cursor
+from .views import TicketDetailView, TicketListView, acomments_context
+
+
+async def load_user(request):
+    """Пользователь запроса через async ORM.
+
+    Ленивый ``request.user`` обратился бы к базе синхронно — в async-коде
+    это ошибка. Заодно загружается сессия: после этого сообщения (messages)
+    и CSRF читаются без запросов.
+    """
+    # Синхронный middleware (под WSGI) мог уже загрузить пользователя.
+    user = getattr(request, "_cached_user", None)
+    if user is None:
+        user = await request.auser()
+    request.user = user
+    return user
+
+
+async def aget_ticket(pk):
+    try:
+        return await Ticket.objects.aget(pk=pk)
+    except Ticket.DoesNotExist:
+        raise Http404("Заявка не найдена.") from None
+
+
+async def conditional_render(request, view, load_page):
+    """ConditionalGetMixin.get для async-представлений.
+
+    ``load_page`` читает данные страницы; для ответа 304 он не вызывается.
+    """
+    if has_pending_messages(request):
+        await load_page()
+        response = view.render_to_response(view.get_context_data())
+        add_never_cache_headers(response)
+        return response
+    data_version, last_modified = view.get_data_version()
+    response = not_modified(request, data_version, last_modified)
+    if response is None:
+        await load_page()
+        response = view.render_to_response(view.get_context_data())
+    return add_validators(request, response, data_version, last_modified)
+
+
+class AsyncTicketListView(TicketListView):
+    async def get(self, request, *args, **kwargs):
+        await load_user(request)
+        # cached_property синхронного представления заполняются заранее.
+        self.buckets = await abucket_rows(self.filters)
+        self.object_list = self.get_queryset()
+        return await conditional_render(request, self, self.load_page)
+
+    async def load_page(self):
+        if self.get_pagination_mode() == "cursor":
+            self.cursor_page = await self.get_cursor_paginator().apage(self.cursor)
+            return
+        self.result_count = await acount_tickets(
+            self.object_list, self.filters, rows=self.buckets
+        )
+        # Число строк уже известно: Paginator только строит срез.
+        paginator, page, rows, is_paginated = self.get_offset_page()
+        page.object_list = [ticket async for ticket in rows]
+        self.offset_page = (paginator, page, page.object_list, is_paginated)
+
+
+class AsyncTicketDetailView(TicketDetailView):
+    async def get(self, request, *args, **kwargs):
+        await load_user(request)
+        self.object = self._object = await aget_ticket(self.kwargs["pk"])
+        return await conditional_render(request, self, self.load_page)
+
+    async def load_page(self):
+        self.comments = await acomments_context(self.object.pk)
+
+    def get_comments_context(self):
+        return self.comments
+
+
+async def ticket_comments(request, pk):
+    """HTML-фрагмент с комментариями, более ранними, чем курсор ``before``."""
+    cursor = decode_cursor(request.GET.get("before"))
+    if cursor is None or cursor.params.get("ticket") != pk:
+        raise Http404("Некорректный курсор комментариев.")
+    return render(request, "tickets/_comments.html", await acomments_context(pk, cursor))
+
+
+def _save_comment(comment):
+    # Сигнал увеличивает comment_count через F() в той же транзакции.
+    with transaction.atomic():
+        comment.save()
+
+
+async def add_comment(request, pk):
+    await load_user(request)
+    ticket = await aget_ticket(pk)
+    if request.method != "POST":
+        return redirect("ticket_detail", pk=ticket.pk)
+
+    form = CommentForm(request.POST)
+    if form.is_valid():
+        comment = form.save(commit=False)
+        comment.ticket = ticket
+        # atomic() и сигналы синхронные — сохраняем в потоке.
+        await sync_to_async(_save_comment)(comment)
+        messages.success(request, "Комментарий добавлен.")
+        return redirect("ticket_detail", pk=ticket.pk)
+
+    context = {
+        "ticket": ticket,
+        "comment_form": form,
+        **(await acomments_context(ticket.pk)),
+    }
+    return render(request, "tickets/ticket_detail.html", context)
@@ -0,0 +1,171 @@
+"""Подсказки заголовков заявок для поля поиска.
+
+Ответ — до ``limit`` заявок (id и заголовок), похожих на введённый текст,
+одним запросом по индексу:
+
+* Postgres — триграммы pg_trgm по GIN-индексу ``ticket_title_trgm_idx``:
+  находятся подстроки и слова с опечатками; выше — заголовки, которые
+  начинаются с запроса, затем по word_similarity;
+* SQLite — префиксы слов заголовка по FTS5-таблице поиска (у неё есть
+  префиксный индекс), по bm25;
+* остальные базы — ``istartswith``.
+
+Запрос ограничен по времени (``TICKETS_AUTOCOMPLETE_TIMEOUT_MS``): база
+отменяет его, и подсказок нет — пользователь всё равно печатает дальше.
+Ответы держатся в кэше ``TICKETS_AUTOCOMPLETE_CACHE_SECONDS`` секунд под
+версией заголовков (новые, удалённые и переименованные заявки), а не
+списка: комментарии и смена статуса кэш не сбрасывают, и популярные
+префиксы не доходят до базы.
+"""
+
+import hashlib
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+from .cache import ALL_VERSION, TITLES_VERSION, current_versions, get_cache
+from .models import Ticket
+from .search import SQLiteFTSSearchBackend
+
+MIN_LENGTH = 2
+MAX_LENGTH = 100
+# Порог word_similarity для опечаток; по умолчанию в pg_trgm 0.6 — строже,
+# чем нужно для недопечатанного слова.
+TRIGRAM_THRESHOLD = 0.4
+# Через сколько инструкций VM SQLite проверять дедлайн.
+SQLITE_PROGRESS_STEP = 1000
+
+
+@dataclass
+class Suggestions:
+    # [{"id": ..., "title": ...}] от лучшего совпадения.
+    results: list = field(default_factory=list)
+    timed_out: bool = False
+
+
+def normalize(query):
+    return " ".join(str(query).split()).lower()[:MAX_LENGTH]
+
+
+def _like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@contextmanager
+def time_limit(connection, milliseconds):
+    """Отменяет запросы внутри блока, если они идут дольше ``milliseconds``.
+
+    Postgres — statement_timeout на транзакцию (заодно порог триграмм),
+    SQLite — progress handler, который прерывает запрос после дедлайна.
+    """
+    if connection.vendor == "postgresql":
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT set_config('statement_timeout', %s, true), "
+                    "set_config('pg_trgm.word_similarity_threshold', %s, true)",
+                    [str(int(milliseconds)), str(TRIGRAM_THRESHOLD)],
+                )
+            yield
+    elif connection.vendor == "sqlite":
+        deadline = time.perf_counter() + milliseconds / 1000
+        connection.ensure_connection()
+        connection.connection.set_progress_handler(
+            lambda: time.perf_counter() > deadline, SQLITE_PROGRESS_STEP
+        )
+        try:
+            yield
+        finally:
+            connection.connection.set_progress_handler(None, 0)
+    else:
+        yield
+
+
+def _postgres_rows(query, limit, using):
+    title = f'"{Ticket._meta.db_table}"."title"'
+    return list(
+        Ticket.objects.using(using)
+        .filter(
+            RawSQL(
+                f"({title} ILIKE %s OR %s <%% {title})",
+                [f"%{_like(query)}%", query],
+                output_field=BooleanField(),
+            )
+        )
+        .annotate(
+            is_prefix=RawSQL(f"{title} ILIKE %s", [f"{_like(query)}%"], BooleanField()),
+            similarity=RawSQL(f"word_similarity(%s, {title})", [query], FloatField()),
+        )
+        .order_by("-is_prefix", "-similarity", "-id")
+        .values_list("id", "title")[:limit]
+    )
+
+
+def _sqlite_rows(query, limit, using):
+    match = SQLiteFTSSearchBackend.build_match(query, column="title")
+    if not match:
+        return []
+    table = SQLiteFTSSearchBackend.table
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"SELECT t.id, t.title FROM {table} "
+            f"JOIN {Ticket._meta.db_table} AS t ON t.id = {table}.rowid "
+            f"WHERE {table} MATCH %s ORDER BY {table}.rank, t.id DESC LIMIT %s",
+            [match, limit],
+        )
+        return cursor.fetchall()
+
+
+def _prefix_rows(query, limit, using):
+    return list(
+        Ticket.objects.using(using)
+        .filter(title__istartswith=query)
+        .order_by("-id")
+        .values_list("id", "title")[:limit]
+    )
+
+
+ROWS = {
+    "postgresql": _postgres_rows,
+    "sqlite": _sqlite_rows,
+}
+
+
+def find_titles(query, limit, using=DEFAULT_DB_ALIAS):
+    """Подсказки без кэша; запрос уже нормализован."""
+    connection = connections[using]
+    rows = ROWS.get(connection.vendor, _prefix_rows)
+    started = time.perf_counter()
+    budget = settings.TICKETS_AUTOCOMPLETE_TIMEOUT_MS
+    try:
+        with time_limit(connection, budget):
+            found = rows(query, limit, using)
+    except OperationalError:
+        # Отмена по таймауту приходит как OperationalError; остальные
+        # ошибки базы не прячем.
+        if (time.perf_counter() - started) * 1000 < budget:
+            raise
+        return Suggestions(timed_out=True)
+    return Suggestions([{"id": pk, "title": title} for pk, title in found])
+
+
+def suggest(query, limit=10, using=DEFAULT_DB_ALIAS):
+    query = normalize(query)
+    if len(query) < MIN_LENGTH:
+        return Suggestions()
+    cache = get_cache()
+    versions = ".".join(str(v) for v in current_versions(ALL_VERSION, TITLES_VERSION))
+    digest = hashlib.md5(query.encode(), usedforsecurity=False).hexdigest()
+    key = f"tickets:autocomplete:{versions}:{limit}:{digest}"
+    results = cache.get(key)
+    if results is not None:
+        return Suggestions(results)
+    suggestions = find_titles(query, limit, using)
+    if not suggestions.timed_out:
+        cache.set(key, suggestions.results, settings.TICKETS_AUTOCOMPLETE_CACHE_SECONDS)
+    return suggestions
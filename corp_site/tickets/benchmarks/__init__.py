@@ -0,0 +1,71 @@
+"""Бенчмарки приложения tickets.
+
+Запуск: ``python manage.py bench <набор>``. Каждый набор работает на
+одноразовой тестовой базе и возвращает список замеров, пригодный для JSON.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+SUITES = {
+    "api": "tickets.benchmarks.api",
+    "autocomplete": "tickets.benchmarks.autocomplete",
+    "export": "tickets.benchmarks.export",
+    "jobs": "tickets.benchmarks.jobs",
+    "search": "tickets.benchmarks.search",
+    "servers": "tickets.benchmarks.servers",
+    "views": "tickets.benchmarks.views",
+}
+
+# Измеряемые величины; остальные поля строки результата описывают случай
+# (набор, размер базы, фильтры...) и служат ключом при сравнении прогонов.
+METRIC_KEYS = {
+    "n", "min_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "mean_ms",
+    "queries", "bytes", "rows", "matches", "chars", "seconds",
+    "rows_per_second", "peak_kib", "rps", "errors",
+}
+
+
+def percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return None
+    index = max(0, math.ceil(pct / 100 * len(sorted_samples)) - 1)
+    return sorted_samples[index]
+
+
+def summarize(samples):
+    """Сводка по замерам в миллисекундах."""
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+    }
+
+
+def measure(func, repeat=20, warmup=2):
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+@contextmanager
+def client_environment():
+    """Окружение для django.test.Client вне тестов (ALLOWED_HOSTS и т.п.)."""
+    setup_test_environment()
+    try:
+        yield
+    finally:
+        teardown_test_environment()
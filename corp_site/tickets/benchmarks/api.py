@@ -0,0 +1,60 @@
+"""JSON API против разбора HTML-списка для одной и той же страницы."""
+
+import json
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from . import client_environment, measure
+from .data import ensure_tickets
+
+DEFAULT_SIZES = [1000, 10000]
+PAGE_SIZE = 10
+FIELDS = "id,title,status,priority,due_date,comment_count"
+
+# Так дашборды доставали заявки из HTML: ссылка на заявку и заголовок.
+ROW_RE = re.compile(r'<a href="/tickets/(\d+)/">([^<]*)</a>')
+
+
+def scrape_html(client, params):
+    # Фрагментный кэш сбрасывается, чтобы мерить рендер, а не попадание.
+    cache.clear()
+    response = client.get(reverse("ticket_list"), params)
+    return ROW_RE.findall(response.content.decode()), len(response.content)
+
+
+def fetch_api(client, params):
+    response = client.get(
+        reverse("api_ticket_list"), {**params, "fields": FIELDS, "limit": PAGE_SIZE}
+    )
+    return json.loads(response.content)["results"], len(response.content)
+
+
+def run(sizes, repeat, seed):
+    with client_environment():
+        return _run(sizes, repeat, seed)
+
+
+def _run(sizes, repeat, seed):
+    client = Client()
+    results = []
+    for size in sizes:
+        ensure_tickets(size, seed=seed)
+        for label, params in [("all", {}), ("status", {"status": "new"})]:
+            for client_name, fetch in [("html", scrape_html), ("api", fetch_api)]:
+                rows, size_bytes = fetch(client, params)
+                stats = measure(lambda: fetch(client, params), repeat=repeat)
+                stats.update(
+                    suite="api",
+                    vendor=connection.vendor,
+                    size=size,
+                    filters=label,
+                    client=client_name,
+                    rows=len(rows),
+                    bytes=size_bytes,
+                )
+                results.append(stats)
+    return results
@@ -0,0 +1,37 @@
+"""Подсказки заголовков: задержка одного ответа без кэша на больших базах.
+
+Префиксы — как при наборе по буквам, плюс опечатки (на Postgres их ловят
+триграммы) и текст, которого нет ни в одном заголовке.
+"""
+
+from django.db import connection
+
+from tickets.autocomplete import find_titles, normalize
+
+from . import measure
+from .data import ensure_tickets
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+QUERIES = ["пр", "при", "принт", "принтер не", "сервер", "сревер", "vpn", "несуществующее"]
+LIMIT = 10
+
+
+def run(sizes, repeat, seed):
+    results = []
+    for size in sizes:
+        ensure_tickets(size, seed=seed)
+        for query in QUERIES:
+            query = normalize(query)
+            # find_titles — мимо кэша: мерится запрос к базе.
+            found = find_titles(query, LIMIT)
+            stats = measure(lambda: find_titles(query, LIMIT), repeat=repeat)
+            stats.update(
+                suite="autocomplete",
+                vendor=connection.vendor,
+                size=size,
+                query=query,
+                rows=len(found.results),
+                timed_out=found.timed_out,
+            )
+            results.append(stats)
+    return results
@@ -0,0 +1,129 @@
+"""Синтетические заявки для бенчмарков и нагрузочных проверок.
+
+Данные детерминированы: одинаковые ``count`` и ``seed`` дают одинаковые
+строки, поэтому результаты двух прогонов можно сравнивать. Распределения
+приближены к боевой базе: большинство заявок закрыто, у части есть срок,
+число комментариев — с длинным хвостом (у многих ни одного, у единиц —
+сотни).
+"""
+
+import random
+from datetime import UTC, datetime, timedelta
+
+from tickets.counts import rebuild_counters
+from tickets.importer import keep_timestamps
+from tickets.models import Comment, Ticket
+from tickets.stats import rebuild_stats
+
+SUBJECTS = [
+    "принтер", "сеть", "почта", "VPN", "ноутбук", "монитор", "пароль",
+    "доступ", "сервер", "телефон", "сканер", "проектор", "1С", "Wi-Fi",
+]
+PROBLEMS = [
+    "не работает", "ошибка при запуске", "медленно работает", "нет доступа",
+    "нужна замена", "не подключается", "требуется настройка", "сбой обновления",
+]
+FILLER = [
+    "на втором этаже", "в переговорной", "после обновления", "с утра",
+    "у всего отдела", "периодически", "при входе в систему", "после перезагрузки",
+    "сотрудник просит помочь", "срочно нужно к совещанию", "повторяется каждый день",
+]
+AUTHORS = [
+    "Иван Петров", "Анна Смирнова", "Дежурный инженер", "Ольга Кузнецова",
+    "Сергей Иванов", "Мария Соколова", "Служба поддержки", "Алексей Попов",
+]
+REPLIES = [
+    "Приняли в работу.", "Уточните, пожалуйста, номер кабинета.",
+    "Проблема воспроизводится.", "Перезагрузили, проверьте ещё раз.",
+    "Ждём запчасть от поставщика.", "Передали администратору сети.",
+    "У меня всё ещё не работает.", "Спасибо, заработало!",
+    "Обновили драйвер.", "Нужен доступ к компьютеру, когда будете на месте?",
+]
+
+STATUS_WEIGHTS = {
+    Ticket.Status.NEW: 20,
+    Ticket.Status.IN_PROGRESS: 25,
+    Ticket.Status.DONE: 55,
+}
+PRIORITY_WEIGHTS = {
+    Ticket.Priority.LOW: 30,
+    Ticket.Priority.MEDIUM: 50,
+    Ticket.Priority.HIGH: 20,
+}
+DUE_DATE_SHARE = 0.4
+MAX_COMMENTS = 200
+
+# Заявка № i создана через ~i × STEP после START: id и created_at растут
+# вместе, как в настоящей базе, а 1M заявок укладываются примерно в год.
+START = datetime(2025, 1, 1, tzinfo=UTC)
+STEP = timedelta(seconds=30)
+
+
+def comment_total(rng):
+    """Длинный хвост: у двух третей заявок комментариев нет."""
+    return min(int(rng.paretovariate(1.6)) - 1, MAX_COMMENTS)
+
+
+def make_ticket(rng, index):
+    created_at = START + index * STEP + timedelta(seconds=rng.randint(0, 29))
+    due_date = None
+    if rng.random() < DUE_DATE_SHARE:
+        due_date = (created_at + timedelta(days=rng.randint(1, 30))).date()
+    ticket = Ticket(
+        title=f"{rng.choice(SUBJECTS).capitalize()}: {rng.choice(PROBLEMS)}",
+        description=" ".join(
+            f"{rng.choice(SUBJECTS)} {rng.choice(PROBLEMS)} {rng.choice(FILLER)}."
+            for _ in range(rng.randint(1, 8))
+        ),
+        status=rng.choices(list(STATUS_WEIGHTS), weights=STATUS_WEIGHTS.values())[0],
+        priority=rng.choices(list(PRIORITY_WEIGHTS), weights=PRIORITY_WEIGHTS.values())[0],
+        due_date=due_date,
+        created_at=created_at,
+        updated_at=created_at,
+        last_activity_at=created_at,
+    )
+    if ticket.status == Ticket.Status.DONE:
+        # Без новых вызовов rng: остальные поля не зависят от этой правки.
+        ticket.closed_at = ticket.updated_at = created_at + timedelta(hours=1 + index % 72)
+    return ticket
+
+
+def make_comments(rng, ticket):
+    comments = []
+    moment = ticket.created_at
+    for _ in range(comment_total(rng)):
+        moment += timedelta(minutes=rng.randint(1, 600))
+        comments.append(
+            Comment(
+                ticket=ticket,
+                author_name=rng.choice(AUTHORS),
+                message=rng.choice(REPLIES),
+                created_at=moment,
+            )
+        )
+    ticket.comment_count = len(comments)
+    ticket.last_activity_at = moment
+    return comments
+
+
+def ensure_tickets(count, seed=0, batch_size=2000, comments=True):
+    """Дополняет таблицу заявок до ``count`` строк детерминированными данными."""
+    existing = Ticket.objects.count()
+    if existing >= count:
+        return
+    rng = random.Random(seed + existing)
+    with keep_timestamps():
+        while existing < count:
+            size = min(batch_size, count - existing)
+            tickets = [make_ticket(rng, existing + offset) for offset in range(size)]
+            batch_comments = []
+            if comments:
+                for ticket in tickets:
+                    batch_comments.extend(make_comments(rng, ticket))
+            Ticket.objects.bulk_create(tickets)
+            # ticket_id комментариев Django возьмёт у уже сохранённых заявок.
+            Comment.objects.bulk_create(batch_comments, batch_size=batch_size)
+            existing += size
+    # bulk_create обходит сигналы: пересчитываем счётчики списка и сводки.
+    rebuild_counters()
+    rebuild_stats()
@@ -0,0 +1,49 @@
+"""Выгрузка: время и пик памяти Python при потоковом экспорте."""
+
+import time
+import tracemalloc
+
+from django.db import connection
+
+from tickets.export import stream_export
+from tickets.filters import TicketFilters
+
+from .data import ensure_tickets
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+
+
+def drain(chunks):
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+    return total
+
+
+def run(sizes, repeat, seed):
+    filters = TicketFilters()
+    results = []
+    for size in sizes:
+        ensure_tickets(size, seed=seed)
+        for fmt in ("csv", "ndjson"):
+            started = time.perf_counter()
+            chars = drain(stream_export(filters, fmt))
+            elapsed = time.perf_counter() - started
+            # Пик памяти — отдельным проходом: tracemalloc замедляет выгрузку.
+            tracemalloc.start()
+            drain(stream_export(filters, fmt))
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append(
+                {
+                    "suite": "export",
+                    "vendor": connection.vendor,
+                    "size": size,
+                    "format": fmt,
+                    "seconds": round(elapsed, 3),
+                    "rows_per_second": round(size / elapsed),
+                    "chars": chars,
+                    "peak_kib": round(peak / 1024),
+                }
+            )
+    return results
@@ -0,0 +1,56 @@
+"""Очередь фоновых задач: постановка и пропускная способность воркера.
+
+Размер — число задач в очереди. Задача пустая, поэтому замер показывает
+накладные расходы самой очереди: взять задачу, отметить и удалить её.
+"""
+
+import time
+
+from django.db import connection
+
+from tickets.jobs import Worker, enqueue, task
+from tickets.models import Job
+
+from . import measure
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+CONCURRENCY = [1, 4]
+
+
+@task("bench.noop")
+def noop(**payload):
+    pass
+
+
+def fill(size):
+    Job.objects.all().delete()
+    Job.objects.bulk_create(
+        (Job(name="bench.noop", payload={"n": n}) for n in range(size)), batch_size=1000
+    )
+
+
+def run(sizes, repeat, seed):
+    results = []
+    # Постановка одной задачи (INSERT в autocommit).
+    stats = measure(lambda: enqueue("bench.noop", {"n": 0}), repeat=repeat)
+    stats.update(suite="jobs", vendor=connection.vendor, size=0, case="enqueue")
+    results.append(stats)
+    for size in sizes:
+        for concurrency in CONCURRENCY:
+            fill(size)
+            started = time.perf_counter()
+            done = Worker(concurrency=concurrency, poll=0).run(burst=True)["done"]
+            elapsed = time.perf_counter() - started
+            results.append(
+                {
+                    "suite": "jobs",
+                    "vendor": connection.vendor,
+                    "size": size,
+                    "case": "worker",
+                    "concurrency": concurrency,
+                    "rows": done,
+                    "seconds": round(elapsed, 3),
+                    "rows_per_second": round(done / elapsed, 1),
+                }
+            )
+    return results
@@ -0,0 +1,36 @@
+"""Поиск: бэкенд из настроек против исходного icontains."""
+
+from django.db import connection
+
+from tickets.models import Ticket
+from tickets.search import IContainsSearchBackend, get_search_backend
+
+from . import measure
+from .data import ensure_tickets
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+QUERIES = ["принтер", "ошибка", "доступ сервер", "переговорной", "несуществующее"]
+
+
+def run(sizes, repeat, seed):
+    backends = [IContainsSearchBackend()]
+    configured = get_search_backend()
+    if configured.name != "icontains":
+        backends.append(configured)
+    results = []
+    for size in sizes:
+        ensure_tickets(size, seed=seed)
+        for backend in backends:
+            for query in QUERIES:
+                queryset = backend.search(Ticket.objects.all(), query)
+                stats = measure(lambda: list(queryset.all()[:10]), repeat=repeat)
+                stats.update(
+                    suite="search",
+                    vendor=connection.vendor,
+                    size=size,
+                    backend=backend.name,
+                    query=query,
+                    matches=queryset.count(),
+                )
+                results.append(stats)
+    return results
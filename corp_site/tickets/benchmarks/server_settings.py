@@ -0,0 +1,9 @@
+"""Настройки серверов набора ``servers``: прод-режим без collectstatic."""
+
+from corp_site.settings import *  # noqa: F403
+
+# Как PLAIN_STATIC в views.py; импортировать его нельзя — модуль тянет модели.
+STORAGES = {
+    **STORAGES,  # noqa: F405
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
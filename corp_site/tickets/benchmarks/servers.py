@@ -0,0 +1,247 @@
+"""WSGI против ASGI: пропускная способность и хвост задержек под нагрузкой.
+
+Одна и та же база отдаётся двумя серверами с одинаковым числом воркеров:
+gunicorn с синхронными воркерами (как на Render сейчас) и uvicorn с
+асинхронными представлениями (``bin/start-asgi.sh``). Нагрузку даёт
+asyncio-клиент в этом процессе: ``concurrency`` соединений, каждое шлёт
+``repeat`` запросов подряд и переиспользует соединение, если сервер его
+не закрыл. Клиент занимает одно ядро — на машине должно хватать ядер и на
+него, и на воркеры.
+
+SQLite-база копируется в файл, чтобы её видели процессы серверов; на
+Postgres серверы подключаются к той же тестовой базе.
+"""
+
+import asyncio
+import os
+import secrets
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import quote
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.db import connection
+from django.urls import reverse
+
+from tickets.models import Ticket
+
+from . import summarize
+from .data import ensure_tickets
+
+DEFAULT_SIZES = [10000]
+CONCURRENCY = [10, 100, 300]
+WORKERS = 2
+HOST = "127.0.0.1"
+STARTUP_TIMEOUT = 30
+REQUEST_TIMEOUT = 30
+
+
+def server_command(server, port):
+    if server == "wsgi":
+        return [
+            sys.executable, "-m", "gunicorn", "corp_site.wsgi:application",
+            "--workers", str(WORKERS), "--bind", f"{HOST}:{port}",
+            "--log-level", "warning",
+        ]
+    return [
+        sys.executable, "-m", "uvicorn", "corp_site.asgi:application",
+        "--workers", str(WORKERS), "--host", HOST, "--port", str(port),
+        "--log-level", "warning", "--no-access-log",
+    ]
+
+
+def database_url(directory):
+    """DATABASE_URL тестовой базы для процессов серверов."""
+    if connection.vendor == "sqlite":
+        path = Path(directory) / "bench.sqlite3"
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        try:
+            connection.connection.backup(target)
+        finally:
+            target.close()
+        return f"sqlite:///{path}"
+    if connection.vendor == "postgresql":
+        db = connection.settings_dict
+        user = quote(db["USER"] or "", safe="")
+        password = quote(db["PASSWORD"] or "", safe="")
+        return (
+            f"postgres://{user}:{password}@{db['HOST'] or 'localhost'}:"
+            f"{db['PORT'] or 5432}/{db['NAME']}"
+        )
+    raise NotImplementedError(f"Набор servers не поддерживает {connection.vendor}.")
+
+
+def server_environment(server, url):
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "tickets.benchmarks.server_settings",
+        "DATABASE_URL": url,
+        "DEBUG": "False",
+        "SECRET_KEY": secrets.token_urlsafe(50),
+        "ALLOWED_HOSTS": HOST,
+        "TICKETS_QUERY_BUDGETS": "off",
+        "TICKETS_METRICS_DIR": "",
+    }
+    if server == "asgi":
+        # Как bin/start-asgi.sh.
+        env.update(TICKETS_ASYNC_VIEWS="True", DB_CONN_MAX_AGE="0")
+    return env
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(port, process, path):
+    # Порт открывается раньше, чем воркеры загрузят Django: ждём ответа.
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Сервер завершился с кодом {process.returncode}.")
+        try:
+            urlopen(f"http://{HOST}:{port}{path}", timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Сервер не ответил на порту {port} за {STARTUP_TIMEOUT} с.")
+
+
+def start_server(server, url, path):
+    port = free_port()
+    process = subprocess.Popen(
+        server_command(server, port),
+        cwd=settings.BASE_DIR,
+        env=server_environment(server, url),
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        wait_for_server(port, process, path)
+    except BaseException:
+        stop_server(process)
+        raise
+    return process, port
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=STARTUP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def read_response(reader):
+    """Статус ответа и можно ли переиспользовать соединение."""
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    status_line, *lines = head.rstrip("\r\n").split("\r\n")
+    headers = {}
+    for line in lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip().lower()
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif "content-length" in headers:
+        await reader.readexactly(int(headers["content-length"]))
+    else:
+        await reader.read()
+        return int(status_line.split()[1]), False
+    return int(status_line.split()[1]), headers.get("connection") != "close"
+
+
+async def client(port, request, count, samples, errors):
+    writer = None
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(HOST, port)
+            writer.write(request)
+            status, keep_alive = await asyncio.wait_for(
+                read_response(reader), REQUEST_TIMEOUT
+            )
+        except (OSError, asyncio.TimeoutError, ValueError, asyncio.IncompleteReadError):
+            errors.append(None)
+            keep_alive = False
+        else:
+            samples.append((time.perf_counter() - started) * 1000)
+            if status != 200:
+                errors.append(status)
+        if not keep_alive and writer is not None:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, path, concurrency, repeat):
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\nConnection: keep-alive\r\n\r\n"
+    ).encode()
+    samples, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(client(port, request, repeat, samples, errors) for _ in range(concurrency))
+    )
+    elapsed = time.perf_counter() - started
+    return samples, errors, elapsed
+
+
+def build_cases():
+    typical = (
+        Ticket.objects.filter(comment_count__gt=0).values_list("pk", flat=True).first()
+        or Ticket.objects.values_list("pk", flat=True).first()
+    )
+    return {
+        "list": reverse("ticket_list"),
+        "detail": reverse("ticket_detail", args=[typical]),
+    }
+
+
+def run(sizes, repeat, seed):
+    results = []
+    for size in sizes:
+        ensure_tickets(size, seed=seed)
+        cases = build_cases()
+        with tempfile.TemporaryDirectory() as directory:
+            url = database_url(directory)
+            for server in ("wsgi", "asgi"):
+                process, port = start_server(server, url, cases["list"])
+                try:
+                    # Прогрев: импорт модулей и соединения в каждом воркере.
+                    for path in cases.values():
+                        asyncio.run(load(port, path, WORKERS * 2, 2))
+                    for case, path in cases.items():
+                        for concurrency in CONCURRENCY:
+                            samples, errors, elapsed = asyncio.run(
+                                load(port, path, concurrency, repeat)
+                            )
+                            stats = summarize(samples) if samples else {"n": 0}
+                            stats.update(
+                                suite="servers",
+                                vendor=connection.vendor,
+                                size=size,
+                                server=server,
+                                workers=WORKERS,
+                                case=case,
+                                concurrency=concurrency,
+                                rps=round(len(samples) / elapsed, 1),
+                                errors=len(errors),
+                            )
+                            results.append(stats)
+                finally:
+                    stop_server(process)
+    return results
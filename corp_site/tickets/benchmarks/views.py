@@ -0,0 +1,126 @@
+"""Страницы заявок: перцентили задержки и число SQL-запросов.
+
+Кэш фрагментов сбрасывается перед каждым запросом, чтобы мерить рендер
+страницы, а не попадание в кэш.
+"""
+
+from dataclasses import dataclass, field
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from tickets.models import Ticket
+from tickets.pagination import Cursor, encode_cursor
+from tickets.views import TicketListView
+
+from . import client_environment, measure
+from .data import ensure_tickets
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+# Глубокая страница — на 90% длины списка.
+DEEP_SHARE = 0.9
+BENCH_USER = "bench-admin"
+
+# Админка в DEBUG=False требует манифест collectstatic; для замеров он не нужен.
+PLAIN_STATIC = {
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}
+}
+
+
+@dataclass
+class Case:
+    name: str
+    path: str
+    params: dict = field(default_factory=dict)
+    method: str = "get"
+    settings: dict = field(default_factory=dict)
+    login: bool = False
+
+
+def build_cases():
+    total = Ticket.objects.count()
+    per_page = TicketListView.paginate_by
+    deep_page = max(1, int(total * DEEP_SHARE) // per_page)
+    # Один раз через OFFSET — чтобы получить курсор той же глубокой страницы.
+    deep_row = Ticket.objects.values("created_at", "pk")[(deep_page - 1) * per_page]
+    deep_cursor = encode_cursor(
+        Cursor(position=(deep_row["created_at"].isoformat(), deep_row["pk"]))
+    )
+    busiest = Ticket.objects.order_by("-comment_count", "-pk").values_list("pk", flat=True)[0]
+    typical = (
+        Ticket.objects.filter(comment_count__gt=0).values_list("pk", flat=True).first()
+        or busiest
+    )
+    list_url = reverse("ticket_list")
+    changelist = reverse("admin:tickets_ticket_changelist")
+    return [
+        Case("list", list_url),
+        Case("list_status", list_url, {"status": Ticket.Status.NEW}),
+        Case(
+            "list_status_priority",
+            list_url,
+            {"status": Ticket.Status.IN_PROGRESS, "priority": Ticket.Priority.HIGH},
+        ),
+        Case("list_activity", list_url, {"sort": "activity"}),
+        Case("list_search", list_url, {"q": "принтер"}),
+        Case("list_search_narrow", list_url, {"q": "проектор переговорной"}),
+        Case("list_deep_offset", list_url, {"page": deep_page}),
+        Case(
+            "list_deep_cursor",
+            list_url,
+            {"cursor": deep_cursor},
+            settings={"TICKETS_LIST_PAGINATION": "cursor"},
+        ),
+        Case("detail", reverse("ticket_detail", args=[typical])),
+        Case("detail_busiest", reverse("ticket_detail", args=[busiest])),
+        Case(
+            "add_comment",
+            reverse("ticket_add_comment", args=[typical]),
+            {"author_name": "Нагрузочный тест", "message": "Проверка связи."},
+            method="post",
+        ),
+        Case("stats", reverse("ticket_stats"), {"days": 90}, login=True),
+        Case("admin_changelist", changelist, login=True),
+        Case("admin_changelist_search", changelist, {"q": "принтер"}, login=True),
+    ]
+
+
+def run_case(case, repeat):
+    client = Client()
+    if case.login:
+        user, _ = User.objects.get_or_create(
+            username=BENCH_USER, defaults={"is_staff": True, "is_superuser": True}
+        )
+        client.force_login(user)
+    send = getattr(client, case.method)
+
+    def request():
+        cache.clear()
+        return send(case.path, case.params)
+
+    with override_settings(STORAGES=PLAIN_STATIC, **case.settings):
+        stats = measure(request, repeat=repeat)
+        with CaptureQueriesContext(connection) as queries:
+            response = request()
+    stats.update(
+        status=response.status_code,
+        queries=len(queries),
+        bytes=len(response.content),
+    )
+    return stats
+
+
+def run(sizes, repeat, seed):
+    results = []
+    with client_environment():
+        for size in sizes:
+            ensure_tickets(size, seed=seed)
+            for case in build_cases():
+                stats = run_case(case, repeat)
+                stats.update(suite="views", vendor=connection.vendor, size=size, case=case.name)
+                results.append(stats)
+    return results
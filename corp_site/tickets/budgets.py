@@ -0,0 +1,80 @@
+"""Бюджеты представлений: сколько SQL-запросов (и времени) им позволено.
+
+Бюджет привязан к имени URL и не должен зависеть от объёма данных:
+например, страница заявки укладывается в два запроса при любом числе
+комментариев; работа пачками (массовые действия) считается по одной
+пачке. Загрузка сессии и пользователя в бюджет не входит.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Budget:
+    queries: int
+    sql_ms: float | None = None
+    render_ms: float | None = None
+    # Лимит запросов — на запрос с одной пачкой (instrumentation.batch()):
+    # остальные пачки повторяют её запросы.
+    per_batch: bool = False
+
+    def violations(self, profile):
+        problems = []
+        count = profile.single_batch_query_count if self.per_batch else profile.query_count
+        if count > self.queries:
+            problems.append(f"запросов {count} > {self.queries}")
+        if self.sql_ms is not None and profile.sql_ms > self.sql_ms:
+            problems.append(f"SQL {profile.sql_ms:.1f} мс > {self.sql_ms} мс")
+        if self.render_ms is not None and profile.render_ms > self.render_ms:
+            problems.append(
+                f"рендеринг {profile.render_ms:.1f} мс > {self.render_ms} мс"
+            )
+        return problems
+
+
+BUDGETS = {
+    # Счётчики корзин и строки страницы; при текстовом поиске — ещё COUNT,
+    # если база не даёт оценку.
+    "ticket_list": Budget(queries=3),
+    # Заявка и страница комментариев.
+    "ticket_detail": Budget(queries=2),
+    "ticket_comments": Budget(queries=1),
+    # Заявка, комментарий, счётчик и активность заявки, версия корзины.
+    "ticket_add_comment": Budget(queries=4),
+    # INSERT, счётчик корзины, сводка дня и запись истории; первая заявка
+    # в корзине или за день добавляет ещё по INSERT.
+    "ticket_create": Budget(queries=6),
+    "ticket_update": Budget(queries=6),
+    # Заявка, её комментарии (для сигналов), DELETE комментариев, истории и
+    # заявки, счётчик, сводка дня и запись об удалении для синхронизации.
+    "ticket_delete": Budget(queries=8),
+    # На пачку заявок: строки пачки, UPDATE, счётчики, сводки дней и
+    # история; при удалении — заявки и комментарии для каскада, три DELETE,
+    # счётчики, сводки и записи об удалении. «Ко всем найденным» — столько
+    # же на каждую пачку.
+    "ticket_bulk": Budget(queries=9, per_batch=True),
+    # Счётчики корзин, сводки дней периода и число просроченных.
+    "ticket_stats": Budget(queries=3),
+    # Выгрузка читает базу уже после ответа, при отдаче потока.
+    "ticket_export": Budget(queries=0),
+    # Сам поток событий идёт уже после ответа и в базу не ходит.
+    "ticket_events": Budget(queries=1),
+    "ticket_list_events": Budget(queries=0),
+    "api_ticket_list": Budget(queries=3),
+    "api_ticket_batch": Budget(queries=1),
+    # Один запрос по индексу (на Postgres перед ним — таймаут); популярные
+    # префиксы отдаются из кэша.
+    "api_ticket_autocomplete": Budget(queries=2),
+    "api_ticket_comments": Budget(queries=2),
+    "api_ticket_history": Budget(queries=2),
+    # Заявки, комментарии и удаления — по запросу на поток.
+    "api_ticket_changes": Budget(queries=3),
+}
+
+
+def check_budget(url_name, profile):
+    """Список нарушений бюджета ``url_name``; пустой, если бюджета нет."""
+    budget = BUDGETS.get(url_name)
+    if budget is None:
+        return []
+    return budget.violations(profile)
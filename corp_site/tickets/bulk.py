@@ -0,0 +1,123 @@
+"""Массовые действия над заявками: статус, приоритет, удаление.
+
+Заявки обрабатываются пачками по ``BATCH_SIZE`` в порядке id, каждая
+пачка — в своей транзакции: строки блокируются ``SELECT ... FOR UPDATE`` и
+меняются одним ``UPDATE ... WHERE id IN`` (или удаляются вместе с
+комментариями). Счётчики корзин, сводки по дням, история, кэш списка,
+записи об удалении и события обновляются один раз на пачку, а не
+сигналами каждой строки.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import LIST_VERSION, TITLES_VERSION, invalidate
+from .counts import bump_counters
+from .events import LIST_CHANNEL, publish_on_commit, ticket_channel
+from .history import make_change
+from .instrumentation import batch
+from .jobs import heartbeat
+from .models import Ticket, TicketChange, Tombstone
+from .signals import muted, ticket_event_data
+from .stats import DayDeltas
+
+BATCH_SIZE = 500
+# Всё, что нужно для счётчиков и событий, без чтения целых строк.
+ROW_FIELDS = ("id", "title", "status", "priority", "created_at", "closed_at")
+
+
+def _in_batches(queryset, apply):
+    """Вызывает ``apply(rows)`` для каждой пачки; возвращает число строк."""
+    using = queryset.db
+    total = 0
+    last = 0
+    while True:
+        with batch(), transaction.atomic(using=using):
+            rows = list(
+                queryset.filter(pk__gt=last)
+                .order_by("pk")
+                .select_for_update()
+                .values(*ROW_FIELDS)[:BATCH_SIZE]
+            )
+            if rows:
+                apply(rows, using)
+        total += len(rows)
+        if len(rows) < BATCH_SIZE:
+            return total
+        last = rows[-1]["id"]
+        # В фоновой задаче: продлить аренду, пока не взялся другой воркер.
+        heartbeat()
+
+
+def update_tickets(queryset, field, value, author=None):
+    """Ставит ``field`` (status или priority) в ``value``; возвращает число
+    изменённых заявок. Заявки, где значение уже такое, не трогаются."""
+
+    def apply(rows, using):
+        now = timezone.now()
+        ids = [row["id"] for row in rows]
+        changes = {field: value, "updated_at": now}
+        if field == "status":
+            # Как Ticket.save(): закрытие ставит время, возврат в работу его
+            # сбрасывает. Заявки, уже стоящие в этом статусе, сюда не попадают.
+            changes["closed_at"] = now if value == Ticket.Status.DONE else None
+        Ticket.objects.using(using).filter(pk__in=ids).update(**changes)
+        deltas = Counter()
+        days = DayDeltas()
+        history = []
+        events = []
+        for row in rows:
+            changed = {**row, **changes}
+            deltas[row["status"], row["priority"]] -= 1
+            deltas[changed["status"], changed["priority"]] += 1
+            if changed["closed_at"] != row["closed_at"]:
+                days.add(closed_at=row["closed_at"], sign=-1)
+                days.add(closed_at=changed["closed_at"])
+            history.append(
+                make_change(
+                    row["id"],
+                    {field: [row[field], value]},
+                    changed_at=now,
+                    source=TicketChange.Source.BULK,
+                    author=author,
+                )
+            )
+            events.append(
+                (ticket_channel(row["id"]), "ticket", ticket_event_data(Ticket(**changed)))
+            )
+        bump_counters(deltas, using=using)
+        days.apply(using=using)
+        TicketChange.objects.using(using).bulk_create(history)
+        # Блок комментариев от статуса не зависит: хватает версии списка.
+        invalidate(LIST_VERSION, using=using)
+        events.append((LIST_CHANNEL, "ticket", {"ids": ids}))
+        publish_on_commit(events, using=using)
+
+    return _in_batches(queryset.exclude(**{field: value}), apply)
+
+
+def delete_tickets(queryset):
+    """Удаляет заявки с комментариями; возвращает число удалённых заявок."""
+
+    def apply(rows, using):
+        ids = [row["id"] for row in rows]
+        with muted():
+            Ticket.objects.using(using).filter(pk__in=ids).delete()
+        deltas = Counter()
+        days = DayDeltas()
+        for row in rows:
+            deltas[row["status"], row["priority"]] -= 1
+            days.add(row["created_at"], row["closed_at"], sign=-1)
+        bump_counters(deltas, using=using)
+        days.apply(using=using)
+        Tombstone.objects.using(using).bulk_create(
+            Tombstone(kind=Tombstone.Kind.TICKET, object_id=pk) for pk in ids
+        )
+        invalidate(LIST_VERSION, TITLES_VERSION, using=using)
+        events = [(ticket_channel(pk), "deleted", {"id": pk}) for pk in ids]
+        events.append((LIST_CHANNEL, "deleted", {"ids": ids}))
+        publish_on_commit(events, using=using)
+
+    return _in_batches(queryset, apply)
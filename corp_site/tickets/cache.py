@@ -0,0 +1,129 @@
+"""Кэш отрендеренных фрагментов страниц заявок.
+
+Фрагмент хранится под ключом из имени, набора «vary on»-значений и текущей
+версии. Версии лежат в том же кэше и растут при сохранении и удалении
+заявок и комментариев (см. signals.py), поэтому старые фрагменты просто
+перестают читаться и вытесняются по таймауту.
+
+Версии:
+
+* ``all`` — входит в ключ каждого фрагмента; её поднимают пересчёты после
+  массовых операций в обход сигналов;
+* ``list`` — все строки списка заявок (в строке есть число комментариев);
+* ``ticket:<pk>`` — блок комментариев на странице заявки;
+* ``titles`` — подсказки заголовков: заявку создали, удалили или
+  переименовали.
+"""
+
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+ALL_VERSION = "all"
+LIST_VERSION = "list"
+TITLES_VERSION = "titles"
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def ticket_version(pk):
+    return f"ticket:{pk}"
+
+
+def get_cache():
+    return caches[settings.TICKETS_CACHE_ALIAS]
+
+
+def _version_key(name):
+    return f"tickets:version:{name}"
+
+
+def current_versions(*names):
+    """Текущие версии одним обращением к кэшу."""
+    cache = get_cache()
+    keys = [_version_key(name) for name in names]
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            # Ключ версии мог быть вытеснен раньше фрагментов: начинаем не
+            # с 1, а с текущего времени, чтобы не попасть на старые фрагменты.
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def bump_version(name):
+    cache = get_cache()
+    key = _version_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate(*names, using=None):
+    """Поднимает версии сразу и ещё раз после коммита транзакции.
+
+    Без второго шага параллельный запрос мог бы между ними закэшировать
+    данные до коммита под уже новой версией.
+    """
+
+    def bump_all():
+        for name in names:
+            bump_version(name)
+
+    bump_all()
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(bump_all, using=using)
+
+
+def _record(name, outcome):
+    with _stats_lock:
+        _stats[(name, outcome)] += 1
+
+
+def fragment_stats():
+    """Попадания и промахи по фрагментам с момента старта процесса."""
+    with _stats_lock:
+        items = list(_stats.items())
+    stats = {}
+    for (name, outcome), value in items:
+        stats.setdefault(name, {"hits": 0, "misses": 0})[outcome] = value
+    return stats
+
+
+def reset_fragment_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def fragment_key(name, versions, vary_on):
+    digest = hashlib.md5(
+        ":".join(str(part) for part in vary_on).encode(), usedforsecurity=False
+    ).hexdigest()
+    version = ".".join(str(version) for version in versions)
+    return f"tickets:fragment:{name}:{version}:{digest}"
+
+
+def cached_fragment(name, version_name, vary_on, render):
+    """Возвращает фрагмент из кэша или рендерит и сохраняет его."""
+    cache = get_cache()
+    versions = current_versions(ALL_VERSION, version_name)
+    key = fragment_key(name, versions, vary_on)
+    content = cache.get(key)
+    if content is not None:
+        _record(name, "hits")
+        return content
+    _record(name, "misses")
+    content = render()
+    cache.set(key, content, settings.TICKETS_FRAGMENT_CACHE_TIMEOUT)
+    return content
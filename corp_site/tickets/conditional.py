@@ -0,0 +1,95 @@
+"""Условные GET-запросы (ETag / Last-Modified) для страниц заявок.
+
+Страница отдаётся как 304 ещё до рендеринга шаблона, если у клиента уже
+есть актуальная версия. Версия данных дополняется «отпечатком» сессии:
+пользователем и CSRF-cookie, поэтому меню пользователя и токены форм не
+переходят между сессиями. Страницы с непоказанными сообщениями (messages)
+не кэшируются вовсе.
+"""
+
+import hashlib
+
+from django.contrib import messages
+from django.utils.cache import (
+    add_never_cache_headers,
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+
+
+def session_fingerprint(request):
+    # CsrfViewMiddleware кладёт сюда секрет из cookie, а get_token() при
+    # рендеринге — новый секрет, который уйдёт клиенту в Set-Cookie.
+    return f"{request.user.pk or 0}:{request.META.get('CSRF_COOKIE', '')}"
+
+
+def make_etag(request, data_version):
+    source = f"{data_version}|{session_fingerprint(request)}"
+    return quote_etag(hashlib.md5(source.encode(), usedforsecurity=False).hexdigest())
+
+
+def has_pending_messages(request):
+    return bool(len(messages.get_messages(request)))
+
+
+def not_modified(request, data_version, last_modified):
+    """304/412 по ETag и Last-Modified или None, если страницу нужно отдать."""
+    return get_conditional_response(
+        request,
+        etag=make_etag(request, data_version),
+        last_modified=_last_modified(request, last_modified),
+    )
+
+
+def _last_modified(request, last_modified):
+    # Last-Modified не знает о пользователе, поэтому только для анонимов;
+    # залогиненным хватает ETag, в который входит пользователь.
+    if request.user.is_authenticated or last_modified is None:
+        return None
+    return int(last_modified.timestamp())
+
+
+def add_validators(request, response, data_version, last_modified):
+    """ETag, Last-Modified и заголовки кэша для ответа (в том числе 304)."""
+    if not getattr(response, "is_rendered", True):
+
+        def refresh_etag(rendered):
+            # Рендеринг мог выдать клиенту новый CSRF-секрет: пересчитываем
+            # ETag, чтобы следующий запрос с этой cookie совпал.
+            rendered.headers["ETag"] = make_etag(request, data_version)
+
+        response.add_post_render_callback(refresh_etag)
+    response.headers["ETag"] = make_etag(request, data_version)
+    last_modified = _last_modified(request, last_modified)
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+class ConditionalGetMixin:
+    """Добавляет ETag/Last-Modified к get() представления.
+
+    Представление реализует ``get_data_version()`` и возвращает пару
+    (строка-версия данных, datetime последнего изменения или None).
+    """
+
+    def get_data_version(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        if has_pending_messages(request):
+            # Сообщение показывается один раз — такую страницу нельзя
+            # отдавать повторно из кэша браузера.
+            response = super().get(request, *args, **kwargs)
+            add_never_cache_headers(response)
+            return response
+
+        data_version, last_modified = self.get_data_version()
+        response = not_modified(request, data_version, last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return add_validators(request, response, data_version, last_modified)
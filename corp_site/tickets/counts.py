@@ -0,0 +1,192 @@
+"""Число заявок для списка без COUNT(*) по всей таблице.
+
+Без текстового запроса ответ складывается из счётчиков TicketCounter.
+С запросом на Postgres берётся оценка планировщика, если она выше порога
+``TICKETS_COUNT_ESTIMATE_THRESHOLD``; иначе выполняется точный COUNT.
+"""
+
+import json
+from dataclasses import dataclass
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Case, Count, Exists, F, OuterRef, Q, Value, When
+from django.utils import timezone
+
+from .cache import ALL_VERSION, invalidate
+from .models import Ticket, TicketCounter
+
+
+@dataclass(frozen=True)
+class TicketCount:
+    value: int
+    estimated: bool = False
+
+
+def bump_counter(status, priority, delta=0, using=None):
+    """Меняет счётчик корзины на ``delta`` и в любом случае её версию."""
+    counters = TicketCounter.objects.using(using)
+    changes = {
+        "count": F("count") + delta,
+        "version": F("version") + 1,
+        "changed_at": timezone.now(),
+    }
+    updated = counters.filter(status=status, priority=priority).update(**changes)
+    if updated:
+        return
+    try:
+        with transaction.atomic(using=using):
+            counters.create(
+                status=status,
+                priority=priority,
+                count=delta,
+                version=1,
+                changed_at=changes["changed_at"],
+            )
+    except IntegrityError:
+        # Строку корзины успел создать параллельный запрос.
+        counters.filter(status=status, priority=priority).update(**changes)
+
+
+def bump_counters(deltas, using=None):
+    """bump_counter для нескольких корзин одним UPDATE.
+
+    ``deltas`` — {(статус, приоритет): изменение числа}.
+    """
+    if not deltas:
+        return
+    buckets = Q()
+    whens = []
+    for (status, priority), delta in deltas.items():
+        match = Q(status=status, priority=priority)
+        buckets |= match
+        whens.append(When(match, then=Value(delta)))
+    counters = TicketCounter.objects.using(using).filter(buckets)
+    updated = counters.update(
+        count=F("count") + Case(*whens, default=Value(0)),
+        version=F("version") + 1,
+        changed_at=timezone.now(),
+    )
+    if updated == len(deltas):
+        return
+    existing = set(counters.values_list("status", "priority"))
+    missing = {bucket: delta for bucket, delta in deltas.items() if bucket not in existing}
+    # Пустые строки корзин одним INSERT (параллельно созданные пропускаются),
+    # затем тот же UPDATE только для них.
+    TicketCounter.objects.using(using).bulk_create(
+        [
+            TicketCounter(status=status, priority=priority, count=0, version=0)
+            for status, priority in missing
+        ],
+        ignore_conflicts=True,
+    )
+    bump_counters(missing, using=using)
+
+
+def touch_ticket_bucket(ticket_id, using=None):
+    """Новая версия корзины заявки — например, когда у неё новый комментарий."""
+    ticket = Ticket.objects.using(using).filter(
+        pk=ticket_id, status=OuterRef("status"), priority=OuterRef("priority")
+    )
+    TicketCounter.objects.using(using).filter(Exists(ticket)).update(
+        version=F("version") + 1, changed_at=timezone.now()
+    )
+
+
+def rebuild_counters(using=None):
+    """Пересчитывает все корзины — после массовых операций в обход сигналов.
+
+    Версии корзин растут, а не начинаются заново: иначе ETag списка мог бы
+    совпасть с тем, что клиент закэшировал до пересчёта.
+    """
+    rows = (
+        Ticket.objects.using(using)
+        .order_by()
+        .values("status", "priority")
+        .annotate(n=Count("id"))
+    )
+    counts = {(row["status"], row["priority"]): row["n"] for row in rows}
+    whens = [
+        When(Q(status=status, priority=priority), then=Value(count))
+        for (status, priority), count in counts.items()
+    ]
+    now = timezone.now()
+    counters = TicketCounter.objects.using(using)
+    with transaction.atomic(using=using):
+        counters.update(
+            count=Case(*whens, default=Value(0)),
+            version=F("version") + 1,
+            changed_at=now,
+        )
+        existing = set(counters.values_list("status", "priority"))
+        counters.bulk_create(
+            TicketCounter(
+                status=status, priority=priority, count=count, version=1, changed_at=now
+            )
+            for (status, priority), count in counts.items()
+            if (status, priority) not in existing
+        )
+    invalidate(ALL_VERSION, using=using)
+
+
+def _bucket_queryset(filters, using=None):
+    counters = TicketCounter.objects.using(using)
+    if filters.status:
+        counters = counters.filter(status=filters.status)
+    if filters.priority is not None:
+        counters = counters.filter(priority=filters.priority)
+    return counters.order_by("status", "priority").values_list(
+        "status", "priority", "count", "version", "changed_at"
+    )
+
+
+def bucket_rows(filters, using=None):
+    """Строки счётчиков под фильтр статуса/приоритета — одним запросом.
+
+    Из них берутся и число заявок, и версия для ETag списка.
+    """
+    return list(_bucket_queryset(filters, using))
+
+
+async def abucket_rows(filters, using=None):
+    return [row async for row in _bucket_queryset(filters, using)]
+
+
+def bucket_count(filters, using=None, rows=None):
+    rows = bucket_rows(filters, using=using) if rows is None else rows
+    return sum(row[2] for row in rows)
+
+
+def estimate_count(queryset):
+    """Оценка числа строк из EXPLAIN; None, если база её не даёт."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_tickets(queryset, filters, rows=None):
+    if not filters.q:
+        return TicketCount(bucket_count(filters, using=queryset.db, rows=rows))
+    estimate = estimate_count(queryset)
+    if estimate is not None and estimate >= settings.TICKETS_COUNT_ESTIMATE_THRESHOLD:
+        return TicketCount(estimate, estimated=True)
+    return TicketCount(queryset.count())
+
+
+async def acount_tickets(queryset, filters, rows):
+    """count_tickets для async-представлений; ``rows`` уже прочитаны."""
+    if not filters.q:
+        return TicketCount(bucket_count(filters, rows=rows))
+    # EXPLAIN идёт через курсор, у которого нет асинхронного варианта.
+    estimate = await sync_to_async(estimate_count)(queryset)
+    if estimate is not None and estimate >= settings.TICKETS_COUNT_ESTIMATE_THRESHOLD:
+        return TicketCount(estimate, estimated=True)
+    return TicketCount(await queryset.acount())
@@ -0,0 +1,248 @@
+"""Живые обновления заявок через Server-Sent Events.
+
+Сигналы сохранения заявок и комментариев после коммита публикуют событие
+в канал заявки (``ticket:<pk>``: новые комментарии, статус) и в канал
+списка (``tickets``: id изменённых заявок). Хаб раздаёт события
+подписчикам своего процесса: у каждого SSE-клиента своя ограниченная
+очередь, и клиент, который не успевает её разбирать, отключается — браузер
+переподключится сам и перечитает страницу.
+
+С ``TICKETS_EVENTS_BACKEND = "postgres"`` событие уходит через
+``NOTIFY``, а поток-слушатель в каждом процессе (``LISTEN``) передаёт его
+своему хабу: так события видят клиенты всех воркеров.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+logger = logging.getLogger("tickets.events")
+
+LIST_CHANNEL = "tickets"
+NOTIFY_CHANNEL = "tickets_events"
+# NOTIFY принимает до 8000 байт; длинный комментарий уходит без текста.
+NOTIFY_LIMIT = 7900
+RECONNECT_DELAY = 5
+# Через сколько миллисекунд браузер переподключается после обрыва.
+RETRY_MS = 3000
+
+
+def ticket_channel(pk):
+    return f"ticket:{pk}"
+
+
+@dataclass(eq=False)
+class Subscription:
+    channel: str
+    queue: asyncio.Queue
+    loop: asyncio.AbstractEventLoop
+    dropped: bool = False
+
+
+class Hub:
+    """Подписчики процесса по каналам; публиковать можно из любого потока."""
+
+    def __init__(self):
+        self._channels = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel, maxsize):
+        """Подписка из работающего event loop."""
+        subscription = Subscription(
+            channel, asyncio.Queue(maxsize), asyncio.get_running_loop()
+        )
+        with self._lock:
+            self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def subscriber_count(self, channel=None):
+        with self._lock:
+            if channel is not None:
+                return len(self._channels.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self._channels.values())
+
+    def publish_local(self, message):
+        with self._lock:
+            subscribers = list(self._channels.get(message["channel"], ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    self._deliver, subscription, message
+                )
+            except RuntimeError:
+                # Event loop клиента уже закрыт.
+                self.unsubscribe(subscription)
+
+    def _deliver(self, subscription, message):
+        if subscription.dropped:
+            return
+        try:
+            subscription.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            subscription.dropped = True
+            self.unsubscribe(subscription)
+
+
+hub = Hub()
+
+
+def publish(channel, event, data):
+    publish_many([(channel, event, data)])
+
+
+def publish_many(events):
+    """Несколько событий (channel, event, data); для postgres — одним запросом."""
+    messages = [
+        {"channel": channel, "event": event, "data": data} for channel, event, data in events
+    ]
+    if settings.TICKETS_EVENTS_BACKEND == "postgres":
+        notify(*messages)
+    else:
+        for message in messages:
+            hub.publish_local(message)
+
+
+def publish_on_commit(events, using=DEFAULT_DB_ALIAS):
+    """publish_many после коммита: клиент не увидит несохранённых данных."""
+    events = list(events)
+    transaction.on_commit(lambda: publish_many(events), using=using)
+
+
+def _payload(message):
+    payload = json.dumps(message, cls=DjangoJSONEncoder)
+    if len(payload.encode()) > NOTIFY_LIMIT:
+        data = {key: message["data"][key] for key in ("id", "ids") if key in message["data"]}
+        message = {**message, "data": {**data, "truncated": True}}
+        payload = json.dumps(message, cls=DjangoJSONEncoder)
+    return payload
+
+
+def notify(*messages, using=DEFAULT_DB_ALIAS):
+    if not messages:
+        return
+    params = []
+    for message in messages:
+        params += [NOTIFY_CHANNEL, _payload(message)]
+    calls = ", ".join(["pg_notify(%s, %s)"] * len(messages))
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"SELECT {calls}", params)
+
+
+class PostgresBridge(threading.Thread):
+    """LISTEN в отдельном соединении: уведомления уходят в хаб процесса."""
+
+    daemon = True
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        super().__init__(name="tickets-events-listener")
+        self.using = using
+
+    def run(self):
+        wrapper = connections[self.using]
+        while True:
+            try:
+                # Своё соединение мимо пула: LISTEN держит его всё время.
+                connection = wrapper.Database.connect(**wrapper.get_connection_params())
+                connection.autocommit = True
+                with connection:
+                    connection.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    for notification in connection.notifies():
+                        hub.publish_local(json.loads(notification.payload))
+            except Exception:
+                logger.exception("Слушатель событий заявок отключился")
+                time.sleep(RECONNECT_DELAY)
+
+
+_bridge = None
+_bridge_lock = threading.Lock()
+
+
+def ensure_bridge():
+    """Запускает слушателя NOTIFY при первой подписке (только для postgres)."""
+    global _bridge
+    if settings.TICKETS_EVENTS_BACKEND != "postgres":
+        return
+    with _bridge_lock:
+        if _bridge is None:
+            _bridge = PostgresBridge()
+            _bridge.start()
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+def message_ids(message):
+    # Массовые операции публикуют в канал списка одно событие на пачку.
+    data = message["data"]
+    return list(data["ids"]) if "ids" in data else [data["id"]]
+
+
+class EventStream:
+    """Асинхронный поток SSE для канала; ждёт событий в event loop, а не в
+    потоке.
+
+    StreamingHttpResponse вызывает ``close()`` при закрытии ответа, и клиент
+    отписывается сразу, не дожидаясь сборки генератора. ``coalesce``
+    склеивает накопившиеся события списка в одно ``changed`` с уникальными
+    id заявок.
+    """
+
+    def __init__(self, channel, coalesce=False):
+        self.channel = channel
+        self.coalesce = coalesce
+        self.subscription = None
+
+    def __aiter__(self):
+        return self._events()
+
+    def close(self):
+        if self.subscription is not None:
+            self.subscription.dropped = True
+            hub.unsubscribe(self.subscription)
+
+    async def _events(self):
+        ensure_bridge()
+        subscription = self.subscription = hub.subscribe(
+            self.channel, settings.TICKETS_EVENTS_QUEUE_SIZE
+        )
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.queue.get(), settings.TICKETS_EVENTS_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    # Комментарий SSE: не даёт прокси закрыть простаивающее
+                    # соединение.
+                    yield ": ping\n\n"
+                    continue
+                if subscription.dropped:
+                    yield format_event("overflow", {})
+                    return
+                if not self.coalesce:
+                    yield format_event(message["event"], message["data"])
+                    continue
+                ids = message_ids(message)
+                while not subscription.queue.empty():
+                    ids += message_ids(subscription.queue.get_nowait())
+                yield format_event("changed", {"ids": list(dict.fromkeys(ids))})
+        finally:
+            self.close()
@@ -0,0 +1,69 @@
+from dataclasses import dataclass
+
+from .models import Ticket
+from .search import get_search_backend
+
+
+@dataclass(frozen=True)
+class TicketFilters:
+    """Фильтры списка заявок: поиск, статус и приоритет.
+
+    Некорректные значения из запроса отбрасываются, как и раньше в
+    TicketListView, поэтому ``apply`` получает только проверенные данные.
+    """
+
+    q: str = ""
+    status: str = ""
+    priority: int | None = None
+    sort: str = ""
+
+    # Сортировка → поле, по убыванию которого (и id) идёт список.
+    SORT_KEYS = {
+        "": "created_at",
+        "activity": "last_activity_at",
+    }
+    SORT_CHOICES = [
+        ("", "Сначала новые"),
+        ("activity", "Недавняя активность"),
+    ]
+
+    @classmethod
+    def from_params(cls, params):
+        status = params.get("status", "")
+        priority = str(params.get("priority", ""))
+        sort = params.get("sort", "")
+        return cls(
+            q=str(params.get("q", "")).strip(),
+            status=status if status in Ticket.Status.values else "",
+            priority=(
+                int(priority)
+                if priority.isdigit() and int(priority) in Ticket.Priority.values
+                else None
+            ),
+            sort=sort if sort in cls.SORT_KEYS else "",
+        )
+
+    def as_params(self):
+        params = {
+            "q": self.q,
+            "status": self.status,
+            "priority": self.priority,
+            "sort": self.sort,
+        }
+        return {key: value for key, value in params.items() if value}
+
+    @property
+    def sort_key(self):
+        return self.SORT_KEYS[self.sort]
+
+    def apply(self, queryset, ranked=True):
+        if self.q:
+            backend = get_search_backend(queryset.db)
+            queryset = backend.search(queryset, self.q, ranked=ranked)
+        if self.status:
+            queryset = queryset.filter(status=self.status)
+        if self.priority is not None:
+            queryset = queryset.filter(priority=self.priority)
+        if self.sort:
+            queryset = queryset.order_by(f"-{self.sort_key}", "-pk")
+        return queryset
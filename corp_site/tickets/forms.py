@@ -1,5 +1,7 @@
 from django import forms
+from django.http import QueryDict
 
+from .filters import TicketFilters
 from .models import Comment, Ticket
 
 
@@ -24,3 +26,76 @@ class CommentForm(forms.ModelForm):
             'author_name': forms.TextInput(attrs={'class': 'form-control'}),
             'message': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
         }
+
+
+class IdListField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return sorted({int(item) for item in value})
+        except (TypeError, ValueError):
+            raise forms.ValidationError('Некорректный список заявок.') from None
+
+
+class BulkActionForm(forms.Form):
+    """Массовое действие над отмеченными заявками или над всеми найденными."""
+
+    MAX_IDS = 500
+
+    ACTION_CHOICES = [
+        ('status', 'Сменить статус'),
+        ('priority', 'Сменить приоритет'),
+        ('delete', 'Удалить'),
+    ]
+
+    action = forms.ChoiceField(
+        label='Действие',
+        choices=ACTION_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    status = forms.ChoiceField(
+        label='Статус',
+        choices=[('', 'Статус…'), *Ticket.Status.choices],
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    priority = forms.TypedChoiceField(
+        label='Приоритет',
+        choices=[('', 'Приоритет…'), *Ticket.Priority.choices],
+        coerce=int,
+        empty_value=None,
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    ids = IdListField(required=False)
+    select_all = forms.BooleanField(
+        label='Ко всем найденным',
+        required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+    )
+    # Фильтры списка в виде querystring: для «ко всем найденным» и возврата.
+    filters = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def clean_filters(self):
+        return TicketFilters.from_params(QueryDict(self.cleaned_data['filters']))
+
+    def clean(self):
+        cleaned = super().clean()
+        action = cleaned.get('action')
+        if action in ('status', 'priority') and cleaned.get(action) in ('', None):
+            self.add_error(action, 'Выберите новое значение.')
+        if not cleaned.get('select_all'):
+            ids = cleaned.get('ids') or []
+            if not ids:
+                raise forms.ValidationError('Отметьте заявки.')
+            if len(ids) > self.MAX_IDS:
+                raise forms.ValidationError(f'Не больше {self.MAX_IDS} заявок за раз.')
+        return cleaned
+
+    def get_queryset(self):
+        if self.cleaned_data['select_all']:
+            return self.cleaned_data['filters'].apply(Ticket.objects.all(), ranked=False)
+        return Ticket.objects.filter(pk__in=self.cleaned_data['ids'])
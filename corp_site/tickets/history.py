@@ -0,0 +1,194 @@
+"""История заявок: какие поля, когда и откуда поменялись.
+
+Запись TicketChange хранит только изменённые поля ({поле: [было, стало]}),
+а не снимок заявки. Сохранения через ORM записывает сигнал (было — из
+значений на момент загрузки), массовые действия — сами, одним INSERT на
+пачку. Источник и автора задаёт ``recorded_as`` вокруг сохранения.
+
+Отчёты по статусам читают только записи со сменой статуса (колонки
+``previous_status`` и ``status``, частичный индекс), не разбирая JSON:
+время в статусе — это промежуток от перехода в него до следующего
+перехода той же заявки.
+"""
+
+import heapq
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db.models import Count, OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Ticket, TicketChange
+
+# Поля, изменения которых попадают в историю.
+TRACKED_FIELDS = ("title", "description", "status", "priority", "due_date")
+# При создании: с чего заявка началась, для отчётов по статусам.
+INITIAL_FIELDS = ("status", "priority")
+
+_actor = ContextVar("tickets_history_actor", default=(TicketChange.Source.OTHER, None))
+
+
+@contextmanager
+def recorded_as(source, author=None):
+    """Источник и автор для изменений, сохранённых внутри блока."""
+    if author is not None and not author.is_authenticated:
+        author = None
+    token = _actor.set((source, author))
+    try:
+        yield
+    finally:
+        _actor.reset(token)
+
+
+def diff(previous, current):
+    """{поле: [было, стало]} для отслеживаемых полей, которые поменялись."""
+    return {
+        name: [previous[name], current[name]]
+        for name in TRACKED_FIELDS
+        if name in previous and name in current and previous[name] != current[name]
+    }
+
+
+def make_change(ticket_id, changes, changed_at=None, source=None, author=None):
+    """Несохранённая запись истории; None, если менять нечего."""
+    if not changes:
+        return None
+    if source is None:
+        source, author = _actor.get()
+    status = changes.get("status")
+    return TicketChange(
+        ticket_id=ticket_id,
+        changed_at=changed_at or timezone.now(),
+        source=source,
+        author=author,
+        changes=changes,
+        status=status[1] if status else None,
+        previous_status=status[0] if status else None,
+    )
+
+
+def initial_changes(ticket):
+    return {name: [None, getattr(ticket, name)] for name in INITIAL_FIELDS}
+
+
+def inserted_history(ticket, source=TicketChange.Source.OTHER):
+    """Записи для заявки, вставленной в обход сигналов (импорт).
+
+    Промежуточные статусы неизвестны: незавершённая заявка считается
+    созданной в текущем статусе, завершённая — созданной новой и закрытой
+    в ``closed_at``.
+    """
+    closed = ticket.status == Ticket.Status.DONE and ticket.closed_at is not None
+    initial = Ticket.Status.NEW if closed else ticket.status
+    changes = [
+        make_change(
+            ticket.pk,
+            {"status": [None, initial], "priority": [None, ticket.priority]},
+            changed_at=ticket.created_at,
+            source=source,
+        )
+    ]
+    if closed:
+        changes.append(
+            make_change(
+                ticket.pk,
+                {"status": [initial, ticket.status]},
+                changed_at=ticket.closed_at,
+                source=source,
+            )
+        )
+    return changes
+
+
+def timeline(ticket_id, using=None):
+    """История заявки по порядку; идёт по ticketchange_ticket_idx."""
+    return TicketChange.objects.using(using).filter(ticket_id=ticket_id)
+
+
+def status_transitions(start, end, using=None):
+    """Сколько раз заявки переходили из статуса в статус за [start, end).
+
+    {(было, стало): число}; «было» None — заявка создана в этом статусе.
+    """
+    rows = (
+        TicketChange.objects.using(using)
+        .filter(status__isnull=False, changed_at__gte=start, changed_at__lt=end)
+        .order_by()
+        .values("previous_status", "status")
+        .annotate(n=Count("id"))
+    )
+    return {(row["previous_status"], row["status"]): row["n"] for row in rows}
+
+
+@dataclass
+class StatusTime:
+    total: timedelta = timedelta()
+    # Сколько отрезков (пребываний заявок в статусе) попало в период.
+    spans: int = 0
+
+    @property
+    def average(self):
+        return self.total / self.spans if self.spans else timedelta()
+
+
+def _status_rows(start, end, using):
+    """(заявка, время, статус) по порядку: статус каждой заявки на ``start``
+    и её переходы внутри [start, end).
+
+    Старая история читается только последним переходом до ``start`` на
+    заявку (по ticketchange_ticket_idx), так что цена отчёта зависит от
+    числа заявок и переходов за период, а не от всей истории.
+    """
+    before = (
+        TicketChange.objects.using(using)
+        .filter(ticket_id=OuterRef("pk"), status__isnull=False, changed_at__lt=start)
+        .order_by("-changed_at", "-id")
+        .values("status")[:1]
+    )
+    initial = (
+        Ticket.objects.using(using)
+        .annotate(status_at_start=Subquery(before))
+        .filter(status_at_start__isnull=False)
+        .order_by("pk")
+        .values_list("pk", "status_at_start")
+    )
+    changes = (
+        TicketChange.objects.using(using)
+        .filter(status__isnull=False, changed_at__gte=start, changed_at__lt=end)
+        .order_by("ticket_id", "changed_at", "id")
+        .values_list("ticket_id", "changed_at", "id", "status")
+    )
+    # Статус на начало периода идёт раньше перехода в ту же секунду.
+    return heapq.merge(
+        ((pk, start, 0, status) for pk, status in initial.iterator()),
+        changes.iterator(),
+    )
+
+
+def time_in_status(start, end, using=None):
+    """Сколько времени заявки провели в каждом статусе за [start, end).
+
+    Отрезок — от перехода в статус (или от ``start``) до следующего
+    перехода той же заявки; у текущего статуса он тянется до ``end`` или до
+    сейчас.
+    """
+    end = min(end, timezone.now())
+    report = defaultdict(StatusTime)
+
+    def add(status, started_at, ended_at):
+        if ended_at > started_at:
+            report[status].total += ended_at - started_at
+            report[status].spans += 1
+
+    current = None
+    for ticket_id, changed_at, _, status in _status_rows(start, end, using):
+        if current is not None:
+            previous_ticket, previous_status, since = current
+            add(previous_status, since, changed_at if previous_ticket == ticket_id else end)
+        current = (ticket_id, status, changed_at)
+    if current is not None:
+        add(current[1], current[2], end)
+    return {status: report[status] for status in Ticket.Status.values if status in report}
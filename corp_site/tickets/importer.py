@@ -0,0 +1,414 @@
+"""Массовый импорт заявок и комментариев из CSV или NDJSON.
+
+Вход читается потоково и пишется пачками, каждая в своей транзакции:
+на Postgres через ``COPY FROM STDIN`` (psycopg 3), на остальных базах через
+``bulk_create``. Строки, которые не прошли проверку или не записались,
+уходят в файл отказов и не останавливают импорт.
+
+Формат заявки: external_id, title, description, status, priority, due_date,
+created_at, updated_at (из него берётся closed_at; сама заявка получает
+updated_at времени импорта). В NDJSON у заявки может быть массив ``comments``;
+отдельный файл комментариев ссылается на заявку колонкой
+``ticket_external_id``.
+"""
+
+import csv
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+from .activity import rebuild_activity
+from .counts import rebuild_counters
+from .history import inserted_history
+from .models import Comment, Ticket, TicketChange
+from .stats import rebuild_stats
+
+TICKET_FIELDS = ("title", "description", "status", "priority", "due_date")
+COMMENT_FIELDS = ("author_name", "message")
+BATCH_SIZE = 2000
+
+
+class RejectedRow(Exception):
+    pass
+
+
+@dataclass
+class Record:
+    """Строка входа: исходные данные для файла отказов и объекты для записи."""
+
+    line: int
+    raw: dict
+    obj: object = None
+    comments: list = field(default_factory=list)
+    # ticket_external_id строки из файла комментариев.
+    key: str | None = None
+
+
+@dataclass
+class ImportStats:
+    tickets: int = 0
+    comments: int = 0
+    skipped: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self):
+        rows = self.tickets + self.comments + self.skipped + self.rejected
+        return round(rows / self.seconds) if self.seconds else 0
+
+
+def read_rows(fh, fmt):
+    """(номер строки, словарь) из открытого файла; битый JSON — тоже строка."""
+    if fmt == "csv":
+        reader = csv.DictReader(fh)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(fh, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = {"_raw": line.rstrip("\n")}
+        yield number, row
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class RejectWriter:
+    """Файл отказов в формате входа с колонками _line и _error.
+
+    Без файла (``fh=None``) отказы только считаются.
+    """
+
+    def __init__(self, fh, fmt):
+        self.fh = fh
+        self.fmt = fmt
+        self.writer = None
+
+    def write(self, record, error):
+        if self.fh is None:
+            return
+        row = {**record.raw, "_line": record.line, "_error": error}
+        if self.fmt != "csv":
+            self.fh.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+            return
+        if self.writer is None:
+            self.writer = csv.DictWriter(
+                self.fh, fieldnames=list(row), extrasaction="ignore"
+            )
+            self.writer.writeheader()
+        self.writer.writerow(row)
+
+
+def _clean_fields(model, raw, names):
+    values = {}
+    errors = []
+    for name in names:
+        model_field = model._meta.get_field(name)
+        value = raw.get(name)
+        if value in ("", None):
+            value = None if model_field.null else model_field.get_default()
+        try:
+            values[name] = model_field.clean(value, None)
+        except ValidationError as exc:
+            errors.append(f"{name}: {' '.join(exc.messages)}")
+    if errors:
+        raise RejectedRow("; ".join(errors))
+    return values
+
+
+def _clean_datetime(raw, name, default):
+    value = raw.get(name)
+    if value in ("", None):
+        return default
+    try:
+        parsed = Ticket._meta.get_field("created_at").to_python(value)
+    except ValidationError as exc:
+        raise RejectedRow(f"{name}: {' '.join(exc.messages)}") from exc
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def clean_comment(raw, ticket=None):
+    values = _clean_fields(Comment, raw, COMMENT_FIELDS)
+    values["created_at"] = _clean_datetime(raw, "created_at", timezone.now())
+    return Comment(ticket=ticket, **values)
+
+
+def clean_ticket(raw):
+    """Заявка и её комментарии из строки входа; RejectedRow при ошибке."""
+    if "_raw" in raw:
+        raise RejectedRow("Некорректный JSON.")
+    values = _clean_fields(Ticket, raw, TICKET_FIELDS)
+    external_id = str(raw.get("external_id") or "").strip() or None
+    if external_id and len(external_id) > 64:
+        raise RejectedRow("external_id: длиннее 64 символов.")
+    created_at = _clean_datetime(raw, "created_at", timezone.now())
+    updated_at = _clean_datetime(raw, "updated_at", created_at)
+    ticket = Ticket(
+        external_id=external_id,
+        created_at=created_at,
+        # Время импорта, а не исходное: иначе лента изменений не отдала бы
+        # заявку клиентам, синхронизированным раньше.
+        updated_at=timezone.now(),
+        # Время закрытия во входе не передаётся: берём последнее изменение.
+        closed_at=updated_at if values["status"] == Ticket.Status.DONE else None,
+        **values,
+    )
+    comments = []
+    for index, item in enumerate(raw.get("comments") or []):
+        try:
+            comments.append(clean_comment(item, ticket))
+        except RejectedRow as exc:
+            raise RejectedRow(f"comments[{index}]: {exc}") from exc
+    # Денормализованные поля считаем сразу: сигналы при вставке пачкой
+    # не срабатывают.
+    ticket.comment_count = len(comments)
+    ticket.last_activity_at = max(
+        [ticket.created_at, *(comment.created_at for comment in comments)]
+    )
+    return ticket, comments
+
+
+@contextmanager
+def keep_timestamps():
+    """Не даёт auto_now/auto_now_add затереть исходные даты при вставке.
+
+    bulk_create вызывает pre_save полей, и поля с auto_now_add получают
+    текущее время. Флаги снимаются на время импорта — команда работает в
+    одном потоке, поэтому это безопасно.
+    """
+    fields = [
+        Ticket._meta.get_field("created_at"),
+        Ticket._meta.get_field("updated_at"),
+        Comment._meta.get_field("created_at"),
+    ]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class BulkCreateWriter:
+    name = "bulk_create"
+
+    def __init__(self, using):
+        self.using = using
+
+    def write(self, model, objs):
+        # На SQLite и Postgres bulk_create проставляет объектам id.
+        model.objects.using(self.using).bulk_create(objs)
+
+
+class CopyWriter:
+    """COPY FROM STDIN через psycopg 3; id заявок берутся из sequence заранее,
+    чтобы сразу привязать к ним комментарии."""
+
+    name = "copy"
+
+    def __init__(self, using):
+        self.using = using
+        self.connection = connections[using]
+
+    def _reserve_ids(self, model, count):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) "
+                "FROM generate_series(1, %s)",
+                [model._meta.db_table, count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def write(self, model, objs):
+        if not objs:
+            return
+        if model is Ticket:
+            for obj, pk in zip(objs, self._reserve_ids(model, len(objs))):
+                obj.pk = pk
+        fields = [
+            f
+            for f in model._meta.concrete_fields
+            if not (f.primary_key and model is not Ticket)
+        ]
+        quote = self.connection.ops.quote_name
+        columns = ", ".join(quote(f.column) for f in fields)
+        sql = f"COPY {quote(model._meta.db_table)} ({columns}) FROM STDIN"
+        with self.connection.cursor() as cursor, cursor.copy(sql) as copy:
+            for obj in objs:
+                copy.write_row([getattr(obj, f.attname) for f in fields])
+
+
+def get_writer(using, method="auto"):
+    vendor = connections[using].vendor
+    if method == "auto":
+        method = "copy" if vendor == "postgresql" else "bulk_create"
+    if method == "copy":
+        if vendor != "postgresql":
+            raise ValueError("COPY доступен только на PostgreSQL.")
+        return CopyWriter(using)
+    return BulkCreateWriter(using)
+
+
+class Importer:
+    """Импорт в базу ``using``; ``finish()`` вызывается после всех файлов."""
+
+    def __init__(self, using, writer, batch_size=BATCH_SIZE, progress=None):
+        self.using = using
+        self.writer = writer
+        self.batch_size = batch_size
+        self.progress = progress
+        self.stats = ImportStats()
+        self.started = time.perf_counter()
+        # Заявки, которым добавили комментарии из отдельного файла.
+        self.touched_tickets = set()
+
+    def _clean(self, rows, cleaner, rejects):
+        for line, raw in rows:
+            record = Record(line, raw)
+            try:
+                cleaner(record)
+            except RejectedRow as exc:
+                self._reject(rejects, record, str(exc))
+                continue
+            yield record
+
+    def _reject(self, rejects, record, error):
+        self.stats.rejected += 1
+        rejects.write(record, error)
+
+    def _write_batch(self, records, write, rejects):
+        """Пачка целиком; при ошибке базы — по одной, чтобы найти виноватых.
+
+        Возвращает записанные строки.
+        """
+        try:
+            with transaction.atomic(using=self.using):
+                write(records)
+            return records
+        except DatabaseError:
+            for record in records:
+                self._reset_pk(record)
+        written = []
+        for record in records:
+            try:
+                with transaction.atomic(using=self.using):
+                    write([record])
+            except DatabaseError as exc:
+                self._reset_pk(record)
+                self._reject(rejects, record, f"Ошибка базы: {exc}")
+            else:
+                written.append(record)
+        return written
+
+    @staticmethod
+    def _reset_pk(record):
+        # id, выданный откатившейся вставке, не должен попасть в повтор.
+        record.obj.pk = None
+        for comment in record.comments:
+            comment.pk = None
+
+    def _report(self):
+        self.stats.seconds = time.perf_counter() - self.started
+        if self.progress:
+            self.progress(self.stats)
+
+    def import_tickets(self, rows, rejects):
+        def clean(record):
+            record.obj, record.comments = clean_ticket(record.raw)
+
+        def write(records):
+            self.writer.write(Ticket, [record.obj for record in records])
+            TicketChange.objects.using(self.using).bulk_create(
+                change for record in records for change in inserted_history(record.obj)
+            )
+            comments = []
+            for record in records:
+                for comment in record.comments:
+                    comment.ticket = record.obj
+                    comments.append(comment)
+            self.writer.write(Comment, comments)
+
+        for batch in batched(self._clean(rows, clean, rejects), self.batch_size):
+            batch = self._skip_existing(batch, rejects)
+            written = self._write_batch(batch, write, rejects)
+            self.stats.tickets += len(written)
+            self.stats.comments += sum(len(record.comments) for record in written)
+            self._report()
+
+    def _skip_existing(self, batch, rejects):
+        """Повторный запуск пропускает уже импортированные заявки."""
+        keys = [record.obj.external_id for record in batch if record.obj.external_id]
+        existing = set(
+            Ticket.objects.using(self.using)
+            .filter(external_id__in=keys)
+            .values_list("external_id", flat=True)
+        )
+        fresh = []
+        seen = set()
+        for record in batch:
+            key = record.obj.external_id
+            if key in existing:
+                self.stats.skipped += 1
+            elif key is not None and key in seen:
+                self._reject(rejects, record, "external_id повторяется во входных данных.")
+            else:
+                seen.add(key)
+                fresh.append(record)
+        return fresh
+
+    def import_comments(self, rows, rejects):
+        def clean(record):
+            record.key = str(record.raw.get("ticket_external_id") or "").strip()
+            if not record.key:
+                raise RejectedRow("Не указан ticket_external_id.")
+            record.obj = clean_comment(record.raw)
+
+        def write(records):
+            self.writer.write(Comment, [record.obj for record in records])
+
+        for batch in batched(self._clean(rows, clean, rejects), self.batch_size):
+            ticket_ids = dict(
+                Ticket.objects.using(self.using)
+                .filter(external_id__in={record.key for record in batch})
+                .values_list("external_id", "pk")
+            )
+            resolved = []
+            for record in batch:
+                if record.key not in ticket_ids:
+                    self._reject(
+                        rejects, record, "Заявка с таким ticket_external_id не найдена."
+                    )
+                    continue
+                record.obj.ticket_id = ticket_ids[record.key]
+                resolved.append(record)
+            written = self._write_batch(resolved, write, rejects)
+            self.stats.comments += len(written)
+            self.touched_tickets.update(record.obj.ticket_id for record in written)
+            self._report()
+
+    def finish(self):
+        """Пересчёт того, что при вставке пачками не обновили сигналы."""
+        for ids in batched(sorted(self.touched_tickets), self.batch_size):
+            rebuild_activity(Ticket.objects.using(self.using).filter(pk__in=ids))
+        rebuild_counters(using=self.using)
+        rebuild_stats(using=self.using)
+        self._report()
+        return self.stats
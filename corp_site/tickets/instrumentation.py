@@ -0,0 +1,91 @@
+"""Замеры запроса: SQL-запросы, их суммарное время и время рендеринга."""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from django.db import connections
+
+# Точки сохранения atomic() — не работа представления: в тестах ими
+# оборачивается каждый atomic, а в autocommit их и вовсе нет.
+TRANSACTION_CONTROL = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+@dataclass
+class RequestProfile:
+    queries: list = field(default_factory=list)
+    sql_ms: float = 0.0
+    render_ms: float = 0.0
+    total_ms: float = 0.0
+    # Число запросов в каждой пачке повторяющейся работы (см. batch()).
+    batches: list = field(default_factory=list)
+
+    @property
+    def query_count(self):
+        return len(self.queries)
+
+    @property
+    def single_batch_query_count(self):
+        """Запросы, как если бы пачка была одна — самая большая."""
+        return self.query_count - sum(self.batches) + max(self.batches, default=0)
+
+
+# Профили, в которые сейчас пишутся запросы. ContextVar, а не обёртки на
+# соединениях потока: под ASGI представление и ORM работают в потоке
+# sync_to_async, у которого свои соединения, а контекст копируется туда.
+_profiles = ContextVar("tickets_request_profiles", default=())
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper всех соединений: складывает SQL и время каждого
+    запроса в текущие профили."""
+    profiles = _profiles.get()
+    if not profiles or sql.startswith(TRANSACTION_CONTROL):
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        for profile in profiles:
+            profile.queries.append((sql, elapsed))
+            profile.sql_ms += elapsed
+
+
+def install_recorder(connection, **kwargs):
+    """connection_created: каждое новое соединение пишет в профили."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def record_queries(profile):
+    """Контекст, в котором запросы ко всем базам попадают в ``profile``.
+
+    Касается и потоков, куда контекст уходит через sync_to_async.
+    """
+    # Соединения, открытые до подключения сигнала.
+    for connection in connections.all(initialized_only=True):
+        install_recorder(connection)
+    token = _profiles.set((*_profiles.get(), profile))
+    try:
+        yield profile
+    finally:
+        _profiles.reset(token)
+
+
+@contextmanager
+def batch():
+    """Пачка повторяющейся работы, например массового действия.
+
+    Число пачек зависит от объёма данных, поэтому бюджет с ``per_batch``
+    считает только самую большую из них.
+    """
+    profiles = _profiles.get()
+    before = [profile.query_count for profile in profiles]
+    try:
+        yield
+    finally:
+        for profile, count in zip(profiles, before):
+            profile.batches.append(profile.query_count - count)
@@ -0,0 +1,365 @@
+"""Фоновые задачи без внешнего брокера: очередь — таблица ``Job``.
+
+Задача — функция, зарегистрированная декоратором ``@task("имя")``;
+аргументы (JSON) хранятся в строке таблицы и передаются ей как именованные.
+``enqueue`` ставит задачу в текущей транзакции (откат её отменит),
+``enqueue_on_commit`` — после коммита, как publish_on_commit для событий.
+Выполняет задачи команда ``run_worker`` в нескольких потоках.
+
+Воркер берёт задачу одним запросом
+``UPDATE ... WHERE id = (SELECT ... LIMIT 1) RETURNING *``:
+
+* на Postgres подзапрос идёт с ``FOR UPDATE SKIP LOCKED``: воркеры не ждут
+  друг друга и не берут одну задачу дважды;
+* SQLite на время записи блокирует всю базу, так что строку получает
+  только один; потоки одного воркера к тому же пишут в очередь по одному,
+  под общей блокировкой, а не соревнуются за блокировку базы.
+
+Сама задача выполняется вне этой транзакции. Упавшая задача возвращается в
+очередь с паузой, которая удваивается с каждой попыткой; после
+``max_attempts`` попыток она остаётся в статусе «не выполнена» с текстом
+ошибки. Задача воркера, который так и не отчитался (процесс убит), через
+TICKETS_JOBS_LEASE_SECONDS снова попадает в очередь, поэтому задачи должны
+выдерживать повторный запуск. Долгие задачи продлевают аренду вызовом
+``heartbeat()`` между порциями работы.
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+import uuid
+from collections import Counter
+from contextlib import nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    DatabaseError,
+    close_old_connections,
+    connections,
+    transaction,
+)
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger("tickets.jobs")
+
+# Как часто воркер возвращает в очередь задачи зависших воркеров.
+SWEEP_SECONDS = 60
+
+# Задача, которую выполняет текущий поток воркера: (воркер, задача).
+_current_job = ContextVar("tickets_current_job", default=None)
+
+
+@dataclass(frozen=True)
+class Task:
+    func: object
+    max_attempts: int | None = None
+
+
+TASKS = {}
+
+
+def task(name, max_attempts=None):
+    """Регистрирует функцию как задачу ``name``.
+
+    ``max_attempts`` — число попыток, если оно отличается от
+    TICKETS_JOBS_MAX_ATTEMPTS.
+    """
+
+    def register(func):
+        if name in TASKS:
+            raise ValueError(f"Задача {name!r} уже зарегистрирована.")
+        TASKS[name] = Task(func, max_attempts)
+        return func
+
+    return register
+
+
+def _get_task(name):
+    try:
+        return TASKS[name]
+    except KeyError:
+        raise LookupError(f"Неизвестная задача {name!r}.") from None
+
+
+def enqueue(name, payload=None, *, delay=0, using=DEFAULT_DB_ALIAS):
+    """Ставит задачу в очередь; воркеры увидят её после коммита."""
+    entry = _get_task(name)
+    return Job.objects.using(using).create(
+        name=name,
+        payload=payload or {},
+        max_attempts=entry.max_attempts or settings.TICKETS_JOBS_MAX_ATTEMPTS,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_on_commit(name, payload=None, *, delay=0, using=DEFAULT_DB_ALIAS):
+    """Ставит задачу после коммита текущей транзакции (вне её — сразу).
+
+    Для побочных действий представлений и сигналов: при откате задачи нет,
+    и транзакция запроса не держит строку очереди.
+    """
+    _get_task(name)
+    transaction.on_commit(
+        lambda: enqueue(name, payload, delay=delay, using=using), using=using
+    )
+
+
+def heartbeat():
+    """Продлевает аренду задачи, которую выполняет текущий поток.
+
+    Вне задачи ничего не делает, так что её можно звать из общего кода
+    (``bulk`` зовёт её после каждой порции). Пишет в базу не чаще раза в
+    треть TICKETS_JOBS_LEASE_SECONDS. Возвращает False, если задачу уже
+    забрал другой воркер.
+    """
+    current = _current_job.get()
+    if current is None:
+        return True
+    worker, job = current
+    return worker.renew(job)
+
+
+def retry_delay(attempt):
+    """Пауза в секундах перед попыткой ``attempt + 1``: удваивается с каждой
+    попыткой и разбрасывается на ±20 %, чтобы повторы не шли волной."""
+    delay = min(
+        settings.TICKETS_JOBS_RETRY_DELAY * 2 ** (attempt - 1),
+        settings.TICKETS_JOBS_RETRY_MAX_DELAY,
+    )
+    return delay * random.uniform(0.8, 1.2)
+
+
+def retry_jobs(queryset):
+    """Возвращает задачи в очередь с полным числом попыток (для админки)."""
+    return queryset.update(
+        status=Job.Status.QUEUED,
+        attempts=0,
+        run_at=timezone.now(),
+        locked_by="",
+        locked_at=None,
+        last_error="",
+    )
+
+
+class Worker:
+    """Выполняет задачи из очереди в ``concurrency`` потоках.
+
+    ``run(burst=True)`` выполняет всё, что готово, и возвращается — для
+    тестов, бенчмарков и запуска по расписанию.
+    """
+
+    def __init__(self, concurrency=1, using=DEFAULT_DB_ALIAS, poll=None, name=None):
+        self.concurrency = concurrency
+        self.using = using
+        self.poll = settings.TICKETS_JOBS_POLL_SECONDS if poll is None else poll
+        self.name = (name or f"{socket.gethostname()}:{os.getpid()}")[:80]
+        self.stopping = threading.Event()
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._next_sweep = 0
+        self._skip_locked = connections[using].features.has_select_for_update_skip_locked
+        # Без SKIP LOCKED (SQLite) потоки пишут в очередь по очереди: иначе
+        # они только мешали бы друг другу блокировкой базы.
+        self._queue_lock = nullcontext() if self._skip_locked else threading.Lock()
+
+    def stop(self):
+        """Потоки доделывают текущие задачи и выходят."""
+        self.stopping.set()
+
+    def _count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def _ready(self):
+        return (
+            Job.objects.using(self.using)
+            .filter(status=Job.Status.QUEUED, run_at__lte=timezone.now())
+            .order_by("run_at", "id")
+        )
+
+    def claim(self):
+        """Берёт одну готовую задачу; None, если брать нечего."""
+        now = timezone.now()
+        # Метка выборки: по ней воркер отчитывается только о своей задаче,
+        # даже если её, сочтя зависшей, уже взял другой.
+        token = f"{self.name}:{uuid.uuid4().hex[:12]}"
+        connection = connections[self.using]
+        jobs = Job.objects.using(self.using)
+        if not connection.features.can_return_columns_from_insert:
+            # Без RETURNING: отметить, потом прочитать по метке.
+            with self._queue_lock:
+                taken = jobs.filter(
+                    pk__in=self._ready().values("pk")[:1], status=Job.Status.QUEUED
+                ).update(
+                    status=Job.Status.RUNNING,
+                    locked_by=token,
+                    locked_at=now,
+                    attempts=F("attempts") + 1,
+                )
+                return jobs.get(locked_by=token) if taken else None
+        table = connection.ops.quote_name(Job._meta.db_table)
+        lock = " FOR UPDATE SKIP LOCKED" if self._skip_locked else ""
+        now = connection.ops.adapt_datetimefield_value(now)
+        with self._queue_lock:
+            taken = list(
+                jobs.raw(
+                    f"UPDATE {table} SET status = %s, locked_by = %s, locked_at = %s, "
+                    f"attempts = attempts + 1 WHERE id = ("
+                    f"SELECT id FROM {table} WHERE status = %s AND run_at <= %s "
+                    f"ORDER BY run_at, id LIMIT 1{lock}) RETURNING *",
+                    [Job.Status.RUNNING, token, now, Job.Status.QUEUED, now],
+                )
+            )
+        return taken[0] if taken else None
+
+    def renew(self, job):
+        """Сдвигает ``locked_at`` задачи, чтобы requeue_stale её не забрал."""
+        now = time.monotonic()
+        if now - getattr(job, "_renewed", 0) < settings.TICKETS_JOBS_LEASE_SECONDS / 3:
+            return True
+        job._renewed = now
+        with self._queue_lock:
+            return bool(
+                Job.objects.using(self.using)
+                .filter(pk=job.pk, locked_by=job.locked_by, status=Job.Status.RUNNING)
+                .update(locked_at=timezone.now())
+            )
+
+    def execute(self, job):
+        """Выполняет взятую задачу и отмечает результат."""
+        jobs = Job.objects.using(self.using).filter(pk=job.pk, locked_by=job.locked_by)
+        entry = TASKS.get(job.name)
+        started = time.perf_counter()
+        # Аренда только что взята: первое продление — через треть срока.
+        job._renewed = time.monotonic()
+        token = _current_job.set((self, job))
+        try:
+            if entry is None:
+                raise LookupError(f"Неизвестная задача {job.name!r}.")
+            entry.func(**job.payload)
+        except Exception:
+            error = traceback.format_exc()
+            if entry is not None and job.attempts < job.max_attempts:
+                delay = retry_delay(job.attempts)
+                with self._queue_lock:
+                    jobs.update(
+                        status=Job.Status.QUEUED,
+                        run_at=timezone.now() + timedelta(seconds=delay),
+                        locked_by="",
+                        locked_at=None,
+                        last_error=error,
+                    )
+                self._count("retried")
+                logger.warning(
+                    "Задача %s #%s упала (попытка %s из %s), повтор через %.0f с",
+                    job.name, job.pk, job.attempts, job.max_attempts, delay,
+                    exc_info=True,
+                )
+            else:
+                with self._queue_lock:
+                    jobs.update(status=Job.Status.DEAD, locked_by="", last_error=error)
+                self._count("dead")
+                logger.error(
+                    "Задача %s #%s не выполнена после %s попыток",
+                    job.name, job.pk, job.attempts, exc_info=True,
+                )
+        else:
+            # Выполненные задачи не копятся в таблице очереди.
+            with self._queue_lock:
+                jobs.delete()
+            self._count("done")
+            logger.debug(
+                "Задача %s #%s выполнена за %.1f мс",
+                job.name, job.pk, (time.perf_counter() - started) * 1000,
+            )
+        finally:
+            _current_job.reset(token)
+
+    def requeue_stale(self):
+        """Возвращает в очередь задачи, которые воркер не завершил за
+        TICKETS_JOBS_LEASE_SECONDS; исчерпавшие попытки — в «не выполнена»."""
+        stale = Job.objects.using(self.using).filter(
+            status=Job.Status.RUNNING,
+            locked_at__lt=timezone.now()
+            - timedelta(seconds=settings.TICKETS_JOBS_LEASE_SECONDS),
+        )
+        error = "Воркер не завершил задачу за отведённое время."
+        with self._queue_lock:
+            stale.filter(attempts__gte=F("max_attempts")).update(
+                status=Job.Status.DEAD, locked_by="", last_error=error
+            )
+            return stale.update(
+                status=Job.Status.QUEUED, locked_by="", locked_at=None, last_error=error
+            )
+
+    def _sweep_due(self):
+        with self._lock:
+            now = time.monotonic()
+            if now < self._next_sweep:
+                return False
+            self._next_sweep = now + SWEEP_SECONDS
+            return True
+
+    def _loop(self, burst, own_connections):
+        try:
+            while not self.stopping.is_set():
+                if own_connections:
+                    # Как в начале запроса: битые и старые соединения
+                    # закрываются, Django откроет новые.
+                    close_old_connections()
+                try:
+                    # По времени, а не только когда очередь пуста: под
+                    # постоянной нагрузкой задачи упавших воркеров иначе
+                    # не вернулись бы никогда.
+                    if self._sweep_due():
+                        self.requeue_stale()
+                    job = self.claim()
+                    if job is not None:
+                        self.execute(job)
+                        continue
+                except DatabaseError:
+                    # База недоступна или занята: задача, если её успели
+                    # взять, вернётся в очередь по истечении аренды.
+                    logger.exception("Ошибка базы в очереди задач")
+                    self.stopping.wait(self.poll)
+                    continue
+                if burst:
+                    return
+                self.stopping.wait(self.poll)
+        finally:
+            if own_connections:
+                connections.close_all()
+
+    def run(self, burst=False):
+        if self.concurrency == 1 and burst:
+            # В текущем потоке и его соединении: задачи видят данные
+            # незакоммиченной транзакции (тесты).
+            self._loop(burst, own_connections=False)
+            return self.stats
+        threads = [
+            threading.Thread(
+                target=self._loop,
+                args=(burst, True),
+                name=f"tickets-worker-{n}",
+                daemon=True,
+            )
+            for n in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            # join с таймаутом, чтобы главный поток получал сигналы.
+            while thread.is_alive():
+                thread.join(0.5)
+        return self.stats
@@ -0,0 +1,64 @@
+import json
+from importlib import import_module
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from tickets.benchmarks import SUITES
+
+
+class Command(BaseCommand):
+    help = (
+        "Запускает набор бенчмарков на одноразовой тестовой базе "
+        "и печатает результаты в JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("suite", choices=sorted(SUITES))
+        parser.add_argument(
+            "--size",
+            type=int,
+            action="append",
+            dest="sizes",
+            help="Число заявок; можно указать несколько раз.",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Файл для JSON с результатами.")
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Не удалять тестовую базу, чтобы не генерировать данные заново.",
+        )
+
+    def handle(self, *args, **options):
+        module = import_module(SUITES[options["suite"]])
+        sizes = sorted(options["sizes"] or module.DEFAULT_SIZES)
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False, keepdb=options["keepdb"]
+        )
+        started_at = timezone.now()
+        try:
+            results = module.run(sizes=sizes, repeat=options["repeat"], seed=options["seed"])
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+        payload = {
+            "suite": options["suite"],
+            "vendor": connection.vendor,
+            "started_at": started_at.isoformat(),
+            "results": results,
+        }
+        text = json.dumps(payload, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as fh:
+                fh.write(text + "\n")
+            for row in results:
+                self.stderr.write(
+                    " ".join(f"{key}={value}" for key, value in row.items())
+                )
+        else:
+            self.stdout.write(text)
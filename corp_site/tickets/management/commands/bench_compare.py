@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.benchmarks import METRIC_KEYS
+
+HIGHER_IS_BETTER = {"rows_per_second", "rps"}
+
+
+def case_key(row):
+    return tuple(sorted((key, row[key]) for key in row if key not in METRIC_KEYS))
+
+
+def load(path):
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)["results"]
+    except (OSError, ValueError, KeyError) as exc:
+        raise CommandError(f"Не удалось прочитать результаты {path}: {exc}") from exc
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает два JSON-файла bench --output: изменения перцентилей "
+        "и числа запросов по каждому случаю."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("before")
+        parser.add_argument("after")
+        parser.add_argument(
+            "--metric",
+            action="append",
+            dest="metrics",
+            help="Что сравнивать; по умолчанию p50_ms, p95_ms и queries.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.0,
+            help="Показывать только изменения больше этого процента.",
+        )
+
+    def handle(self, *args, **options):
+        metrics = options["metrics"] or ["p50_ms", "p95_ms", "queries"]
+        before = {case_key(row): row for row in load(options["before"])}
+        after = {case_key(row): row for row in load(options["after"])}
+        for key in sorted(before.keys() ^ after.keys(), key=repr):
+            side = "только в before" if key not in after else "только в after"
+            self.stdout.write(f"{self.describe(key)}: {side}")
+        for key in sorted(before.keys() & after.keys(), key=repr):
+            changes = []
+            for metric in metrics:
+                old, new = before[key].get(metric), after[key].get(metric)
+                if old is None or new is None:
+                    continue
+                delta = (new - old) / old * 100 if old else (0.0 if new == old else 100.0)
+                if new == old or abs(delta) <= options["threshold"]:
+                    continue
+                worse = delta < 0 if metric in HIGHER_IS_BETTER else delta > 0
+                style = self.style.ERROR if worse else self.style.SUCCESS
+                changes.append(style(f"{metric} {old} → {new} ({delta:+.1f}%)"))
+            if changes:
+                self.stdout.write(f"{self.describe(key)}: " + ", ".join(changes))
+
+    @staticmethod
+    def describe(key):
+        return " ".join(f"{name}={value}" for name, value in key if name != "vendor")
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from tickets.export import CHUNK_SIZE, FORMATS, stream_export
+from tickets.filters import TicketFilters
+
+
+class Command(BaseCommand):
+    help = (
+        "Потоково выгружает заявки в CSV или NDJSON с теми же фильтрами, "
+        "что у списка."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--comments", action="store_true", help="Добавить комментарии.")
+        parser.add_argument("-q", "--query", default="", help="Текстовый поиск.")
+        parser.add_argument("--status", default="")
+        parser.add_argument("--priority", default="")
+        parser.add_argument("--sort", default="")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument("--output", help="Файл; по умолчанию stdout.")
+
+    def handle(self, *args, **options):
+        filters = TicketFilters.from_params(
+            {
+                "q": options["query"],
+                "status": options["status"],
+                "priority": options["priority"],
+                "sort": options["sort"],
+            }
+        )
+        chunks = stream_export(
+            filters,
+            options["format"],
+            with_comments=options["comments"],
+            chunk_size=options["chunk_size"],
+        )
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as fh:
+                fh.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
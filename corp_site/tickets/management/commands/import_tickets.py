@@ -0,0 +1,104 @@
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from tickets.importer import (
+    BATCH_SIZE,
+    Importer,
+    RejectWriter,
+    get_writer,
+    keep_timestamps,
+    read_rows,
+)
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def detect_format(path, explicit):
+    if explicit:
+        return explicit
+    try:
+        return FORMATS[Path(path).suffix.lower()]
+    except KeyError:
+        raise CommandError(
+            f"Не удалось определить формат {path}: укажите --format."
+        ) from None
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует заявки (и комментарии) из CSV или NDJSON пачками: COPY на "
+        "Postgres, bulk_create на остальных базах. Отклонённые строки "
+        "записываются в файл <вход>.rejects."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("tickets", nargs="?", help="Файл заявок.")
+        parser.add_argument(
+            "--comments",
+            help="Файл комментариев с колонкой ticket_external_id.",
+        )
+        parser.add_argument("--format", choices=["csv", "ndjson"])
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--method", choices=["auto", "copy", "bulk_create"], default="auto"
+        )
+        parser.add_argument(
+            "--no-rejects",
+            action="store_true",
+            help="Не писать файлы отказов, только считать их.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if not options["tickets"] and not options["comments"]:
+            raise CommandError("Укажите файл заявок и/или --comments.")
+        try:
+            writer = get_writer(options["database"], options["method"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        importer = Importer(
+            options["database"],
+            writer,
+            batch_size=options["batch_size"],
+            progress=self.report if options["verbosity"] > 1 else None,
+        )
+        inputs = [
+            (options["tickets"], importer.import_tickets),
+            (options["comments"], importer.import_comments),
+        ]
+        with keep_timestamps():
+            for path, run in inputs:
+                if not path:
+                    continue
+                fmt = detect_format(path, options["format"])
+                with ExitStack() as stack:
+                    source = stack.enter_context(
+                        open(path, encoding="utf-8", newline="")
+                    )
+                    rejects = None
+                    if not options["no_rejects"]:
+                        rejects = stack.enter_context(
+                            open(f"{path}.rejects", "w", encoding="utf-8", newline="")
+                        )
+                    run(read_rows(source, fmt), RejectWriter(rejects, fmt))
+                    if rejects is not None and rejects.tell() == 0:
+                        # Отказов нет — пустой файл не оставляем.
+                        rejects.close()
+                        Path(rejects.name).unlink()
+        stats = importer.finish()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Заявок: {stats.tickets}, комментариев: {stats.comments}, "
+                f"пропущено повторов: {stats.skipped}, отклонено: {stats.rejected}. "
+                f"{stats.seconds:.1f} с, {stats.rows_per_second} строк/с."
+            )
+        )
+
+    def report(self, stats):
+        self.stderr.write(
+            f"… заявок {stats.tickets}, комментариев {stats.comments}, "
+            f"{stats.rows_per_second} строк/с"
+        )
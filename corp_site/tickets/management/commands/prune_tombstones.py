@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from tickets.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет записи об удалённых заявках и комментариях старше "
+        "TICKETS_SYNC_TOMBSTONE_DAYS дней."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones(using=options["database"])
+        self.stdout.write(self.style.SUCCESS(f"Удалено записей: {deleted}."))
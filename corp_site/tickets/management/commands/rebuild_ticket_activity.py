@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from tickets.activity import rebuild_activity
+from tickets.models import Ticket
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает comment_count и last_activity_at у всех заявок пачками."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        updated = rebuild_activity(
+            Ticket.objects.using(options["database"]),
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Обновлено заявок: {updated}."))
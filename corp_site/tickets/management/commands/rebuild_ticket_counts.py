@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from tickets.counts import rebuild_counters
+from tickets.models import TicketCounter
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает счётчики заявок по статусу и приоритету "
+        "(нужно после массовых изменений в обход ORM)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        rebuild_counters(using=options["database"])
+        total = sum(
+            TicketCounter.objects.using(options["database"]).values_list("count", flat=True)
+        )
+        self.stdout.write(self.style.SUCCESS(f"Счётчики пересчитаны: {total} заявок."))
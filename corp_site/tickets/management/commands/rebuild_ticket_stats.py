@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from tickets.models import TicketDailyStats
+from tickets.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает сводки заявок по дням для страницы статистики "
+        "(после загрузки данных и изменений в обход ORM)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        rebuild_stats(using=options["database"])
+        days = TicketDailyStats.objects.using(options["database"]).count()
+        self.stdout.write(self.style.SUCCESS(f"Сводки пересчитаны: {days} дней."))
@@ -0,0 +1,39 @@
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from tickets.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет фоновые задачи из таблицы Job. SIGINT/SIGTERM — доделать "
+        "текущие задачи и выйти."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=4, help="Число потоков-исполнителей."
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Выполнить готовые задачи и выйти, не дожидаясь новых.",
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        worker = Worker(concurrency=options["concurrency"], using=options["database"])
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: worker.stop())
+        self.stderr.write(
+            f"Воркер {worker.name}: потоков {worker.concurrency}, база {worker.using}."
+        )
+        stats = worker.run(burst=options["burst"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Выполнено: {stats['done']}, повторов: {stats['retried']}, "
+                f"не выполнено: {stats['dead']}."
+            )
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from tickets.benchmarks.data import ensure_tickets
+from tickets.models import Comment, Ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Дополняет базу синтетическими заявками и комментариями до заданного "
+        "числа заявок (детерминированно по --seed)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("count", type=int, help="Сколько заявок должно быть в базе.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--no-comments", action="store_true", help="Не создавать комментарии."
+        )
+
+    def handle(self, *args, **options):
+        ensure_tickets(
+            options["count"], seed=options["seed"], comments=not options["no_comments"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Заявок: {Ticket.objects.count()}, комментариев: {Comment.objects.count()}."
+            )
+        )
@@ -0,0 +1,57 @@
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from tickets.history import status_transitions, time_in_status
+from tickets.models import Ticket
+
+
+def parse_day(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Дата в формате ГГГГ-ММ-ДД: {value}") from None
+
+
+def hours(delta):
+    return f"{delta.total_seconds() / 3600:.1f}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Отчёт по истории заявок за период: сколько времени заявки провели "
+        "в каждом статусе и сколько было переходов между статусами."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", type=parse_day, help="Первый день; по умолчанию 30 дней назад.")
+        parser.add_argument("--until", type=parse_day, help="Последний день; по умолчанию сегодня.")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        until = options["until"] or timezone.localdate()
+        since = options["since"] or until - timedelta(days=29)
+        if since > until:
+            raise CommandError("--since позже --until.")
+        tz = timezone.get_current_timezone()
+        start = datetime.combine(since, time.min, tz)
+        end = datetime.combine(until + timedelta(days=1), time.min, tz)
+        using = options["database"]
+        labels = dict(Ticket.Status.choices)
+
+        self.stdout.write(f"Период: {since:%d.%m.%Y} — {until:%d.%m.%Y}")
+        self.stdout.write("\nВремя в статусе (часы): всего, отрезков, в среднем")
+        for status, spent in time_in_status(start, end, using=using).items():
+            self.stdout.write(
+                f"  {labels[status]}: {hours(spent.total)}, {spent.spans}, "
+                f"{hours(spent.average)}"
+            )
+        self.stdout.write("\nПереходы")
+        transitions = status_transitions(start, end, using=using)
+        for (previous, status), count in sorted(
+            transitions.items(), key=lambda item: -item[1]
+        ):
+            source = labels.get(previous, "создана")
+            self.stdout.write(f"  {source} → {labels[status]}: {count}")
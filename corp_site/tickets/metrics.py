@@ -0,0 +1,143 @@
+"""Гистограммы запросов по представлениям в текстовом формате Prometheus.
+
+Каждый процесс копит гистограммы у себя: корзины фиксированные, на запрос —
+несколько инкрементов списка под блокировкой. Если задан
+``TICKETS_METRICS_DIR``, процесс не чаще раза в
+``TICKETS_METRICS_FLUSH_SECONDS`` сбрасывает свои счётчики в файл
+``<pid>.json`` этого каталога, а страница метрик складывает файлы всех
+воркеров gunicorn. Файлы завершившихся воркеров остаются, поэтому счётчики
+не убывают; каталог очищают при старте сервиса.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+HISTOGRAMS = {
+    "request_seconds": ("Время обработки запроса, с.", SECONDS_BUCKETS),
+    "db_seconds": ("Суммарное время SQL-запросов, с.", SECONDS_BUCKETS),
+    "render_seconds": ("Время рендеринга шаблона, с.", SECONDS_BUCKETS),
+    "queries": ("Число SQL-запросов.", (0, 1, 2, 3, 5, 10, 25, 50, 100)),
+}
+
+# (гистограмма, представление) -> [счётчики корзин..., +Inf, сумма]
+_histograms = {}
+_lock = threading.Lock()
+_last_flush = 0.0
+
+
+def observe(view, profile):
+    values = {
+        "request_seconds": profile.total_ms / 1000,
+        "db_seconds": profile.sql_ms / 1000,
+        "render_seconds": profile.render_ms / 1000,
+        "queries": profile.query_count,
+    }
+    with _lock:
+        for name, value in values.items():
+            buckets = HISTOGRAMS[name][1]
+            row = _histograms.get((name, view))
+            if row is None:
+                row = _histograms[(name, view)] = [0] * (len(buckets) + 2)
+            row[bisect_left(buckets, value)] += 1
+            row[-1] += value
+    _maybe_flush()
+
+
+def local_metrics():
+    """Гистограммы этого процесса: {гистограмма: {представление: строка}}."""
+    with _lock:
+        items = [(key, list(row)) for key, row in _histograms.items()]
+    data = {}
+    for (name, view), row in items:
+        data.setdefault(name, {})[view] = row
+    return data
+
+
+def reset_metrics():
+    with _lock:
+        _histograms.clear()
+
+
+def flush():
+    directory = settings.TICKETS_METRICS_DIR
+    if not directory:
+        return
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    target = path / f"{os.getpid()}.json"
+    # Пишем во временный файл и подменяем: читатель не увидит половину JSON.
+    tmp = path / f"{os.getpid()}.{threading.get_ident()}.tmp"
+    tmp.write_text(json.dumps(local_metrics()))
+    os.replace(tmp, target)
+
+
+def _maybe_flush():
+    global _last_flush
+    if not settings.TICKETS_METRICS_DIR:
+        return
+    now = time.monotonic()
+    if now - _last_flush < settings.TICKETS_METRICS_FLUSH_SECONDS:
+        return
+    _last_flush = now
+    flush()
+
+
+def _merge(merged, data):
+    for name, views in data.items():
+        if name not in HISTOGRAMS:
+            continue
+        size = len(HISTOGRAMS[name][1]) + 2
+        for view, row in views.items():
+            if len(row) != size:
+                # Файл записан со старым набором корзин.
+                continue
+            target = merged.setdefault(name, {}).setdefault(view, [0] * size)
+            for index, value in enumerate(row):
+                target[index] += value
+
+
+def collect():
+    """Гистограммы всех воркеров: файлы каталога и свежие счётчики своего."""
+    merged = {}
+    directory = settings.TICKETS_METRICS_DIR
+    if directory and os.path.isdir(directory):
+        own = f"{os.getpid()}.json"
+        for entry in sorted(Path(directory).glob("*.json")):
+            if entry.name == own:
+                continue
+            try:
+                _merge(merged, json.loads(entry.read_text()))
+            except (OSError, ValueError):
+                continue
+    _merge(merged, local_metrics())
+    return merged
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(data):
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        metric = f"tickets_{name}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        bounds = [f"{bound:g}" for bound in buckets] + ["+Inf"]
+        for view, row in sorted(data.get(name, {}).items()):
+            labels = f'view="{_label(view)}"'
+            total = 0
+            for bound, count in zip(bounds, row[:-1]):
+                total += count
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {total}')
+            lines.append(f"{metric}_sum{{{labels}}} {row[-1]:g}")
+            lines.append(f"{metric}_count{{{labels}}} {total}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,124 @@
+"""Замеры запросов: бюджеты, гистограммы и выборочный профиль.
+
+Один замер (SQL-запросы, их время, время рендеринга и всего запроса)
+используют:
+
+- бюджеты запросов (``TICKETS_QUERY_BUDGETS``): ``warn`` пишет превышения
+  в лог (по умолчанию при DEBUG), ``raise`` бросает BudgetExceeded (так
+  работают тесты), ``off`` не проверяет;
+- гистограммы по представлениям для /metrics/ (``TICKETS_METRICS``) и
+  выборочный cProfile медленных запросов (``TICKETS_PROFILE_EVERY``).
+
+Middleware должен стоять последним в MIDDLEWARE: тогда замер охватывает
+только представление и рендеринг шаблона, а сессия и пользователь уже
+загружены.
+"""
+
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from . import metrics, profiling
+from .budgets import check_budget
+from .instrumentation import RequestProfile, record_queries
+
+logger = logging.getLogger("tickets.budgets")
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+class RequestProfileMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        budgets = settings.TICKETS_QUERY_BUDGETS
+        if budgets == "off" and not settings.TICKETS_METRICS:
+            return self.get_response(request)
+        user = getattr(request, "user", None)
+        if user is not None:
+            # Ленивый пользователь грузится вне бюджета представления.
+            user.is_authenticated
+        profile, started = self.start(request)
+        try:
+            with record_queries(profile):
+                response = self.get_response(request)
+        finally:
+            self.stop(request, profile, started)
+        self.finish(request, profile, budgets)
+        return response
+
+    async def __acall__(self, request):
+        budgets = settings.TICKETS_QUERY_BUDGETS
+        if budgets == "off" and not settings.TICKETS_METRICS:
+            return await self.get_response(request)
+        if hasattr(request, "auser"):
+            request.user = await request.auser()
+        profile, started = self.start(request)
+        try:
+            with record_queries(profile):
+                response = await self.get_response(request)
+        finally:
+            self.stop(request, profile, started)
+        self.finish(request, profile, budgets)
+        return response
+
+    def start(self, request):
+        profile = request.request_profile = RequestProfile()
+        return profile, time.perf_counter()
+
+    def stop(self, request, profile, started):
+        finished = time.perf_counter()
+        profile.total_ms = (finished - started) * 1000
+        render_started = getattr(request, "_render_started", None)
+        if render_started is not None:
+            profile.render_ms = (finished - render_started) * 1000
+        profiler = getattr(request, "_profiler", None)
+        if profiler is not None:
+            profiling.stop(profiler)
+
+    def finish(self, request, profile, budgets):
+        match = request.resolver_match
+        if match is None:
+            return
+        if settings.TICKETS_METRICS:
+            profiler = getattr(request, "_profiler", None)
+            metrics.observe(match.view_name, profile)
+            profiling.finish(match.view_name, profile.total_ms, profiler)
+        if budgets != "off":
+            self.check(request, profile, budgets)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if settings.TICKETS_METRICS:
+            request._profiler = profiling.start(request.resolver_match.view_name)
+
+    def process_template_response(self, request, response):
+        # Вызывается последним перед response.render().
+        request._render_started = time.perf_counter()
+        return response
+
+    def check(self, request, profile, mode):
+        match = request.resolver_match
+        problems = check_budget(match.url_name, profile)
+        if not problems:
+            return
+        message = (
+            f"{request.method} {request.path} ({match.url_name}) превышает бюджет: "
+            + ", ".join(problems)
+        )
+        if mode == "raise":
+            queries = "\n".join(f"  {sql}" for sql, _ in profile.queries)
+            raise BudgetExceeded(f"{message}\n{queries}")
+        logger.warning(message)
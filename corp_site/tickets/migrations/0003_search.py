@@ -0,0 +1,80 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE tickets_ticket ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('russian'::regconfig, coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX ticket_search_vector_idx ON tickets_ticket USING GIN (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS ticket_search_vector_idx",
+    "ALTER TABLE tickets_ticket DROP COLUMN IF EXISTS search_vector",
+]
+
+# Копия SQLiteFTSSearchBackend.install на момент миграции: правки поиска не
+# должны менять то, что делает уже выпущенная миграция.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS tickets_ticket_fts USING fts5(
+        title, description, content='tickets_ticket', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_ticket_fts_ai AFTER INSERT ON tickets_ticket BEGIN
+        INSERT INTO tickets_ticket_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_ticket_fts_ad AFTER DELETE ON tickets_ticket BEGIN
+        INSERT INTO tickets_ticket_fts(tickets_ticket_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS tickets_ticket_fts_au
+    AFTER UPDATE OF title, description ON tickets_ticket BEGIN
+        INSERT INTO tickets_ticket_fts(tickets_ticket_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tickets_ticket_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO tickets_ticket_fts(tickets_ticket_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS tickets_ticket_fts_ai",
+    "DROP TRIGGER IF EXISTS tickets_ticket_fts_ad",
+    "DROP TRIGGER IF EXISTS tickets_ticket_fts_au",
+    "DROP TABLE IF EXISTS tickets_ticket_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD}
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    statements = {"postgresql": POSTGRES_BACKWARD, "sqlite": SQLITE_BACKWARD}
+    for sql in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0002_list_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
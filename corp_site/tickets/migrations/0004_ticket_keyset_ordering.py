@@ -0,0 +1,64 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0003_search"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="ticket",
+            options={
+                "ordering": ["-created_at", "-id"],
+                "verbose_name": "Заявка",
+                "verbose_name_plural": "Заявки",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="ticket_created_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="ticket_status_created_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="ticket_priority_created_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ticket",
+            name="ticket_status_prio_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["-created_at", "-id"], name="ticket_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["status", "-created_at", "-id"],
+                name="ticket_status_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["priority", "-created_at", "-id"],
+                name="ticket_priority_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["status", "priority", "-created_at", "-id"],
+                name="ticket_status_prio_created_idx",
+            ),
+        ),
+    ]
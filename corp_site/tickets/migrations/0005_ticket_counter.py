@@ -0,0 +1,69 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:55
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    Ticket = apps.get_model("tickets", "Ticket")
+    TicketCounter = apps.get_model("tickets", "TicketCounter")
+    db = schema_editor.connection.alias
+    rows = Ticket.objects.using(db).values("status", "priority").annotate(n=Count("id"))
+    TicketCounter.objects.using(db).bulk_create(
+        TicketCounter(status=row["status"], priority=row["priority"], count=row["n"])
+        for row in rows.order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0004_ticket_keyset_ordering"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TicketCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("new", "Новая"),
+                            ("in_progress", "В работе"),
+                            ("done", "Завершена"),
+                        ],
+                        max_length=20,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "priority",
+                    models.IntegerField(
+                        choices=[(1, "Низкий"), (2, "Средний"), (3, "Высокий")],
+                        verbose_name="Приоритет",
+                    ),
+                ),
+                ("count", models.IntegerField(default=0, verbose_name="Количество")),
+            ],
+            options={
+                "verbose_name": "Счётчик заявок",
+                "verbose_name_plural": "Счётчики заявок",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("status", "priority"), name="ticket_counter_bucket_uniq"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:20
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_activity(apps, schema_editor):
+    # Выражения повторяют tickets/activity.py на момент миграции: модуль
+    # приложения может измениться, а миграция — нет.
+    Ticket = apps.get_model("tickets", "Ticket")
+    Comment = apps.get_model("tickets", "Comment")
+    db = schema_editor.connection.alias
+    comments = Comment.objects.using(db).filter(ticket=OuterRef("pk"))
+    Ticket.objects.using(db).update(
+        comment_count=Coalesce(
+            Subquery(
+                comments.order_by().values("ticket").annotate(n=Count("pk")).values("n")
+            ),
+            0,
+        ),
+        last_activity_at=Coalesce(
+            Subquery(comments.order_by("-created_at").values("created_at")[:1]),
+            F("created_at"),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0005_ticket_counter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="comment_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Комментариев"
+            ),
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="last_activity_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                editable=False,
+                verbose_name="Последняя активность",
+            ),
+        ),
+        migrations.RunPython(fill_activity, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                fields=["-last_activity_at", "-id"], name="ticket_activity_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 13:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0006_ticket_activity"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="comment",
+            options={
+                "ordering": ["created_at", "id"],
+                "verbose_name": "Комментарий",
+                "verbose_name_plural": "Комментарии",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="comment",
+            name="comment_ticket_created_idx",
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["ticket", "created_at", "id"], name="comment_ticket_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0007_comment_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticketcounter",
+            name="changed_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Изменено"),
+        ),
+        migrations.AddField(
+            model_name="ticketcounter",
+            name="version",
+            field=models.PositiveBigIntegerField(default=0, verbose_name="Версия"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0008_ticket_counter_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticket",
+            name="external_id",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=64,
+                null=True,
+                unique=True,
+                verbose_name="Внешний ID",
+            ),
+        ),
+    ]
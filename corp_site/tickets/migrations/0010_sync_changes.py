@@ -0,0 +1,61 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:04
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0009_ticket_external_id"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("ticket", "Заявка"), ("comment", "Комментарий")],
+                        max_length=20,
+                        verbose_name="Тип",
+                    ),
+                ),
+                ("object_id", models.BigIntegerField(verbose_name="ID записи")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Удалено"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Удалённая запись",
+                "verbose_name_plural": "Удалённые записи",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["created_at", "id"], name="comment_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(fields=["updated_at", "id"], name="ticket_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["deleted_at", "id"], name="tombstone_deleted_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:12
+
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+
+
+def fill_stats(apps, schema_editor):
+    Ticket = apps.get_model("tickets", "Ticket")
+    TicketDailyStats = apps.get_model("tickets", "TicketDailyStats")
+    db = schema_editor.connection.alias
+    tickets = Ticket.objects.using(db).order_by()
+    # Точное время закрытия раньше не хранилось: берём последнее изменение.
+    tickets.filter(status="done").update(closed_at=F("updated_at"))
+    days = {}
+    for field, attr in (("created_at", "created"), ("closed_at", "closed")):
+        rows = (
+            tickets.filter(**{f"{field}__isnull": False})
+            .annotate(day=TruncDate(field))
+            .values("day")
+            .annotate(n=Count("id"))
+        )
+        for row in rows:
+            day = days.setdefault(row["day"], TicketDailyStats(day=row["day"]))
+            setattr(day, attr, row["n"])
+    TicketDailyStats.objects.using(db).bulk_create(days.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0010_sync_changes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TicketDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(unique=True, verbose_name="День")),
+                ("created", models.IntegerField(default=0, verbose_name="Создано")),
+                ("closed", models.IntegerField(default=0, verbose_name="Закрыто")),
+            ],
+            options={
+                "verbose_name": "Статистика за день",
+                "verbose_name_plural": "Статистика по дням",
+            },
+        ),
+        migrations.AddField(
+            model_name="ticket",
+            name="closed_at",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="Закрыто"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(
+                condition=models.Q(
+                    ("due_date__isnull", False),
+                    models.Q(("status", "done"), _negated=True),
+                ),
+                fields=["due_date"],
+                name="ticket_overdue_idx",
+            ),
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
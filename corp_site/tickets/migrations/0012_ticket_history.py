@@ -0,0 +1,151 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:17
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_history(apps, schema_editor):
+    """Начальные записи для уже существующих заявок.
+
+    Промежуточные статусы не сохранились: незавершённая заявка считается
+    созданной в текущем статусе, завершённая — созданной новой и закрытой
+    в ``closed_at``.
+    """
+    Ticket = apps.get_model("tickets", "Ticket")
+    TicketChange = apps.get_model("tickets", "TicketChange")
+    db = schema_editor.connection.alias
+    rows = Ticket.objects.using(db).values_list(
+        "pk", "status", "priority", "created_at", "closed_at"
+    )
+    batch = []
+    for pk, status, priority, created_at, closed_at in rows.order_by("pk").iterator():
+        done = status == "done" and closed_at is not None
+        initial = "new" if done else status
+        batch.append(
+            TicketChange(
+                ticket_id=pk,
+                changed_at=created_at,
+                source="other",
+                changes={"status": [None, initial], "priority": [None, priority]},
+                status=initial,
+            )
+        )
+        if done:
+            batch.append(
+                TicketChange(
+                    ticket_id=pk,
+                    changed_at=closed_at,
+                    source="other",
+                    changes={"status": [initial, status]},
+                    status=status,
+                )
+            )
+        if len(batch) >= 2000:
+            TicketChange.objects.using(db).bulk_create(batch)
+            batch = []
+    TicketChange.objects.using(db).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0011_ticket_stats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TicketChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "changed_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Когда"
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        choices=[
+                            ("form", "Форма заявки"),
+                            ("admin", "Админка"),
+                            ("bulk", "Массовое действие"),
+                            ("other", "Прочее"),
+                        ],
+                        max_length=20,
+                        verbose_name="Источник",
+                    ),
+                ),
+                (
+                    "changes",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        verbose_name="Изменения",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("new", "Новая"),
+                            ("in_progress", "В работе"),
+                            ("done", "Завершена"),
+                        ],
+                        max_length=20,
+                        null=True,
+                        verbose_name="Новый статус",
+                    ),
+                ),
+                (
+                    "author",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Кто",
+                    ),
+                ),
+                (
+                    "ticket",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="history",
+                        to="tickets.ticket",
+                        verbose_name="Заявка",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Изменение заявки",
+                "verbose_name_plural": "История заявок",
+                "ordering": ["changed_at", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["ticket", "changed_at", "id"],
+                        name="ticketchange_ticket_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(("status__isnull", False)),
+                        fields=["changed_at"],
+                        name="ticketchange_status_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(fill_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:52
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_previous_status(apps, schema_editor):
+    """Прежний статус из JSON ``changes`` для уже записанных переходов."""
+    TicketChange = apps.get_model("tickets", "TicketChange")
+    db = schema_editor.connection.alias
+    rows = (
+        TicketChange.objects.using(db)
+        .filter(status__isnull=False)
+        .only("pk", "changes")
+        .order_by("pk")
+    )
+    batch = []
+    for change in rows.iterator(chunk_size=BATCH_SIZE):
+        previous = (change.changes.get("status") or [None])[0]
+        if previous is None:
+            continue
+        change.previous_status = previous
+        batch.append(change)
+        if len(batch) >= BATCH_SIZE:
+            TicketChange.objects.using(db).bulk_update(batch, ["previous_status"])
+            batch = []
+    TicketChange.objects.using(db).bulk_update(batch, ["previous_status"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0014_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ticketchange",
+            name="previous_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("new", "Новая"),
+                    ("in_progress", "В работе"),
+                    ("done", "Завершена"),
+                ],
+                max_length=20,
+                null=True,
+                verbose_name="Прежний статус",
+            ),
+        ),
+        migrations.RunPython(fill_previous_status, migrations.RunPython.noop),
+    ]
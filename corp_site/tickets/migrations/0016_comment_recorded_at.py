@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 11:03
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_recorded_at(apps, schema_editor):
+    """Уже записанные комментарии: курсоры клиентов выданы по created_at."""
+    Comment = apps.get_model("tickets", "Comment")
+    Comment.objects.using(schema_editor.connection.alias).update(
+        recorded_at=F("created_at")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tickets", "0015_ticketchange_previous_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="recorded_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                editable=False,
+                verbose_name="Записано",
+            ),
+        ),
+        migrations.RunPython(fill_recorded_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["recorded_at", "id"], name="comment_recorded_idx"
+            ),
+        ),
+    ]
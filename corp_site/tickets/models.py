@@ -1,5 +1,8 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 
 
 class Ticket(models.Model):
@@ -27,35 +30,119 @@ class Ticket(models.Model):
         default=Priority.MEDIUM,
     )
     due_date = models.DateField('Крайний срок', null=True, blank=True)
+    # Ключ заявки в системе, из которой она импортирована (import_tickets):
+    # по нему к заявке привязываются комментарии и пропускаются повторы.
+    external_id = models.CharField(
+        'Внешний ID', max_length=64, null=True, blank=True, unique=True, editable=False
+    )
     created_at = models.DateTimeField('Создано', auto_now_add=True)
     updated_at = models.DateTimeField('Обновлено', auto_now=True)
+    # Денормализация для списка и шапки заявки: поддерживаются сигналами
+    # комментариев, пересчитываются командой rebuild_ticket_activity.
+    comment_count = models.PositiveIntegerField('Комментариев', default=0, editable=False)
+    last_activity_at = models.DateTimeField(
+        'Последняя активность', default=timezone.now, editable=False
+    )
+    # Когда заявка перешла в «Завершена»; при возврате в работу сбрасывается.
+    closed_at = models.DateTimeField('Закрыто', null=True, blank=True, editable=False)
 
     class Meta:
-        ordering = ['-created_at']
+        # id разрывает ничьи по created_at: без него курсорная пагинация
+        # могла бы пропускать или повторять заявки с одинаковым временем.
+        ordering = ['-created_at', '-id']
+        # Индексы повторяют пути доступа TicketListView: фильтр по статусу
+        # и/или приоритету с сортировкой по убыванию даты создания.
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='ticket_created_idx'),
+            models.Index(
+                fields=['status', '-created_at', '-id'], name='ticket_status_created_idx'
+            ),
+            models.Index(
+                fields=['priority', '-created_at', '-id'], name='ticket_priority_created_idx'
+            ),
+            models.Index(
+                fields=['status', 'priority', '-created_at', '-id'],
+                name='ticket_status_prio_created_idx',
+            ),
+            models.Index(fields=['-last_activity_at', '-id'], name='ticket_activity_idx'),
+            # Лента изменений для синхронизации (tickets/sync.py).
+            models.Index(fields=['updated_at', 'id'], name='ticket_updated_idx'),
+            # Просроченные заявки для статистики: в индексе только открытые
+            # заявки со сроком, и он не растёт с архивом завершённых.
+            models.Index(
+                fields=['due_date'],
+                name='ticket_overdue_idx',
+                condition=models.Q(due_date__isnull=False) & ~models.Q(status='done'),
+            ),
+        ]
         verbose_name = 'Заявка'
         verbose_name_plural = 'Заявки'
 
     def __str__(self) -> str:
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Значения на момент загрузки: по ним сигналы понимают, что именно
+        # изменилось при сохранении, без лишнего SELECT.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    # Поля, которые меняют только сигналы комментариев через UPDATE ... F().
+    # Обычное сохранение их не пишет, иначе форма, открытая до нового
+    # комментария, затёрла бы счётчик устаревшим значением.
+    DENORMALIZED_FIELDS = ('comment_count', 'last_activity_at')
+
+    def save(self, *args, **kwargs):
+        if self.status == self.Status.DONE:
+            if self.closed_at is None:
+                self.closed_at = timezone.now()
+        else:
+            self.closed_at = None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'closed_at'}
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in self.DENORMALIZED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
     def get_absolute_url(self):
         return reverse('ticket_detail', kwargs={'pk': self.pk})
 
     @property
     def status_badge_class(self) -> str:
-        return {
-            self.Status.NEW: 'bg-primary',
-            self.Status.IN_PROGRESS: 'bg-warning text-dark',
-            self.Status.DONE: 'bg-success',
-        }.get(self.status, 'bg-secondary')
+        return STATUS_BADGE_CLASSES.get(self.status, 'bg-secondary')
 
     @property
     def priority_badge_class(self) -> str:
-        return {
-            self.Priority.HIGH: 'bg-danger',
-            self.Priority.MEDIUM: 'bg-warning text-dark',
-            self.Priority.LOW: 'bg-secondary',
-        }.get(self.priority, 'bg-secondary')
+        return PRIORITY_BADGE_CLASSES.get(self.priority, 'bg-secondary')
+
+
+# Классы бейджей не собираются заново на каждую строку списка.
+STATUS_BADGE_CLASSES = {
+    Ticket.Status.NEW: 'bg-primary',
+    Ticket.Status.IN_PROGRESS: 'bg-warning text-dark',
+    Ticket.Status.DONE: 'bg-success',
+}
+
+PRIORITY_BADGE_CLASSES = {
+    Ticket.Priority.HIGH: 'bg-danger',
+    Ticket.Priority.MEDIUM: 'bg-warning text-dark',
+    Ticket.Priority.LOW: 'bg-secondary',
+}
 
 
 class Comment(models.Model):
@@ -68,11 +155,208 @@ class Comment(models.Model):
     author_name = models.CharField('Автор', max_length=150)
     message = models.TextField('Комментарий')
     created_at = models.DateTimeField('Создано', auto_now_add=True)
+    # Когда строка появилась в базе: у импортированных комментариев
+    # created_at исходный, а лента изменений должна их отдать.
+    recorded_at = models.DateTimeField('Записано', default=timezone.now, editable=False)
 
     class Meta:
-        ordering = ['created_at']
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(
+                fields=['ticket', 'created_at', 'id'], name='comment_ticket_created_idx'
+            ),
+            models.Index(fields=['created_at', 'id'], name='comment_created_idx'),
+            # Лента изменений для синхронизации (tickets/sync.py).
+            models.Index(fields=['recorded_at', 'id'], name='comment_recorded_idx'),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self) -> str:
         return f"Комментарий от {self.author_name}"
+
+
+class TicketCounter(models.Model):
+    """Число заявок в корзине (статус, приоритет).
+
+    Поддерживается сигналами при сохранении и удалении заявок, чтобы список
+    не выполнял COUNT(*) по всей таблице на каждый запрос.
+    """
+
+    status = models.CharField('Статус', max_length=20, choices=Ticket.Status.choices)
+    priority = models.IntegerField('Приоритет', choices=Ticket.Priority.choices)
+    count = models.IntegerField('Количество', default=0)
+    # Растёт при любом изменении заявок корзины: из версий собирается ETag
+    # списка, отфильтрованного по статусу и приоритету.
+    version = models.PositiveBigIntegerField('Версия', default=0)
+    changed_at = models.DateTimeField('Изменено', null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['status', 'priority'], name='ticket_counter_bucket_uniq'
+            ),
+        ]
+        verbose_name = 'Счётчик заявок'
+        verbose_name_plural = 'Счётчики заявок'
+
+    def __str__(self) -> str:
+        return f"{self.status}/{self.priority}: {self.count}"
+
+
+class TicketDailyStats(models.Model):
+    """Сколько заявок создано и закрыто за день (по местному времени).
+
+    Поддерживается сигналами при сохранении и удалении заявок, чтобы
+    страница статистики не группировала всю таблицу заявок.
+    """
+
+    day = models.DateField('День', unique=True)
+    created = models.IntegerField('Создано', default=0)
+    closed = models.IntegerField('Закрыто', default=0)
+
+    class Meta:
+        verbose_name = 'Статистика за день'
+        verbose_name_plural = 'Статистика по дням'
+
+    def __str__(self) -> str:
+        return f"{self.day}: +{self.created} / -{self.closed}"
+
+
+class TicketChange(models.Model):
+    """Изменение заявки: только поля, которые поменялись.
+
+    ``changes`` — {поле: [было, стало]}; при создании записываются статус и
+    приоритет с ``null`` в «было». Смена статуса дублируется в колонках
+    ``previous_status`` и ``status``, чтобы отчёты по статусам шли по
+    индексу, а не по JSON.
+    """
+
+    class Source(models.TextChoices):
+        FORM = 'form', 'Форма заявки'
+        ADMIN = 'admin', 'Админка'
+        BULK = 'bulk', 'Массовое действие'
+        OTHER = 'other', 'Прочее'
+
+    ticket = models.ForeignKey(
+        Ticket,
+        on_delete=models.CASCADE,
+        related_name='history',
+        verbose_name='Заявка',
+    )
+    changed_at = models.DateTimeField('Когда', default=timezone.now)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Кто',
+    )
+    source = models.CharField('Источник', max_length=20, choices=Source.choices)
+    changes = models.JSONField('Изменения', encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        'Новый статус', max_length=20, choices=Ticket.Status.choices, null=True, blank=True
+    )
+    # Статус до перехода; None — заявка создана в этом статусе.
+    previous_status = models.CharField(
+        'Прежний статус', max_length=20, choices=Ticket.Status.choices, null=True, blank=True
+    )
+
+    class Meta:
+        ordering = ['changed_at', 'id']
+        indexes = [
+            # История одной заявки по порядку.
+            models.Index(
+                fields=['ticket', 'changed_at', 'id'], name='ticketchange_ticket_idx'
+            ),
+            # Переходы статусов за период: в индексе только они.
+            models.Index(
+                fields=['changed_at'],
+                name='ticketchange_status_idx',
+                condition=models.Q(status__isnull=False),
+            ),
+        ]
+        verbose_name = 'Изменение заявки'
+        verbose_name_plural = 'История заявок'
+
+    def __str__(self) -> str:
+        return f"{self.ticket_id} {self.changed_at:%Y-%m-%d %H:%M}: {', '.join(self.changes)}"
+
+
+class Tombstone(models.Model):
+    """Запись об удалённой заявке или комментарии.
+
+    Клиенты синхронизации (tickets/sync.py) узнают по ним, какие строки
+    убрать у себя. Хранятся TICKETS_SYNC_TOMBSTONE_DAYS дней, потом их
+    удаляет команда prune_tombstones.
+    """
+
+    class Kind(models.TextChoices):
+        TICKET = 'ticket', 'Заявка'
+        COMMENT = 'comment', 'Комментарий'
+
+    kind = models.CharField('Тип', max_length=20, choices=Kind.choices)
+    object_id = models.BigIntegerField('ID записи')
+    deleted_at = models.DateTimeField('Удалено', default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at', 'id'], name='tombstone_deleted_idx'),
+        ]
+        verbose_name = 'Удалённая запись'
+        verbose_name_plural = 'Удалённые записи'
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.object_id}"
+
+
+class Job(models.Model):
+    """Фоновая задача: имя зарегистрированной функции и её аргументы.
+
+    Ставится через tickets.jobs.enqueue, выполняется командой run_worker.
+    Выполненные задачи удаляются; исчерпавшие попытки остаются в статусе
+    «Не выполнена», пока их не перезапустят из админки.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'В очереди'
+        RUNNING = 'running', 'Выполняется'
+        DEAD = 'dead', 'Не выполнена'
+
+    name = models.CharField('Задача', max_length=100)
+    payload = models.JSONField('Аргументы', default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        'Статус', max_length=20, choices=Status.choices, default=Status.QUEUED
+    )
+    attempts = models.PositiveIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveIntegerField('Максимум попыток', default=5)
+    # Когда задачу можно брать: сейчас или после паузы перед повтором.
+    run_at = models.DateTimeField('Выполнить после', default=timezone.now)
+    # Кто и когда взял задачу; по locked_at зависшие задачи возвращаются в
+    # очередь (TICKETS_JOBS_LEASE_SECONDS).
+    locked_by = models.CharField('Воркер', max_length=100, blank=True)
+    locked_at = models.DateTimeField('Взята', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Выборка готовых задач: в индексе только очередь, выполненные
+            # задачи удаляются, поэтому он остаётся маленьким.
+            models.Index(
+                fields=['run_at', 'id'],
+                name='job_ready_idx',
+                condition=models.Q(status='queued'),
+            ),
+            models.Index(
+                fields=['locked_at'],
+                name='job_running_idx',
+                condition=models.Q(status='running'),
+            ),
+        ]
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.pk}"
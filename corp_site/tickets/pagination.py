@@ -0,0 +1,178 @@
+"""Курсорная (keyset) пагинация по паре (ключ, id).
+
+В отличие от Paginator не считает COUNT(*) и не использует OFFSET: каждая
+страница — это «WHERE (ключ, id) < (последняя строка) LIMIT n», поэтому
+сотая страница стоит столько же, сколько первая.
+"""
+
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core import signing
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .counts import estimate_count
+
+SALT = "tickets.cursor"
+
+NEXT = "next"
+PREV = "prev"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    position: tuple
+    direction: str = NEXT
+    params: dict = field(default_factory=dict)
+
+
+def encode_cursor(cursor):
+    # Подпись делает токен непрозрачным: клиент не может подсунуть
+    # произвольную позицию или фильтры.
+    return signing.dumps(
+        {"p": list(cursor.position), "d": cursor.direction, "f": cursor.params},
+        salt=SALT,
+        compress=True,
+    )
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        data = signing.loads(token, salt=SALT)
+        return Cursor(
+            position=tuple(data["p"]),
+            direction=PREV if data["d"] == PREV else NEXT,
+            params=dict(data.get("f") or {}),
+        )
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None
+
+
+@dataclass
+class CursorPage:
+    object_list: list
+    has_next: bool
+    has_previous: bool
+    next_token: str | None = None
+    previous_token: str | None = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class CursorPaginator:
+    """Листает queryset по убыванию ``key`` с ``id`` для разрыва ничьих.
+
+    Подходит и для ``.values()``: тогда в строках должны быть ``key`` и id.
+    """
+
+    def __init__(self, queryset, per_page, key="created_at", params=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.key = key
+        self.params = params or {}
+        self.key_field = queryset.model._meta.get_field(key)
+
+    def _position(self, obj):
+        if isinstance(obj, dict):
+            return obj[self.key_field.attname], obj[self.queryset.model._meta.pk.attname]
+        return getattr(obj, self.key_field.attname), obj.pk
+
+    def _token(self, obj, direction):
+        value, pk = self._position(obj)
+        position = (value.isoformat() if hasattr(value, "isoformat") else value, pk)
+        return encode_cursor(
+            Cursor(position=position, direction=direction, params=self.params)
+        )
+
+    def _page_queryset(self, cursor):
+        """Срез на строку больше страницы: по лишней строке видно, есть ли ещё."""
+        key = self.key
+        queryset = self.queryset
+        if cursor is None:
+            queryset = queryset.order_by(f"-{key}", "-pk")
+        else:
+            value = self.key_field.to_python(cursor.position[0])
+            pk = cursor.position[1]
+            if cursor.direction == NEXT:
+                # «key <= v» даёт диапазон по индексу, вторая часть отсекает
+                # уже показанные строки с тем же значением ключа.
+                queryset = queryset.filter(
+                    Q(**{f"{key}__lte": value}),
+                    Q(**{f"{key}__lt": value}) | Q(pk__lt=pk),
+                ).order_by(f"-{key}", "-pk")
+            else:
+                queryset = queryset.filter(
+                    Q(**{f"{key}__gte": value}),
+                    Q(**{f"{key}__gt": value}) | Q(pk__gt=pk),
+                ).order_by(key, "pk")
+        return queryset[: self.per_page + 1]
+
+    def _build_page(self, rows, cursor):
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if cursor is None:
+            has_next, has_previous = has_more, False
+        elif cursor.direction == NEXT:
+            has_next, has_previous = has_more, True
+        else:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        return CursorPage(
+            object_list=rows,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            next_token=self._token(rows[-1], NEXT) if has_next and rows else None,
+            previous_token=self._token(rows[0], PREV) if has_previous and rows else None,
+        )
+
+    def page(self, cursor=None):
+        return self._build_page(list(self._page_queryset(cursor)), cursor)
+
+    async def apage(self, cursor=None):
+        """То же, что page(), через async ORM."""
+        rows = [row async for row in self._page_queryset(cursor)]
+        return self._build_page(rows, cursor)
+
+
+class CountedPaginator(Paginator):
+    """Обычный Paginator, которому число объектов передают снаружи.
+
+    Так список берёт его из счётчиков или оценки планировщика вместо
+    COUNT(*) по отфильтрованному queryset.
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @cached_property
+    def count(self):
+        return self._known_count
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator, который на больших выборках не считает COUNT(*).
+
+    Если оценка планировщика (EXPLAIN, только Postgres) не меньше
+    ``TICKETS_COUNT_ESTIMATE_THRESHOLD``, число объектов — оценка, и
+    ``estimated`` становится True; иначе считается точно. Последняя
+    страница по оценке может оказаться неполной или пустой.
+    """
+
+    estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if estimate is not None and estimate >= settings.TICKETS_COUNT_ESTIMATE_THRESHOLD:
+            self.estimated = True
+            return estimate
+        return super().count
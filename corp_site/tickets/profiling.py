@@ -0,0 +1,91 @@
+"""Выборочный cProfile медленных запросов.
+
+После каждых ``TICKETS_PROFILE_EVERY`` медленных (дольше
+``TICKETS_PROFILE_SLOW_MS``) запросов к представлению следующий его запрос
+выполняется под cProfile. Если и он оказался медленным, профиль
+сохраняется в ``TICKETS_PROFILE_DIR`` (``python -m pstats <файл>`` или
+snakeviz); если нет — под профайлер попадёт следующий. Одновременно
+профилируется не больше одного запроса в процессе.
+"""
+
+import cProfile
+import logging
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger("tickets.profiling")
+
+_slow = Counter()
+_armed = set()
+_lock = threading.Lock()
+_busy = threading.Lock()
+
+
+def start(view):
+    """cProfile.Profile, если этот запрос нужно профилировать, иначе None."""
+    if not settings.TICKETS_PROFILE_EVERY:
+        return None
+    with _lock:
+        if view not in _armed:
+            return None
+    if not _busy.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Уже работает другой профайлер (например, отладчик).
+        _busy.release()
+        return None
+    return profiler
+
+
+def stop(profiler):
+    profiler.disable()
+    _busy.release()
+
+
+def finish(view, elapsed_ms, profiler=None):
+    """Учитывает запрос; возвращает путь сохранённого профиля или None.
+
+    ``profiler`` — уже остановленный (stop) профайлер этого запроса.
+    """
+    slow = elapsed_ms >= settings.TICKETS_PROFILE_SLOW_MS
+    if profiler is not None:
+        if not slow:
+            return None
+        with _lock:
+            _armed.discard(view)
+        return save(profiler, view, elapsed_ms)
+    if not slow or not settings.TICKETS_PROFILE_EVERY:
+        return None
+    with _lock:
+        _slow[view] += 1
+        if _slow[view] >= settings.TICKETS_PROFILE_EVERY:
+            _slow[view] = 0
+            _armed.add(view)
+    return None
+
+
+def save(profiler, view, elapsed_ms):
+    directory = Path(settings.TICKETS_PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = timezone.now().strftime("%Y%m%dT%H%M%S")
+    name = view.replace(":", "_")
+    path = directory / f"{name}-{stamp}-{elapsed_ms:.0f}ms-{os.getpid()}.prof"
+    profiler.dump_stats(path)
+    logger.warning(
+        "Профиль медленного запроса %s (%.0f мс): %s", view, elapsed_ms, path
+    )
+    return path
+
+
+def reset_profiling():
+    with _lock:
+        _slow.clear()
+        _armed.clear()
@@ -0,0 +1,134 @@
+"""Чтения с реплики базы для страниц, которые только читают.
+
+Список и страница заявки, выгрузка и статистика читают с реплики
+(``TICKETS_DB_REPLICA``), остальное — с основной базы; запись всегда идёт
+в основную. Реплика может отставать, поэтому после запроса, который мог
+что-то изменить (не GET/HEAD), браузер получает cookie и
+``TICKETS_DB_STICKY_SECONDS`` секунд читает только основную базу — свои
+изменения пользователь видит сразу.
+
+Базу для чтений выбирает представление (ReplicaReadMixin,
+``reads_from_replica``) и кладёт в ContextVar, который читает ReplicaRouter;
+ReplicaMiddleware сбрасывает выбор после запроса, чтобы он не достался
+следующему запросу того же потока.
+"""
+
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_COOKIE = "tickets_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+_read_database = ContextVar("tickets_read_database", default=None)
+
+
+def is_sticky(request):
+    """Пишет ли пользователь недавно — тогда читать только основную базу."""
+    try:
+        until = float(request.COOKIES.get(STICKY_COOKIE, ""))
+    except ValueError:
+        return False
+    return time.time() < until
+
+
+def replica_for(request):
+    """Алиас реплики для чтений запроса или None — основная база."""
+    alias = settings.TICKETS_DB_REPLICA
+    if not alias or is_sticky(request):
+        return None
+    return alias
+
+
+def use_replica(request):
+    _read_database.set(replica_for(request))
+
+
+def read_database():
+    """База для чтений текущего запроса; None — основная."""
+    return _read_database.get()
+
+
+class ReplicaReadMixin:
+    """Представление на классах читает с реплики, если можно."""
+
+    def dispatch(self, request, *args, **kwargs):
+        use_replica(request)
+        return super().dispatch(request, *args, **kwargs)
+
+
+def reads_from_replica(view):
+    """То же для представления-функции."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        use_replica(request)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_database.get()
+
+    def db_for_write(self, model, **hints):
+        # Иначе объект, прочитанный с реплики, сохранялся бы туда же.
+        instance = hints.get("instance")
+        replica = settings.TICKETS_DB_REPLICA
+        if replica and instance is not None and instance._state.db == replica:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика — копия основной базы.
+        replica = settings.TICKETS_DB_REPLICA
+        if replica and {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, replica}:
+            return True
+        return None
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _read_database.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_database.reset(token)
+        return self.stick(request, response)
+
+    async def __acall__(self, request):
+        token = _read_database.set(None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_database.reset(token)
+        return self.stick(request, response)
+
+    def stick(self, request, response):
+        if request.method in SAFE_METHODS or not settings.TICKETS_DB_REPLICA:
+            return response
+        seconds = settings.TICKETS_DB_STICKY_SECONDS
+        response.set_cookie(
+            STICKY_COOKIE,
+            f"{time.time() + seconds:.3f}",
+            max_age=seconds,
+            httponly=True,
+            samesite="Lax",
+        )
+        return response
@@ -0,0 +1,150 @@
+"""Полнотекстовый поиск по заявкам.
+
+Бэкенд выбирается настройкой ``TICKETS_SEARCH_BACKEND``: ``auto`` (по типу
+базы), ``icontains``, ``postgres``, ``sqlite_fts`` или путь к своему классу.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+BACKENDS = {
+    "icontains": "tickets.search.IContainsSearchBackend",
+    "postgres": "tickets.search.PostgresSearchBackend",
+    "sqlite_fts": "tickets.search.SQLiteFTSSearchBackend",
+}
+
+AUTO_BACKENDS = {
+    "postgresql": "postgres",
+    "sqlite": "sqlite_fts",
+}
+
+
+class IContainsSearchBackend:
+    """Исходный поиск: LIKE/ILIKE по заголовку и описанию, без индекса."""
+
+    name = "icontains"
+
+    def search(self, queryset, query, ranked=True):
+        return queryset.filter(
+            Q(title__icontains=query) | Q(description__icontains=query)
+        )
+
+
+class PostgresSearchBackend:
+    """tsvector-колонка с GIN-индексом и русской морфологией.
+
+    Колонка ``search_vector`` генерируется самим Postgres (см. миграцию
+    0003_search), поэтому её не нужно поддерживать из Python.
+    """
+
+    name = "postgres"
+    config = "russian"
+    tsquery = "websearch_to_tsquery(%s::regconfig, %s)"
+
+    def search(self, queryset, query, ranked=True):
+        column = f'"{queryset.model._meta.db_table}"."search_vector"'
+        params = [self.config, query]
+        queryset = queryset.filter(
+            RawSQL(f"{column} @@ {self.tsquery}", params, output_field=BooleanField())
+        )
+        if ranked:
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+            queryset = queryset.annotate(
+                search_rank=RawSQL(
+                    f"ts_rank({column}, {self.tsquery})", params, output_field=FloatField()
+                )
+            ).order_by("-search_rank", *ordering)
+        return queryset
+
+
+class SQLiteFTSSearchBackend:
+    """FTS5-таблица поверх tickets_ticket, синхронизируется триггерами.
+
+    Каждое слово запроса ищется как префикс, поэтому «принт» находит
+    «принтер». Регистр и диакритика не учитываются (токенизатор unicode61).
+    """
+
+    name = "sqlite_fts"
+    table = "tickets_ticket_fts"
+
+    def search(self, queryset, query, ranked=True):
+        match = self.build_match(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s",
+                [match],
+            )
+        )
+
+    @staticmethod
+    def build_match(query, column=None):
+        words = re.findall(r"\w+", query)
+        prefix = f"{column} : " if column else ""
+        return " ".join(f'{prefix}"{word}"*' for word in words)
+
+    @classmethod
+    def install(cls, cursor, rebuild=False):
+        """Создаёт FTS-таблицу и триггеры, если их нет.
+
+        SQLite пересоздаёт tickets_ticket при части миграций (например,
+        AddField с NOT NULL), и триггеры удаляются вместе со старой таблицей.
+        Поэтому вызов идемпотентный и повторяется после каждого migrate.
+        """
+        table = cls.table
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+            "title, description, content='tickets_ticket', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON tickets_ticket BEGIN "
+            f"INSERT INTO {table}(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON tickets_ticket BEGIN "
+            f"INSERT INTO {table}({table}, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        cursor.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {table}_au "
+            "AFTER UPDATE OF title, description ON tickets_ticket BEGIN "
+            f"INSERT INTO {table}({table}, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            f"INSERT INTO {table}(rowid, title, description) "
+            "VALUES (new.id, new.title, new.description); END"
+        )
+        if rebuild:
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+    @classmethod
+    def uninstall(cls, cursor):
+        for suffix in ("ai", "ad", "au"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {cls.table}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {cls.table}")
+
+
+def get_search_backend(using=DEFAULT_DB_ALIAS):
+    name = settings.TICKETS_SEARCH_BACKEND
+    if name == "auto":
+        name = AUTO_BACKENDS.get(connections[using].vendor, "icontains")
+    return import_string(BACKENDS.get(name, name))()
+
+
+def install_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate: восстанавливает FTS-триггеры SQLite после миграций."""
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    # Таблицы ещё нет — значит, миграция 0003_search не применена.
+    if SQLiteFTSSearchBackend.table not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        SQLiteFTSSearchBackend.install(cursor)
@@ -0,0 +1,279 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import transaction
+from django.db.models import F, QuerySet, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .activity import last_activity_subquery
+from .cache import LIST_VERSION, TITLES_VERSION, invalidate, ticket_version
+from .counts import bump_counter, touch_ticket_bucket
+from .events import LIST_CHANNEL, publish_on_commit, ticket_channel
+from .history import TRACKED_FIELDS, diff, initial_changes, make_change
+from .models import Comment, Ticket, Tombstone
+from .stats import DayDeltas
+
+_muted = ContextVar("tickets_signals_muted", default=False)
+
+
+@contextmanager
+def muted():
+    """Отключает обработчики этого модуля.
+
+    Для массовых операций (bulk.py): счётчики, записи об удалении, кэш и
+    события они обновляют сами, один раз на пачку, а не на каждую строку.
+    """
+    token = _muted.set(True)
+    try:
+        yield
+    finally:
+        _muted.reset(token)
+
+
+def unless_muted(handler):
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        if not _muted.get():
+            handler(*args, **kwargs)
+
+    return wrapper
+
+
+def _deleted_with_ticket(origin):
+    """Комментарий удаляется каскадом вместе с заявкой: пересчитывать поля
+    уходящей строки незачем.
+
+    ``origin`` — объект или QuerySet, с которого началось удаление; каскад
+    от заявки затрагивает только её комментарии. Состояния между сигналами
+    нет, так что упавшее удаление ничего после себя не оставляет.
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, Ticket)
+
+
+def _loaded_bucket(instance):
+    loaded = getattr(instance, "_loaded_values", {})
+    if "status" in loaded and "priority" in loaded:
+        return loaded["status"], loaded["priority"]
+    return None
+
+
+# Что нужно знать о заявке до сохранения: корзина и поля истории (статус и
+# приоритет среди них) и время закрытия.
+PREVIOUS_FIELDS = (*TRACKED_FIELDS, "closed_at")
+
+
+@receiver(pre_save, sender=Ticket)
+@unless_muted
+def remember_ticket_state(sender, instance, using, **kwargs):
+    previous = getattr(instance, "_loaded_values", {})
+    if instance.pk is not None and not all(f in previous for f in PREVIOUS_FIELDS):
+        # Объект собран вручную, загружен из фикстуры или не целиком: старое
+        # состояние известно только базе.
+        previous = (
+            sender._base_manager.using(using)
+            .filter(pk=instance.pk)
+            .values(*PREVIOUS_FIELDS)
+            .first()
+        )
+    instance._previous = previous or {}
+
+
+def _previous_state(instance):
+    return instance.__dict__.get("_previous", {})
+
+
+@receiver(post_save, sender=Ticket)
+@unless_muted
+def update_ticket_counters(sender, instance, using, **kwargs):
+    state = _previous_state(instance)
+    previous = (state["status"], state["priority"]) if state else None
+    current = (instance.status, instance.priority)
+    if previous == current:
+        # Число не изменилось, но версия корзины должна вырасти.
+        bump_counter(*current, using=using)
+        return
+    if previous is not None:
+        bump_counter(*previous, -1, using=using)
+    bump_counter(*current, 1, using=using)
+
+
+@receiver(post_save, sender=Ticket)
+@unless_muted
+def update_daily_stats(sender, instance, created, using, **kwargs):
+    deltas = DayDeltas()
+    if created:
+        deltas.add(created_at=instance.created_at)
+    previous = _previous_state(instance).get("closed_at")
+    if previous != instance.closed_at:
+        deltas.add(closed_at=previous, sign=-1)
+        deltas.add(closed_at=instance.closed_at)
+    deltas.apply(using=using)
+
+
+@receiver(post_delete, sender=Ticket)
+@unless_muted
+def release_daily_stats(sender, instance, using, **kwargs):
+    deltas = DayDeltas()
+    deltas.add(instance.created_at, instance.closed_at, sign=-1)
+    deltas.apply(using=using)
+
+
+@receiver(post_save, sender=Ticket)
+@unless_muted
+def record_ticket_history(sender, instance, created, using, raw, **kwargs):
+    if created:
+        # Для фикстур (raw) — тоже: с этой записи считается время в статусе.
+        change = make_change(
+            instance.pk, initial_changes(instance), changed_at=instance.created_at
+        )
+    elif raw:
+        return
+    else:
+        current = {name: getattr(instance, name) for name in TRACKED_FIELDS}
+        change = make_change(instance.pk, diff(_previous_state(instance), current))
+    if change is not None:
+        change.save(using=using)
+
+
+@receiver(post_delete, sender=Ticket)
+@unless_muted
+def release_ticket_counter(sender, instance, using, **kwargs):
+    status, priority = _loaded_bucket(instance) or (instance.status, instance.priority)
+    bump_counter(status, priority, -1, using=using)
+
+
+def touch_ticket_on_commit(ticket_id, using):
+    # Версия корзины — после коммита, отдельным UPDATE: иначе строку одного
+    # из девяти счётчиков держала бы вся транзакция комментария, и
+    # комментарии к заявкам одной корзины выстраивались бы за ней в очередь.
+    transaction.on_commit(lambda: touch_ticket_bucket(ticket_id, using=using), using=using)
+
+
+@receiver(post_save, sender=Comment)
+@unless_muted
+def count_new_comment(sender, instance, created, using, **kwargs):
+    if not created:
+        return
+    Ticket.objects.using(using).filter(pk=instance.ticket_id).update(
+        comment_count=F("comment_count") + 1,
+        last_activity_at=Greatest(F("last_activity_at"), Value(instance.created_at)),
+    )
+    touch_ticket_on_commit(instance.ticket_id, using)
+
+
+@receiver(post_delete, sender=Comment)
+@unless_muted
+def uncount_deleted_comment(sender, instance, using, origin=None, **kwargs):
+    if _deleted_with_ticket(origin):
+        return
+    Ticket.objects.using(using).filter(pk=instance.ticket_id).update(
+        comment_count=Greatest(F("comment_count") - 1, Value(0)),
+        last_activity_at=last_activity_subquery(),
+    )
+    touch_ticket_on_commit(instance.ticket_id, using)
+
+
+@receiver(post_delete, sender=Ticket)
+@unless_muted
+def bury_ticket(sender, instance, using, **kwargs):
+    Tombstone.objects.using(using).create(
+        kind=Tombstone.Kind.TICKET, object_id=instance.pk
+    )
+
+
+@receiver(post_delete, sender=Comment)
+@unless_muted
+def bury_comment(sender, instance, using, origin=None, **kwargs):
+    if _deleted_with_ticket(origin):
+        # Клиенты удалят комментарии вместе с заявкой.
+        return
+    Tombstone.objects.using(using).create(
+        kind=Tombstone.Kind.COMMENT, object_id=instance.pk
+    )
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+@unless_muted
+def invalidate_ticket_fragments(sender, instance, using, created=True, **kwargs):
+    names = [LIST_VERSION, ticket_version(instance.pk)]
+    # Подсказкам важны только заголовки: новая, удалённая (created для
+    # post_delete не передаётся) или переименованная заявка.
+    if created or _previous_state(instance).get("title") != instance.title:
+        names.append(TITLES_VERSION)
+    invalidate(*names, using=using)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@unless_muted
+def invalidate_comment_fragments(sender, instance, using, origin=None, **kwargs):
+    if _deleted_with_ticket(origin):
+        # Версии поднимет удаление самой заявки.
+        return
+    # Число комментариев выводится и в строке списка.
+    invalidate(LIST_VERSION, ticket_version(instance.ticket_id), using=using)
+
+
+def ticket_event_data(ticket):
+    return {
+        "id": ticket.pk,
+        "title": ticket.title,
+        "status": ticket.status,
+        "status_display": ticket.get_status_display(),
+        "status_badge_class": ticket.status_badge_class,
+        "priority": ticket.priority,
+        "priority_display": ticket.get_priority_display(),
+        "priority_badge_class": ticket.priority_badge_class,
+        "updated_at": ticket.updated_at,
+    }
+
+
+@receiver(post_save, sender=Ticket)
+@unless_muted
+def publish_ticket_saved(sender, instance, using, **kwargs):
+    publish_on_commit(
+        [
+            (ticket_channel(instance.pk), "ticket", ticket_event_data(instance)),
+            (LIST_CHANNEL, "ticket", {"id": instance.pk}),
+        ],
+        using=using,
+    )
+
+
+@receiver(post_delete, sender=Ticket)
+@unless_muted
+def publish_ticket_deleted(sender, instance, using, **kwargs):
+    publish_on_commit(
+        [
+            (ticket_channel(instance.pk), "deleted", {"id": instance.pk}),
+            (LIST_CHANNEL, "deleted", {"id": instance.pk}),
+        ],
+        using=using,
+    )
+
+
+@receiver(post_save, sender=Comment)
+@unless_muted
+def publish_new_comment(sender, instance, created, using, **kwargs):
+    if not created:
+        return
+    data = {
+        "id": instance.pk,
+        "ticket": instance.ticket_id,
+        "author_name": instance.author_name,
+        "message": instance.message,
+        "created_at": instance.created_at,
+    }
+    publish_on_commit(
+        [
+            (ticket_channel(instance.ticket_id), "comment", data),
+            # В строке списка выводится число комментариев.
+            (LIST_CHANNEL, "comment", {"id": instance.ticket_id}),
+        ],
+        using=using,
+    )
@@ -0,0 +1,187 @@
+"""Статистика заявок без GROUP BY по всей таблице.
+
+Страница статистики собирается из готовых сводок: число заявок по статусу
+и приоритету — из TicketCounter, созданные и закрытые по дням — из
+TicketDailyStats (сигналы меняют строку дня при сохранении и удалении
+заявки). Просроченные заявки считаются по частичному индексу
+``ticket_overdue_idx``, где есть только открытые заявки со сроком.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Ticket, TicketCounter, TicketDailyStats
+
+PERIODS = (7, 30, 90)
+DEFAULT_PERIOD = 30
+
+
+def local_day(moment):
+    return timezone.localdate(moment)
+
+
+class DayDeltas:
+    """Изменения сводок по дням: {день: ±заявок} созданных и закрытых."""
+
+    def __init__(self):
+        self.created = Counter()
+        self.closed = Counter()
+
+    def add(self, created_at=None, closed_at=None, sign=1):
+        if created_at is not None:
+            self.created[local_day(created_at)] += sign
+        if closed_at is not None:
+            self.closed[local_day(closed_at)] += sign
+
+    def apply(self, using=None):
+        bump_days(self.created, self.closed, using=using)
+
+
+def bump_days(created, closed, using=None):
+    """Меняет сводки дней одним UPDATE; ``created`` и ``closed`` — {день: изменение}.
+
+    Недостающие дни вставляются сразу с изменениями — как в bump_counter.
+    """
+    days = {day for day, delta in (*created.items(), *closed.items()) if delta}
+    if not days:
+        return
+    rows = TicketDailyStats.objects.using(using).filter(day__in=days)
+
+    def change(deltas):
+        whens = [When(day=day, then=Value(delta)) for day, delta in deltas.items() if delta]
+        return Case(*whens, default=Value(0)) if whens else Value(0)
+
+    updated = rows.update(
+        created=F("created") + change(created), closed=F("closed") + change(closed)
+    )
+    if updated == len(days):
+        return
+    # Обычно это один новый день — тогда без лишнего SELECT.
+    missing = days - set(rows.values_list("day", flat=True)) if updated else days
+    try:
+        with transaction.atomic(using=using):
+            TicketDailyStats.objects.using(using).bulk_create(
+                TicketDailyStats(
+                    day=day, created=created.get(day, 0), closed=closed.get(day, 0)
+                )
+                for day in missing
+            )
+    except IntegrityError:
+        # Строку дня успел создать параллельный запрос.
+        bump_days(
+            {day: created.get(day, 0) for day in missing},
+            {day: closed.get(day, 0) for day in missing},
+            using=using,
+        )
+
+
+def rebuild_stats(using=None):
+    """Пересчитывает сводки по дням — после вставок и правок в обход сигналов.
+
+    Заодно приводит ``closed_at`` в соответствие статусу: у завершённых без
+    времени закрытия (фикстуры, SQL) им становится последнее изменение.
+    """
+    tickets = Ticket.objects.using(using).order_by()
+    done = Q(status=Ticket.Status.DONE)
+    days = {}
+    with transaction.atomic(using=using):
+        tickets.filter(done, closed_at__isnull=True).update(closed_at=F("updated_at"))
+        tickets.filter(~done, closed_at__isnull=False).update(closed_at=None)
+        for field, attr in (("created_at", "created"), ("closed_at", "closed")):
+            rows = (
+                tickets.filter(**{f"{field}__isnull": False})
+                .annotate(day=TruncDate(field))
+                .values("day")
+                .annotate(n=Count("id"))
+            )
+            for row in rows:
+                day = days.setdefault(row["day"], TicketDailyStats(day=row["day"]))
+                setattr(day, attr, row["n"])
+        TicketDailyStats.objects.using(using).all().delete()
+        TicketDailyStats.objects.using(using).bulk_create(days.values())
+
+
+def overdue_tickets(using=None):
+    """Открытые заявки с прошедшим сроком; запрос идёт по ticket_overdue_idx."""
+    return (
+        Ticket.objects.using(using)
+        .filter(due_date__isnull=False, due_date__lt=timezone.localdate())
+        .exclude(status=Ticket.Status.DONE)
+    )
+
+
+@dataclass
+class Stats:
+    # {(статус, приоритет): число заявок}
+    buckets: dict
+    overdue: int
+    # TicketDailyStats подряд за период; дни без заявок — несохранённые.
+    days: list
+
+    def count(self, status=None, priority=None):
+        return sum(
+            n
+            for (s, p), n in self.buckets.items()
+            if status in (None, s) and priority in (None, p)
+        )
+
+    @property
+    def matrix(self):
+        """Строки таблицы: (статус, [число по приоритетам], всего)."""
+        return [
+            (
+                label,
+                [self.count(status, priority) for priority in Ticket.Priority.values],
+                self.count(status),
+            )
+            for status, label in Ticket.Status.choices
+        ]
+
+    @property
+    def priority_totals(self):
+        return [self.count(priority=priority) for priority in Ticket.Priority.values]
+
+    @property
+    def total(self):
+        return self.count()
+
+    @property
+    def created(self):
+        return sum(day.created for day in self.days)
+
+    @property
+    def closed(self):
+        return sum(day.closed for day in self.days)
+
+    @property
+    def busiest(self):
+        """Наибольшее дневное значение — масштаб полос графика."""
+        return max([1, *(max(day.created, day.closed) for day in self.days)])
+
+
+def load_stats(period=DEFAULT_PERIOD, using=None):
+    """Всё для страницы статистики — три запроса при любом числе заявок."""
+    buckets = {
+        (status, priority): count
+        for status, priority, count in TicketCounter.objects.using(using)
+        .filter(count__gt=0)
+        .values_list("status", "priority", "count")
+    }
+    today = timezone.localdate()
+    first = today - timedelta(days=period - 1)
+    rows = TicketDailyStats.objects.using(using).filter(day__range=(first, today))
+    days = {row.day: row for row in rows}
+    return Stats(
+        buckets=buckets,
+        overdue=overdue_tickets(using).count(),
+        days=[
+            days.get(day) or TicketDailyStats(day=day)
+            for day in (first + timedelta(days=offset) for offset in range(period))
+        ],
+    )
@@ -0,0 +1,155 @@
+"""Лента изменений для клиентов, которые хранят заявки у себя.
+
+Клиент один раз выкачивает всё (запрос без ``since``), а дальше забирает
+только изменения после курсора: заявки по ``(updated_at, id)``, новые
+комментарии по ``(recorded_at, id)`` (у импортированных ``created_at``
+исходный) и удаления из таблицы Tombstone по
+``(deleted_at, id)``. Каждый поток читается по своему индексу, и страница
+стоит одинаково при любой давности курсора.
+
+Время изменения ставит приложение до коммита транзакции, поэтому строка
+может появиться в базе с временем меньше уже выданного курсора. Лента
+отдаёт только строки старше ``TICKETS_SYNC_SETTLE_SECONDS``: за это время
+транзакции успевают завершиться, и курсор ничего не пропускает.
+"""
+
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment, Ticket, Tombstone
+from .pagination import Cursor, encode_cursor
+
+TICKETS = "tickets"
+COMMENTS = "comments"
+DELETED = "deleted"
+
+
+class CursorExpired(Exception):
+    """Курсор старше хранимых удалений: нужна полная синхронизация."""
+
+
+@dataclass
+class Stream:
+    key: str
+
+    def after(self, queryset, position, horizon, limit):
+        """Срез на строку больше ``limit`` после ``position`` до ``horizon``."""
+        queryset = queryset.filter(**{f"{self.key}__lte": horizon})
+        if position is not None:
+            value, pk = parse_datetime(position[0]), position[1]
+            # Как в CursorPaginator: первое условие даёт границу диапазона
+            # индекса, второе отсекает ничьи.
+            queryset = queryset.filter(
+                Q(**{f"{self.key}__gte": value}),
+                Q(**{f"{self.key}__gt": value}) | Q(pk__gt=pk),
+            )
+        return queryset.order_by(self.key, "pk")[: limit + 1]
+
+    def page(self, queryset, position, horizon, limit):
+        """Строки страницы и есть ли ещё."""
+        rows = list(self.after(queryset, position, horizon, limit))
+        return rows[:limit], len(rows) > limit
+
+    def position(self, rows, previous):
+        if not rows:
+            return previous
+        last = rows[-1]
+        return [last[self.key].isoformat(), last["id"]]
+
+
+TICKET_STREAM = Stream("updated_at")
+COMMENT_STREAM = Stream("recorded_at")
+DELETED_STREAM = Stream("deleted_at")
+
+
+def is_changes_cursor(cursor):
+    return {TICKETS, COMMENTS, DELETED, "at"} <= cursor.params.keys()
+
+
+def settled_horizon():
+    return timezone.now() - timedelta(seconds=settings.TICKETS_SYNC_SETTLE_SECONDS)
+
+
+def tombstone_cutoff():
+    return timezone.now() - timedelta(days=settings.TICKETS_SYNC_TOMBSTONE_DAYS)
+
+
+@dataclass
+class Changes:
+    tickets: list
+    comments: list
+    deleted_tickets: list
+    deleted_comments: list
+    cursor: str
+    has_more: bool
+
+
+def changes(cursor, ticket_selection, comment_fields, limit):
+    """Страница ленты после ``cursor`` (None — с самого начала).
+
+    Каждый поток отдаёт не больше ``limit`` строк; ``has_more`` — хотя бы
+    в одном потоке остались строки до горизонта.
+    """
+    horizon = settled_horizon()
+    if cursor is None:
+        # Удалённое до первой выгрузки клиент не видел: удаления читаем
+        # только с её начала.
+        positions = {TICKETS: None, COMMENTS: None, DELETED: [horizon.isoformat(), 0]}
+    else:
+        positions = cursor.params
+        synced_at = parse_datetime(positions["at"])
+        if synced_at < tombstone_cutoff():
+            raise CursorExpired
+    tickets, more_tickets = TICKET_STREAM.page(
+        ticket_selection.apply(Ticket.objects.all()), positions[TICKETS], horizon, limit
+    )
+    comments, more_comments = COMMENT_STREAM.page(
+        Comment.objects.values(*comment_fields, COMMENT_STREAM.key),
+        positions[COMMENTS],
+        horizon,
+        limit,
+    )
+    deleted, more_deleted = DELETED_STREAM.page(
+        Tombstone.objects.values("id", "kind", "object_id", "deleted_at"),
+        positions[DELETED],
+        horizon,
+        limit,
+    )
+    token = encode_cursor(
+        Cursor(
+            position=(),
+            params={
+                TICKETS: TICKET_STREAM.position(tickets, positions[TICKETS]),
+                COMMENTS: COMMENT_STREAM.position(comments, positions[COMMENTS]),
+                DELETED: DELETED_STREAM.position(deleted, positions[DELETED]),
+                "at": horizon.isoformat(),
+            },
+        )
+    )
+    for comment in comments:
+        # Ключ курсора, а не поле комментария.
+        del comment[COMMENT_STREAM.key]
+    return Changes(
+        tickets=ticket_selection.serialize(tickets),
+        comments=comments,
+        deleted_tickets=[
+            row["object_id"] for row in deleted if row["kind"] == Tombstone.Kind.TICKET
+        ],
+        deleted_comments=[
+            row["object_id"] for row in deleted if row["kind"] == Tombstone.Kind.COMMENT
+        ],
+        cursor=token,
+        has_more=more_tickets or more_comments or more_deleted,
+    )
+
+
+def prune_tombstones(using=None):
+    """Удаляет записи об удалениях старше срока хранения; возвращает число."""
+    old = Tombstone.objects.using(using).filter(deleted_at__lt=tombstone_cutoff())
+    deleted, _ = old.delete()
+    return deleted
@@ -0,0 +1,29 @@
+"""Фоновые задачи приложения; выполняются командой run_worker (tickets/jobs.py)."""
+
+from django.contrib.auth import get_user_model
+from django.http import QueryDict
+
+from .bulk import delete_tickets, update_tickets
+from .filters import TicketFilters
+from .jobs import task
+from .models import Ticket
+
+
+@task("tickets.bulk_action")
+def bulk_action(action, filters, value=None, author=None, max_id=None):
+    """Массовое действие над всеми заявками под фильтрами (querystring) с id
+    не больше ``max_id`` — последней заявки, которую видел пользователь.
+
+    Повтор после сбоя безопасен: уже изменённые заявки update_tickets
+    пропускает, удалённые не находятся.
+    """
+    queryset = TicketFilters.from_params(QueryDict(filters)).apply(
+        Ticket.objects.all(), ranked=False
+    )
+    if max_id is not None:
+        queryset = queryset.filter(pk__lte=max_id)
+    if action == "delete":
+        delete_tickets(queryset)
+        return
+    user = get_user_model().objects.filter(pk=author).first() if author else None
+    update_tickets(queryset, action, value, author=user)
@@ -0,0 +1,50 @@
+from django import template
+
+from ..cache import cached_fragment
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, name, version, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.version = version
+        self.vary_on = vary_on
+
+    def render(self, context):
+        name = self.name.resolve(context)
+        version = self.version.resolve(context)
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        return cached_fragment(
+            name, version, vary_on, lambda: self.nodelist.render(context)
+        )
+
+
+@register.tag
+def fragment_cache(parser, token):
+    """Кэширует содержимое блока до смены версии.
+
+    Использование::
+
+        {% fragment_cache "ticket_rows" "list" page_key %}
+            ...
+        {% endfragment_cache %}
+
+    Первый аргумент — имя фрагмента (для счётчиков попаданий), второй — имя
+    версии из tickets.cache, остальные входят в ключ. Внутрь блока нельзя
+    класть то, что зависит от пользователя или сессии (csrf_token и т.п.).
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' ожидает имя фрагмента и имя версии."
+        )
+    nodelist = parser.parse(("endfragment_cache",))
+    parser.delete_first_token()
+    return FragmentCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
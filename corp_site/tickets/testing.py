@@ -0,0 +1,23 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class BudgetTestRunner(DiscoverRunner):
+    """Обычный раннер, но превышение бюджета запросов роняет тест.
+
+    Любой запрос тестового клиента к представлению с бюджетом проверяется
+    RequestProfileMiddleware, так что существующие тесты ничего для этого не
+    меняют. Чтения с реплики выключены и с DATABASE_REPLICA_URL: тесты
+    реплики включают их сами.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._budgets = override_settings(
+            TICKETS_QUERY_BUDGETS="raise", TICKETS_DB_REPLICA=""
+        )
+        self._budgets.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._budgets.disable()
+        super().teardown_test_environment(**kwargs)
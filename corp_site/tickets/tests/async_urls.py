@@ -0,0 +1,10 @@
+from django.urls import include, path
+
+from corp_site.urls import urlpatterns as project_patterns
+from tickets.urls import ticket_patterns
+
+# Как при TICKETS_ASYNC_VIEWS=True: async-маршруты стоят раньше синхронных.
+urlpatterns = [
+    path("tickets/", include(ticket_patterns(use_async=True))),
+    *project_patterns,
+]
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.signals import pre_delete
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tickets.models import Comment, Ticket, Tombstone
+
+
+class CommentActivityTests(TestCase):
+    def setUp(self):
+        self.ticket = Ticket.objects.create(title="Тикет", description="Описание")
+
+    def test_add_comment_updates_ticket(self):
+        self.client.post(
+            reverse("ticket_add_comment", args=[self.ticket.pk]),
+            {"author_name": "Иван", "message": "Первый"},
+        )
+        self.ticket.refresh_from_db()
+        comment = self.ticket.comments.get()
+        self.assertEqual(self.ticket.comment_count, 1)
+        self.assertEqual(self.ticket.last_activity_at, comment.created_at)
+
+    def test_delete_comment_recomputes_fields(self):
+        first = Comment.objects.create(ticket=self.ticket, author_name="А", message="1")
+        second = Comment.objects.create(ticket=self.ticket, author_name="Б", message="2")
+
+        second.delete()
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.comment_count, 1)
+        self.assertEqual(self.ticket.last_activity_at, first.created_at)
+
+        Comment.objects.filter(ticket=self.ticket).delete()
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.comment_count, 0)
+        self.assertEqual(self.ticket.last_activity_at, self.ticket.created_at)
+
+    def test_cascade_does_not_update_deleted_ticket(self):
+        for i in range(3):
+            Comment.objects.create(ticket=self.ticket, author_name="А", message=str(i))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.ticket.delete()
+
+        updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "tickets_ticket"')]
+        self.assertEqual(updates, [])
+        self.assertFalse(Comment.objects.exists())
+
+    def test_queryset_cascade_does_not_update_deleted_ticket(self):
+        Comment.objects.create(ticket=self.ticket, author_name="А", message="1")
+
+        with CaptureQueriesContext(connection) as queries:
+            Ticket.objects.filter(pk=self.ticket.pk).delete()
+
+        updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "tickets_ticket"')]
+        self.assertEqual(updates, [])
+
+    def test_failed_ticket_delete_leaves_comment_signals_working(self):
+        first = Comment.objects.create(ticket=self.ticket, author_name="А", message="1")
+        second = Comment.objects.create(ticket=self.ticket, author_name="Б", message="2")
+
+        def fail(**kwargs):
+            raise RuntimeError("Сбой посреди каскада")
+
+        pre_delete.connect(fail, sender=Comment)
+        try:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.ticket.delete()
+        finally:
+            pre_delete.disconnect(fail, sender=Comment)
+
+        second_pk = second.pk
+        second.delete()
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.comment_count, 1)
+        self.assertEqual(self.ticket.last_activity_at, first.created_at)
+        self.assertTrue(
+            Tombstone.objects.filter(kind=Tombstone.Kind.COMMENT, object_id=second_pk).exists()
+        )
+
+    def test_stale_ticket_save_keeps_comment_count(self):
+        stale = Ticket.objects.get(pk=self.ticket.pk)
+        Comment.objects.create(ticket=self.ticket, author_name="А", message="1")
+
+        stale.title = "Новое название"
+        stale.save()
+
+        self.ticket.refresh_from_db()
+        self.assertEqual(self.ticket.title, "Новое название")
+        self.assertEqual(self.ticket.comment_count, 1)
+
+    def test_rebuild_command_fixes_bulk_inserts(self):
+        Comment.objects.bulk_create(
+            Comment(ticket=self.ticket, author_name="А", message=str(i)) for i in range(4)
+        )
+        call_command("rebuild_ticket_activity", batch_size=1, stdout=mock.Mock())
+
+        self.ticket.refresh_from_db()
+        latest = self.ticket.comments.order_by("-created_at").first()
+        self.assertEqual(self.ticket.comment_count, 4)
+        self.assertEqual(self.ticket.last_activity_at, latest.created_at)
+
+
+class RecentlyActiveSortTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.old = Ticket.objects.create(title="Старая", description="Описание")
+        self.new = Ticket.objects.create(title="Новая", description="Описание")
+        Ticket.objects.filter(pk=self.old.pk).update(created_at=now - timedelta(days=2))
+        Comment.objects.create(ticket=self.old, author_name="А", message="Ожила")
+
+    def test_default_sort_is_by_creation(self):
+        response = self.client.get(reverse("ticket_list"))
+        self.assertEqual(list(response.context["tickets"]), [self.new, self.old])
+
+    def test_activity_sort(self):
+        response = self.client.get(reverse("ticket_list"), {"sort": "activity"})
+        self.assertEqual(list(response.context["tickets"]), [self.old, self.new])
+
+    @override_settings(TICKETS_LIST_PAGINATION="cursor")
+    def test_activity_sort_in_cursor_mode(self):
+        view = "tickets.views.TicketListView.paginate_by"
+        with mock.patch(view, 1):
+            response = self.client.get(reverse("ticket_list"), {"sort": "activity"})
+            self.assertEqual(list(response.context["tickets"]), [self.old])
+            token = response.context["cursor_page"].next_token
+            response = self.client.get(reverse("ticket_list"), {"cursor": token})
+        self.assertEqual(list(response.context["tickets"]), [self.new])
+        self.assertEqual(response.context["sort"], "activity")
@@ -0,0 +1,107 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tickets.models import Comment, Ticket
+from tickets.pagination import EstimatedCountPaginator
+
+
+# Манифест статики появляется только после collectstatic.
+@override_settings(
+    STORAGES={
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+        },
+    }
+)
+class AdminChangeListTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", password="test-pass-123")
+        self.client.force_login(self.admin)
+
+    def add_tickets(self, count):
+        start = Ticket.objects.count()
+        for n in range(start, start + count):
+            ticket = Ticket.objects.create(title=f"Заявка {n}", description="Описание")
+            Comment.objects.create(ticket=ticket, author_name="Иван", message="Проверил")
+
+    def assertConstantQueries(self, url, queries, params=None):
+        """Одинаковое число запросов при 2 и 12 объектах."""
+        self.add_tickets(2)
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        self.add_tickets(10)
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_ticket_changelist(self):
+        response = self.assertConstantQueries(reverse("admin:tickets_ticket_changelist"), 7)
+        self.assertContains(response, "Заявка 11")
+
+    def test_ticket_changelist_filtered(self):
+        response = self.assertConstantQueries(
+            reverse("admin:tickets_ticket_changelist"), 7, {"q": "Заявка", "status__exact": "new"}
+        )
+        cl = response.context["cl"]
+        self.assertEqual(cl.result_count, 12)
+        # Всего — из счётчиков заявок.
+        self.assertEqual(cl.full_result_count, 12)
+        self.assertTrue(cl.show_full_result_count)
+
+    def test_comment_changelist(self):
+        response = self.assertConstantQueries(reverse("admin:tickets_comment_changelist"), 6)
+        self.assertContains(response, "Заявка 11")
+
+    def test_comment_search_uses_ticket_index(self):
+        self.add_tickets(2)
+        Comment.objects.create(
+            ticket=Ticket.objects.create(title="Принтер", description="Не печатает"),
+            author_name="Пётр",
+            message="Заменил картридж",
+        )
+        response = self.client.get(reverse("admin:tickets_comment_changelist"), {"q": "принт"})
+        self.assertEqual(
+            [comment.author_name for comment in response.context["cl"].result_list], ["Пётр"]
+        )
+
+    def test_date_hierarchy(self):
+        self.add_tickets(1)
+        ticket = Ticket.objects.get()
+        created = ticket.created_at
+        response = self.client.get(
+            reverse("admin:tickets_ticket_changelist"),
+            {"created_at__year": created.year, "created_at__month": created.month},
+        )
+        self.assertEqual(list(response.context["cl"].result_list), [ticket])
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def test_exact_count_without_estimate(self):
+        Ticket.objects.create(title="Принтер", description="Не печатает")
+        paginator = EstimatedCountPaginator(Ticket.objects.all(), 10)
+        self.assertEqual(paginator.count, 1)
+        self.assertFalse(paginator.estimated)
+
+    def test_estimate_above_threshold(self):
+        with (
+            mock.patch("tickets.pagination.estimate_count", return_value=5000),
+            self.settings(TICKETS_COUNT_ESTIMATE_THRESHOLD=1000),
+        ):
+            paginator = EstimatedCountPaginator(Ticket.objects.all(), 10)
+            self.assertEqual(paginator.count, 5000)
+        self.assertTrue(paginator.estimated)
+        self.assertEqual(paginator.num_pages, 500)
+
+    def test_exact_count_below_threshold(self):
+        with (
+            mock.patch("tickets.pagination.estimate_count", return_value=50),
+            self.settings(TICKETS_COUNT_ESTIMATE_THRESHOLD=1000),
+        ):
+            paginator = EstimatedCountPaginator(Ticket.objects.all(), 10)
+            self.assertEqual(paginator.count, 0)
+        self.assertFalse(paginator.estimated)
@@ -0,0 +1,138 @@
+from urllib.parse import parse_qs, urlsplit
+
+from django.test import TestCase
+from django.urls import reverse
+
+from tickets.models import Comment, Ticket
+
+
+class TicketApiListTests(TestCase):
+    def setUp(self):
+        self.printer = Ticket.objects.create(
+            title="Принтер", description="Не печатает", priority=Ticket.Priority.HIGH
+        )
+        self.server = Ticket.objects.create(
+            title="Сервер", description="Упал", status=Ticket.Status.DONE
+        )
+        self.url = reverse("api_ticket_list")
+
+    def test_default_fields(self):
+        data = self.client.get(self.url).json()
+
+        self.assertEqual(
+            [row["id"] for row in data["results"]], [self.server.pk, self.printer.pk]
+        )
+        self.assertEqual(
+            set(data["results"][0]),
+            {"id", "title", "status", "priority", "due_date", "created_at", "comment_count"},
+        )
+        self.assertEqual(data["count"], {"value": 2, "estimated": False})
+
+    def test_sparse_fields_skip_unrequested_columns(self):
+        with self.assertNumQueries(2):
+            data = self.client.get(self.url, {"fields": "title,status"}).json()
+
+        self.assertEqual(
+            data["results"],
+            [
+                {"title": "Сервер", "status": "done"},
+                {"title": "Принтер", "status": "new"},
+            ],
+        )
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(self.url, {"fields": "title,password"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", response.json()["error"])
+
+    def test_filters(self):
+        data = self.client.get(self.url, {"status": "done"}).json()
+        self.assertEqual([row["title"] for row in data["results"]], ["Сервер"])
+
+        data = self.client.get(self.url, {"priority": "3"}).json()
+        self.assertEqual([row["title"] for row in data["results"]], ["Принтер"])
+
+        data = self.client.get(self.url, {"q": "печат"}).json()
+        self.assertEqual([row["title"] for row in data["results"]], ["Принтер"])
+
+    def test_cursor_keeps_filters_and_fields(self):
+        for i in range(3):
+            Ticket.objects.create(title=f"Новая {i}", description="-")
+
+        first = self.client.get(
+            self.url, {"status": "new", "fields": "title", "limit": 2}
+        ).json()
+        second = self.client.get(first["next"]).json()
+
+        self.assertEqual([row["title"] for row in first["results"]], ["Новая 2", "Новая 1"])
+        self.assertEqual([row["title"] for row in second["results"]], ["Новая 0", "Принтер"])
+        self.assertIsNone(second["next"])
+        self.assertNotIn("count", second)
+        previous = self.client.get(second["previous"]).json()
+        self.assertEqual([row["title"] for row in previous["results"]], ["Новая 2", "Новая 1"])
+
+    def test_bad_cursor_and_limit(self):
+        self.assertEqual(self.client.get(self.url, {"cursor": "junk"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"limit": "0"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"limit": "1000"}).status_code, 400)
+
+    def test_read_only(self):
+        self.assertEqual(self.client.post(self.url).status_code, 405)
+
+
+class TicketApiBatchTests(TestCase):
+    def setUp(self):
+        self.tickets = [
+            Ticket.objects.create(title=f"Заявка {i}", description="-") for i in range(3)
+        ]
+        self.url = reverse("api_ticket_batch")
+
+    def test_returns_tickets_in_requested_order(self):
+        ids = [self.tickets[2].pk, 999, self.tickets[0].pk]
+
+        with self.assertNumQueries(1):
+            data = self.client.get(
+                self.url, {"ids": ",".join(map(str, ids)), "fields": "title"}
+            ).json()
+
+        self.assertEqual(data["results"], [{"title": "Заявка 2"}, {"title": "Заявка 0"}])
+        self.assertEqual(data["missing"], [999])
+
+    def test_invalid_ids(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"ids": "1,abc"}).status_code, 400)
+        too_many = ",".join(str(i) for i in range(1, 102))
+        self.assertEqual(self.client.get(self.url, {"ids": too_many}).status_code, 400)
+
+
+class TicketApiCommentsTests(TestCase):
+    def setUp(self):
+        self.ticket = Ticket.objects.create(title="Инцидент", description="-")
+        for i in range(3):
+            Comment.objects.create(ticket=self.ticket, author_name="Иван", message=f"№{i}")
+        self.url = reverse("api_ticket_comments", args=[self.ticket.pk])
+
+    def test_comments_newest_first_with_cursor(self):
+        first = self.client.get(self.url, {"limit": 2, "fields": "message"}).json()
+        second = self.client.get(first["next"]).json()
+
+        self.assertEqual(first["results"], [{"message": "№2"}, {"message": "№1"}])
+        self.assertEqual(second["results"], [{"message": "№0"}])
+
+    def test_missing_ticket(self):
+        url = reverse("api_ticket_comments", args=[self.ticket.pk + 1])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_cursor_from_another_ticket_is_rejected(self):
+        other = Ticket.objects.create(title="Другая", description="-")
+        Comment.objects.create(ticket=other, author_name="Анна", message="a")
+        Comment.objects.create(ticket=other, author_name="Анна", message="b")
+        other_url = reverse("api_ticket_comments", args=[other.pk])
+        next_url = self.client.get(other_url, {"limit": 1}).json()["next"]
+        token = parse_qs(urlsplit(next_url).query)["cursor"][0]
+        self.assertEqual(self.client.get(other_url, {"cursor": token}).status_code, 200)
+
+        response = self.client.get(self.url, {"cursor": token})
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,124 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+
+from tickets import async_views
+from tickets.models import Comment, Ticket
+from tickets.tests import test_comment_pages, test_conditional, test_pagination, test_views
+
+ASYNC_URLS = "tickets.tests.async_urls"
+
+
+# Поведение async-представлений должно совпадать с синхронными: те же тесты
+# прогоняются через async-маршруты.
+@override_settings(ROOT_URLCONF=ASYNC_URLS)
+class AsyncTicketListViewTests(test_views.TicketListViewTests):
+    pass
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLS)
+class AsyncTicketListFilterTests(test_views.TicketListFilterTests):
+    pass
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLS)
+class AsyncTicketDetailViewTests(test_views.TicketDetailViewTests):
+    pass
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLS)
+class AsyncAddCommentTests(test_views.AddCommentTests):
+    pass
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLS)
+class AsyncTicketCommentPagesTests(test_comment_pages.TicketCommentPagesTests):
+    pass
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLS)
+class AsyncTicketListCursorModeTests(test_pagination.TicketListCursorModeTests):
+    pass
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLS)
+class AsyncConditionalDetailTests(test_conditional.ConditionalDetailTests):
+    pass
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLS)
+class AsyncConditionalListTests(test_conditional.ConditionalListTests):
+    pass
+
+
+@override_settings(ROOT_URLCONF=ASYNC_URLS)
+class AsyncClientTests(TestCase):
+    def setUp(self):
+        self.ticket = Ticket.objects.create(title="Принтер", description="Не печатает")
+        Comment.objects.create(ticket=self.ticket, author_name="Иван", message="Смотрю")
+
+    def test_urls_resolve_to_async_views(self):
+        match = resolve(reverse("ticket_list"))
+        self.assertIs(match.func.view_class, async_views.AsyncTicketListView)
+        match = resolve(reverse("ticket_comments", args=[self.ticket.pk]))
+        self.assertIs(match.func, async_views.ticket_comments)
+
+    async def test_list_and_detail(self):
+        response = await self.async_client.get(reverse("ticket_list"))
+        self.assertContains(response, "Принтер")
+        self.assertEqual(response.context["result_count"].value, 1)
+
+        response = await self.async_client.get(
+            reverse("ticket_detail", args=[self.ticket.pk])
+        )
+        self.assertContains(response, "Смотрю")
+
+    async def test_unknown_ticket_is_not_found(self):
+        response = await self.async_client.get(
+            reverse("ticket_detail", args=[self.ticket.pk + 1])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_authenticated_user_is_loaded_asynchronously(self):
+        user = await User.objects.acreate_user("employee", password="test-pass-123")
+        await self.async_client.aforce_login(user)
+
+        response = await self.async_client.get(reverse("ticket_list"))
+
+        self.assertContains(response, "employee")
+
+    async def test_add_comment(self):
+        response = await self.async_client.post(
+            reverse("ticket_add_comment", args=[self.ticket.pk]),
+            {"author_name": "Анна", "message": "Заменили картридж"},
+        )
+
+        self.assertRedirects(
+            response,
+            reverse("ticket_detail", args=[self.ticket.pk]),
+            fetch_redirect_response=False,
+        )
+        await self.ticket.arefresh_from_db()
+        self.assertEqual(self.ticket.comment_count, 2)
+
+    async def test_query_counts_match_sync_views(self):
+        # Под ASGI запросы выполняются в потоке sync_to_async, а не в потоке
+        # event loop: замер должен видеть и их.
+        async def profile(url):
+            cache.clear()
+            response = await self.async_client.get(url)
+            return response.asgi_request.request_profile
+
+        list_url = reverse("ticket_list")
+        detail_url = reverse("ticket_detail", args=[self.ticket.pk])
+        with self.settings(ROOT_URLCONF="corp_site.urls"):
+            sync_list = (await profile(list_url)).query_count
+            sync_detail = (await profile(detail_url)).query_count
+        async_list = await profile(list_url)
+        async_detail = await profile(detail_url)
+
+        self.assertGreater(sync_list, 0)
+        self.assertGreater(sync_detail, 0)
+        self.assertEqual(async_list.query_count, sync_list)
+        self.assertEqual(async_detail.query_count, sync_detail)
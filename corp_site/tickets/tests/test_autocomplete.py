@@ -0,0 +1,89 @@
+from unittest import mock, skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from tickets import autocomplete
+from tickets.autocomplete import suggest
+from tickets.models import Comment, Ticket
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.printer = Ticket.objects.create(title="Принтер не печатает", description="Кабинет 12")
+        self.scanner = Ticket.objects.create(title="Сканер и принтер", description="Третий этаж")
+        self.mail = Ticket.objects.create(title="Почта", description="Принтер тут ни при чём")
+
+    def titles(self, query, **kwargs):
+        return [row["title"] for row in suggest(query, **kwargs).results]
+
+    def test_matches_titles_only(self):
+        self.assertCountEqual(
+            self.titles("принтер"), ["Принтер не печатает", "Сканер и принтер"]
+        )
+
+    @skipUnless(connection.vendor == "sqlite", "префиксы слов FTS5")
+    def test_word_prefix(self):
+        self.assertEqual(self.titles("печ"), ["Принтер не печатает"])
+        self.assertEqual(self.titles("сканер прин"), ["Сканер и принтер"])
+
+    @skipUnless(connection.vendor == "postgresql", "триграммы pg_trgm")
+    def test_typo_and_prefix_first(self):
+        self.assertEqual(self.titles("принтр")[0], "Принтер не печатает")
+
+    def test_short_query_skips_database(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.titles(" п "), [])
+
+    def test_limit(self):
+        self.assertEqual(len(self.titles("принтер", limit=1)), 1)
+
+    def test_cached_until_tickets_change(self):
+        self.titles("почта")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.titles("  ПОЧТА "), ["Почта"])
+
+        Ticket.objects.create(title="Почта не приходит", description="Срочно")
+        self.assertEqual(len(self.titles("почта")), 2)
+
+    def test_other_changes_keep_cache(self):
+        self.titles("почта")
+        self.mail.status = Ticket.Status.DONE
+        self.mail.save()
+        Comment.objects.create(ticket=self.mail, author_name="Иван", message="Проверил")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.titles("почта"), ["Почта"])
+
+        self.mail.title = "Почта и календарь"
+        self.mail.save()
+        self.assertEqual(self.titles("почта"), ["Почта и календарь"])
+
+    def test_timeout_returns_nothing(self):
+        with (
+            self.settings(TICKETS_AUTOCOMPLETE_TIMEOUT_MS=0),
+            mock.patch.object(autocomplete, "SQLITE_PROGRESS_STEP", 1),
+        ):
+            suggestions = suggest("принтер")
+        self.assertTrue(suggestions.timed_out)
+        self.assertEqual(suggestions.results, [])
+        # Отменённый запрос не кэшируется.
+        self.assertEqual(len(self.titles("принтер")), 2)
+
+    def test_api(self):
+        url = reverse("api_ticket_autocomplete")
+        response = self.client.get(url, {"q": "почта"})
+
+        self.assertEqual(
+            response.json(),
+            {"q": "почта", "results": [{"id": self.mail.pk, "title": "Почта"}], "timed_out": False},
+        )
+        self.assertIn("max-age=30", response["Cache-Control"])
+        self.assertIn("private", response["Cache-Control"])
+        self.assertEqual(self.client.get(url, {"q": "x", "limit": "50"}).status_code, 400)
+
+    def test_list_page_has_autocomplete(self):
+        response = self.client.get(reverse("ticket_list"))
+        self.assertContains(response, f'data-autocomplete="{reverse("api_ticket_autocomplete")}"')
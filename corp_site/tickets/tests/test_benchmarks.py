@@ -0,0 +1,136 @@
+import asyncio
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db.models import Count, Max
+from django.test import TestCase
+
+from tickets.benchmarks.data import ensure_tickets
+from tickets.benchmarks.servers import read_response
+from tickets.counts import bucket_count
+from tickets.filters import TicketFilters
+from tickets.models import Comment, Ticket
+
+
+class SyntheticDataTests(TestCase):
+    def test_generator_is_deterministic(self):
+        ensure_tickets(50, seed=7)
+        first = list(Ticket.objects.order_by("pk").values_list("title", "status", "created_at"))
+        comments = Comment.objects.count()
+        Ticket.objects.all().delete()
+
+        ensure_tickets(50, seed=7)
+
+        self.assertEqual(
+            list(Ticket.objects.order_by("pk").values_list("title", "status", "created_at")),
+            first,
+        )
+        self.assertEqual(Comment.objects.count(), comments)
+
+    def test_tops_up_to_count(self):
+        ensure_tickets(20)
+        ensure_tickets(30)
+        ensure_tickets(10)
+
+        self.assertEqual(Ticket.objects.count(), 30)
+        self.assertEqual(bucket_count(TicketFilters()), 30)
+
+    def test_denormalized_fields_match_comments(self):
+        ensure_tickets(200, seed=1)
+
+        actual = Ticket.objects.annotate(
+            n=Count("comments"), last=Max("comments__created_at")
+        )
+        for ticket in actual:
+            self.assertEqual(ticket.comment_count, ticket.n)
+            self.assertEqual(ticket.last_activity_at, ticket.last or ticket.created_at)
+
+    def test_distribution_is_skewed(self):
+        ensure_tickets(500, seed=3)
+
+        statuses = dict(
+            Ticket.objects.values_list("status").annotate(n=Count("id")).order_by()
+        )
+        self.assertGreater(statuses[Ticket.Status.DONE], statuses[Ticket.Status.NEW])
+        without_comments = Ticket.objects.filter(comment_count=0).count()
+        self.assertGreater(without_comments, 250)
+        self.assertGreater(Ticket.objects.aggregate(m=Max("comment_count"))["m"], 5)
+        self.assertTrue(Ticket.objects.filter(due_date__isnull=False).exists())
+
+    def test_seed_command(self):
+        out = io.StringIO()
+        call_command("seed_tickets", "25", "--no-comments", stdout=out)
+
+        self.assertIn("Заявок: 25, комментариев: 0", out.getvalue())
+
+
+class BenchCompareTests(TestCase):
+    def write(self, directory, name, results):
+        path = Path(directory) / name
+        path.write_text(json.dumps({"results": results}), encoding="utf-8")
+        return str(path)
+
+    def test_reports_changes_per_case(self):
+        row = {"suite": "views", "vendor": "sqlite", "size": 10, "case": "list", "n": 5}
+        with tempfile.TemporaryDirectory() as directory:
+            before = self.write(
+                directory,
+                "before.json",
+                [
+                    {**row, "p50_ms": 10.0, "p95_ms": 20.0, "queries": 3},
+                    {**row, "case": "detail", "p50_ms": 5.0, "p95_ms": 6.0, "queries": 2},
+                ],
+            )
+            after = self.write(
+                directory,
+                "after.json",
+                [
+                    {**row, "p50_ms": 5.0, "p95_ms": 20.0, "queries": 4},
+                    {**row, "case": "admin", "p50_ms": 1.0, "p95_ms": 1.0, "queries": 1},
+                ],
+            )
+            out = io.StringIO()
+            call_command("bench_compare", before, after, "--no-color", stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertIn("case=admin size=10 suite=views: только в after", lines)
+        self.assertIn("case=detail size=10 suite=views: только в before", lines)
+        self.assertIn(
+            "case=list size=10 suite=views: p50_ms 10.0 → 5.0 (-50.0%), "
+            "queries 3 → 4 (+33.3%)",
+            lines,
+        )
+
+
+class LoadClientTests(TestCase):
+    def parse(self, raw):
+        async def feed():
+            reader = asyncio.StreamReader()
+            reader.feed_data(raw + b"NEXT")
+            reader.feed_eof()
+            result = await read_response(reader)
+            return result, await reader.read()
+
+        return asyncio.run(feed())
+
+    def test_content_length_keeps_connection(self):
+        result, rest = self.parse(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello")
+        self.assertEqual(result, (200, True))
+        self.assertEqual(rest, b"NEXT")
+
+    def test_chunked_body(self):
+        result, rest = self.parse(
+            b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+            b"5\r\nhello\r\n0\r\n\r\n"
+        )
+        self.assertEqual(result, (200, True))
+        self.assertEqual(rest, b"NEXT")
+
+    def test_connection_close(self):
+        result, _ = self.parse(
+            b"HTTP/1.1 404 Not Found\r\nConnection: close\r\nContent-Length: 0\r\n\r\n"
+        )
+        self.assertEqual(result, (404, False))
@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import get_resolver, reverse
+
+from tickets.budgets import BUDGETS, Budget
+from tickets.instrumentation import RequestProfile, record_queries
+from tickets.middleware import BudgetExceeded
+from tickets.models import Comment, Ticket
+
+
+class RecordQueriesTests(TestCase):
+    def test_counts_queries_but_not_savepoints(self):
+        profile = RequestProfile()
+        with record_queries(profile):
+            with transaction.atomic():
+                Ticket.objects.count()
+            Ticket.objects.exists()
+
+        self.assertEqual(profile.query_count, 2)
+        self.assertGreater(profile.sql_ms, 0)
+
+
+class BudgetTests(TestCase):
+    def test_every_ticket_url_has_a_budget(self):
+        names = {pattern.name for pattern in get_resolver("tickets.urls").url_patterns}
+        self.assertEqual(names - set(BUDGETS), set())
+
+    def test_violations_list_every_exceeded_limit(self):
+        profile = RequestProfile(
+            queries=[("SELECT 1", 3.0)] * 3, sql_ms=9, render_ms=20
+        )
+
+        self.assertEqual(Budget(queries=3).violations(profile), [])
+        self.assertEqual(
+            Budget(queries=2, sql_ms=5, render_ms=10).violations(profile),
+            ["запросов 3 > 2", "SQL 9.0 мс > 5 мс", "рендеринг 20.0 мс > 10 мс"],
+        )
+
+
+class RequestProfileMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ticket = Ticket.objects.create(title="Принтер", description="Не печатает")
+
+    def test_detail_budget_does_not_depend_on_comment_count(self):
+        for count in (1, 60):
+            Comment.objects.bulk_create(
+                Comment(ticket=self.ticket, author_name="Иван", message="…")
+                for _ in range(count)
+            )
+            cache.clear()
+            response = self.client.get(reverse("ticket_detail", args=[self.ticket.pk]))
+
+            self.assertEqual(response.wsgi_request.request_profile.query_count, 2)
+
+    def test_session_and_user_are_outside_the_budget(self):
+        self.client.force_login(User.objects.create_user("agent"))
+
+        response = self.client.get(reverse("ticket_list"))
+
+        self.assertEqual(response.wsgi_request.request_profile.query_count, 2)
+        self.assertGreater(response.wsgi_request.request_profile.render_ms, 0)
+
+    def test_exceeded_budget_fails_the_request(self):
+        with mock.patch.dict(BUDGETS, {"ticket_list": Budget(queries=1)}):
+            with self.assertRaisesMessage(BudgetExceeded, "запросов 2 > 1"):
+                self.client.get(reverse("ticket_list"))
+
+    @override_settings(TICKETS_QUERY_BUDGETS="warn")
+    def test_warn_mode_logs_instead_of_raising(self):
+        with mock.patch.dict(BUDGETS, {"ticket_list": Budget(queries=1)}):
+            with self.assertLogs("tickets.budgets", "WARNING") as logs:
+                response = self.client.get(reverse("ticket_list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("(ticket_list) превышает бюджет", logs.output[0])
+
+    @override_settings(TICKETS_QUERY_BUDGETS="off", TICKETS_METRICS=False)
+    def test_off_mode_does_not_measure(self):
+        with mock.patch.dict(BUDGETS, {"ticket_list": Budget(queries=0)}):
+            response = self.client.get(reverse("ticket_list"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(hasattr(response.wsgi_request, "request_profile"))
@@ -0,0 +1,163 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from tickets import bulk
+from tickets.events import LIST_CHANNEL, message_ids, ticket_channel
+from tickets.jobs import Worker
+from tickets.models import Comment, Job, Ticket, Tombstone
+from tickets.tests.test_counts import counters
+
+
+class BulkActionTests(TestCase):
+    def setUp(self):
+        self.url = reverse("ticket_bulk")
+        self.user = User.objects.create_user("employee", password="test-pass-123")
+        self.client.force_login(self.user)
+        self.printer = Ticket.objects.create(title="Принтер", description="Не печатает")
+        self.server = Ticket.objects.create(
+            title="Сервер", description="Упал", priority=Ticket.Priority.HIGH
+        )
+        self.mail = Ticket.objects.create(
+            title="Почта", description="Не приходит", status=Ticket.Status.DONE
+        )
+
+    def post(self, **data):
+        return self.client.post(self.url, data, follow=True)
+
+    def test_change_status_of_selected(self):
+        updated_at = self.printer.updated_at
+
+        response = self.post(
+            action="status", status="in_progress", ids=[self.printer.pk, self.server.pk]
+        )
+
+        self.assertRedirects(response, reverse("ticket_list"))
+        self.assertContains(response, "Изменено заявок: 2.")
+        self.assertEqual(
+            set(Ticket.objects.filter(status="in_progress").values_list("pk", flat=True)),
+            {self.printer.pk, self.server.pk},
+        )
+        self.printer.refresh_from_db()
+        self.assertGreater(self.printer.updated_at, updated_at)
+        self.assertEqual(counters(), {("in_progress", 2): 1, ("in_progress", 3): 1, ("done", 2): 1})
+
+    def test_rows_with_the_value_are_skipped(self):
+        response = self.post(action="status", status="done", ids=[self.printer.pk, self.mail.pk])
+
+        self.assertContains(response, "Изменено заявок: 1.")
+        self.assertEqual(counters(), {("done", 2): 2, ("new", 3): 1})
+
+    def test_change_priority_of_all_found(self):
+        response = self.post(
+            action="priority", priority="1", select_all="on", filters="status=new"
+        )
+
+        self.assertRedirects(response, f"{reverse('ticket_list')}?status=new")
+        self.assertContains(response, "Изменено заявок: 2.")
+        self.assertEqual(counters(), {("new", 1): 2, ("done", 2): 1})
+        self.mail.refresh_from_db()
+        self.assertEqual(self.mail.priority, Ticket.Priority.MEDIUM)
+
+    def test_budget_counts_one_batch(self):
+        # Тестовый прогон бросает BudgetExceeded при превышении бюджета.
+        with mock.patch.object(bulk, "BATCH_SIZE", 1):
+            response = self.client.post(
+                self.url, {"action": "status", "status": "done", "select_all": "on"}
+            )
+
+        # Две заявки по одной и пустая пачка в конце.
+        self.assertEqual(len(response.wsgi_request.request_profile.batches), 3)
+        self.assertEqual(counters(), {("done", 2): 2, ("done", 3): 1})
+
+    def test_large_selection_runs_in_worker(self):
+        with (
+            self.settings(TICKETS_BULK_INLINE_LIMIT=1),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            response = self.post(
+                action="priority", priority="1", select_all="on", filters="status=new"
+            )
+
+        self.assertContains(response, "действие выполняется в фоне")
+        job = Job.objects.get()
+        self.assertEqual(job.name, "tickets.bulk_action")
+        self.assertEqual(job.payload["max_id"], self.server.pk)
+        self.assertEqual(counters(), {("new", 2): 1, ("new", 3): 1, ("done", 2): 1})
+        # Создана после нажатия: под действие не попадает.
+        later = Ticket.objects.create(title="Сканер", description="Не сканирует")
+
+        Worker().run(burst=True)
+
+        self.assertFalse(Job.objects.exists())
+        later.refresh_from_db()
+        self.assertEqual(later.priority, Ticket.Priority.MEDIUM)
+        self.assertEqual(counters(), {("new", 1): 2, ("new", 2): 1, ("done", 2): 1})
+        change = self.printer.history.latest("changed_at")
+        self.assertEqual(change.author, self.user)
+
+    def test_delete_selected_with_comments(self):
+        Comment.objects.create(ticket=self.printer, author_name="Иван", message="Смотрю")
+        pks = [self.printer.pk, self.server.pk]
+
+        response = self.post(action="delete", ids=pks)
+
+        self.assertContains(response, "Удалено заявок: 2.")
+        self.assertEqual(list(Ticket.objects.values_list("pk", flat=True)), [self.mail.pk])
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(counters(), {("done", 2): 1})
+        # Комментарии уходят вместе с заявкой: клиенту хватает её удаления.
+        self.assertEqual(
+            sorted(Tombstone.objects.values_list("kind", "object_id")),
+            [("ticket", pk) for pk in pks],
+        )
+
+    def test_works_in_batches(self):
+        with mock.patch.object(bulk, "BATCH_SIZE", 2):
+            count = bulk.update_tickets(Ticket.objects.all(), "priority", 1)
+            self.assertEqual(count, 3)
+            self.assertEqual(bulk.delete_tickets(Ticket.objects.all()), 3)
+        self.assertFalse(Ticket.objects.exists())
+        self.assertEqual(counters(), {})
+
+    def test_publishes_one_list_event_per_batch(self):
+        with (
+            mock.patch("tickets.events.hub.publish_local") as publish,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            bulk.update_tickets(Ticket.objects.all(), "status", "done")
+
+        messages = [call.args[0] for call in publish.call_args_list]
+        channels = [message["channel"] for message in messages]
+        self.assertEqual(
+            channels, [ticket_channel(self.printer.pk), ticket_channel(self.server.pk), LIST_CHANNEL]
+        )
+        self.assertEqual(message_ids(messages[-1]), [self.printer.pk, self.server.pk])
+        self.assertEqual(messages[0]["data"]["status"], "done")
+
+    def test_invalid_form_shows_error(self):
+        response = self.post(action="status", ids=[self.printer.pk])
+        self.assertContains(response, "Выберите новое значение.")
+
+        response = self.post(action="delete")
+        self.assertContains(response, "Отметьте заявки.")
+        self.assertEqual(Ticket.objects.count(), 3)
+
+    def test_requires_login_and_post(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        self.client.logout()
+        response = self.client.post(self.url, {"action": "delete", "select_all": "on"})
+        self.assertRedirects(response, f"{reverse('login')}?next={self.url}")
+        self.assertEqual(Ticket.objects.count(), 3)
+
+    def test_list_shows_checkboxes_only_to_signed_in(self):
+        response = self.client.get(reverse("ticket_list"))
+        self.assertContains(response, 'id="bulk-form"')
+        self.assertContains(response, f'name="ids" value="{self.printer.pk}"')
+
+        self.client.logout()
+        response = self.client.get(reverse("ticket_list"))
+        self.assertNotContains(response, 'id="bulk-form"')
+        self.assertNotContains(response, f'value="{self.printer.pk}" form="bulk-form"')
@@ -0,0 +1,125 @@
+import tempfile
+
+from django.template import Context, Template, TemplateSyntaxError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tickets.activity import rebuild_activity
+from tickets.cache import fragment_stats, reset_fragment_stats
+from tickets.models import Comment, Ticket
+
+LOCMEM = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "tickets-fragment-tests",
+    }
+}
+
+
+@override_settings(CACHES=LOCMEM)
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        reset_fragment_stats()
+        self.ticket = Ticket.objects.create(title="Принтер", description="Не печатает")
+        Comment.objects.create(ticket=self.ticket, author_name="Иван", message="Смотрю")
+        self.detail_url = reverse("ticket_detail", args=[self.ticket.pk])
+
+    def test_list_rows_are_served_from_cache(self):
+        self.client.get(reverse("ticket_list"))
+        with self.assertNumQueries(1):
+            # Только строки счётчиков; самих заявок не читаем.
+            response = self.client.get(reverse("ticket_list"))
+
+        self.assertContains(response, "Принтер")
+        self.assertEqual(fragment_stats()["ticket_rows"], {"hits": 1, "misses": 1})
+
+    def test_filters_and_pages_are_cached_separately(self):
+        Ticket.objects.create(
+            title="Сервер", description="Упал", status=Ticket.Status.DONE
+        )
+        self.client.get(reverse("ticket_list"))
+
+        response = self.client.get(reverse("ticket_list"), {"status": "done"})
+
+        self.assertContains(response, "Сервер")
+        self.assertNotContains(response, "Принтер")
+        self.assertEqual(fragment_stats()["ticket_rows"]["misses"], 2)
+
+    def test_ticket_change_invalidates_list(self):
+        self.client.get(reverse("ticket_list"))
+        self.ticket.title = "Сканер"
+        self.ticket.save()
+
+        response = self.client.get(reverse("ticket_list"))
+
+        self.assertContains(response, "Сканер")
+
+    def test_comment_block_is_served_from_cache(self):
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url)
+
+        self.assertContains(response, "Смотрю")
+        self.assertEqual(fragment_stats()["ticket_comments"]["hits"], 1)
+
+    def test_new_and_deleted_comments_invalidate_block(self):
+        self.client.get(self.detail_url)
+        comment = Comment.objects.create(
+            ticket=self.ticket, author_name="Анна", message="Заменила картридж"
+        )
+        self.assertContains(self.client.get(self.detail_url), "Заменила картридж")
+
+        comment.delete()
+
+        self.assertNotContains(self.client.get(self.detail_url), "Заменила картридж")
+
+    def test_comment_invalidates_list_row(self):
+        self.client.get(reverse("ticket_list"))
+        Comment.objects.create(ticket=self.ticket, author_name="Анна", message="Ещё")
+
+        response = self.client.get(reverse("ticket_list"))
+
+        self.assertContains(response, "<td>2</td>", html=True)
+
+    def test_rebuild_invalidates_everything(self):
+        self.client.get(self.detail_url)
+        Comment.objects.bulk_create(
+            [Comment(ticket=self.ticket, author_name="Бот", message="Импорт")]
+        )
+        self.assertNotContains(self.client.get(self.detail_url), "Импорт")
+
+        rebuild_activity()
+
+        self.assertContains(self.client.get(self.detail_url), "Импорт")
+
+    def test_tag_requires_name_and_version(self):
+        with self.assertRaises(TemplateSyntaxError):
+            Template(
+                "{% load ticket_cache %}{% fragment_cache 'x' %}{% endfragment_cache %}"
+            )
+
+
+class FileCacheBackendTests(TestCase):
+    """Общий кэш между процессами: файловый бэкенд вместо Redis."""
+
+    def test_versions_shared_through_file_cache(self):
+        template = Template(
+            "{% load ticket_cache %}"
+            "{% fragment_cache 'probe' version %}{{ value }}{% endfragment_cache %}"
+        )
+        with tempfile.TemporaryDirectory() as location:
+            caches = {
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": location,
+                }
+            }
+            with override_settings(CACHES=caches):
+                ticket = Ticket.objects.create(title="Тикет", description="Текст")
+                version = f"ticket:{ticket.pk}"
+                first = template.render(Context({"version": version, "value": "1"}))
+                cached = template.render(Context({"version": version, "value": "2"}))
+                Comment.objects.create(ticket=ticket, author_name="Иван", message="Да")
+                fresh = template.render(Context({"version": version, "value": "3"}))
+
+        self.assertEqual((first, cached, fresh), ("1", "1", "3"))
@@ -0,0 +1,71 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tickets.models import Comment, Ticket
+
+
+@override_settings(TICKETS_COMMENTS_PAGE_SIZE=5)
+class TicketCommentPagesTests(TestCase):
+    def setUp(self):
+        self.ticket = Ticket.objects.create(title="Инцидент", description="Описание")
+        Comment.objects.bulk_create(
+            Comment(ticket=self.ticket, author_name="Дежурный", message=f"Запись {i:02}")
+            for i in range(12)
+        )
+        self.url = reverse("ticket_detail", args=[self.ticket.pk])
+
+    def test_detail_shows_latest_comments_in_order(self):
+        response = self.client.get(self.url)
+        messages = [c.message for c in response.context["comments"]]
+        self.assertEqual(messages, [f"Запись {i:02}" for i in range(7, 12)])
+        self.assertNotContains(response, "Запись 06")
+        self.assertContains(response, "Показать более ранние")
+
+    def test_query_count_does_not_depend_on_comments(self):
+        # Меряем рендер без кэша фрагментов.
+        cache.clear()
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+        Comment.objects.bulk_create(
+            Comment(ticket=self.ticket, author_name="Бот", message="Ещё")
+            for _ in range(50)
+        )
+        cache.clear()
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
+    def test_load_earlier_walks_back_to_first_comment(self):
+        url = self.client.get(self.url).context["comments_earlier_url"]
+
+        response = self.client.get(url)
+        self.assertEqual(
+            [c.message for c in response.context["comments"]],
+            [f"Запись {i:02}" for i in range(2, 7)],
+        )
+        response = self.client.get(response.context["comments_earlier_url"])
+
+        self.assertEqual(
+            [c.message for c in response.context["comments"]],
+            ["Запись 00", "Запись 01"],
+        )
+        self.assertIsNone(response.context["comments_earlier_url"])
+        self.assertNotContains(response, "Показать более ранние")
+
+    def test_cursor_of_another_ticket_is_rejected(self):
+        url = self.client.get(self.url).context["comments_earlier_url"]
+        other = Ticket.objects.create(title="Другая", description="Описание")
+        query = url.split("?", 1)[1]
+
+        response = self.client.get(
+            f"{reverse('ticket_comments', args=[other.pk])}?{query}"
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_comment_form_keeps_pagination(self):
+        response = self.client.post(
+            reverse("ticket_add_comment", args=[self.ticket.pk]),
+            {"author_name": "", "message": "Текст"},
+        )
+        self.assertEqual(len(response.context["comments"]), 5)
@@ -0,0 +1,117 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from tickets.models import Comment, Ticket
+
+
+class ConditionalDetailTests(TestCase):
+    def setUp(self):
+        self.ticket = Ticket.objects.create(title="Принтер", description="Описание")
+        self.url = reverse("ticket_detail", args=[self.ticket.pk])
+
+    def test_matching_etag_gets_304_without_rendering(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_if_modified_since_for_anonymous(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(
+            self.url, headers={"if-modified-since": last_modified}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_comment_changes_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        Comment.objects.create(ticket=self.ticket, author_name="Иван", message="Есть")
+
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Есть")
+
+    def test_edited_comment_changes_etag(self):
+        comment = Comment.objects.create(ticket=self.ticket, author_name="Иван", message="Есть")
+        etag = self.client.get(self.url)["ETag"]
+        comment.message = "Исправлено"
+        with self.captureOnCommitCallbacks(execute=True):
+            comment.save()
+
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Исправлено")
+
+    def test_etag_differs_between_users(self):
+        anonymous_etag = self.client.get(self.url)["ETag"]
+        user = User.objects.create_user("employee", password="test-pass-123")
+        self.client.force_login(user)
+
+        response = self.client.get(self.url, headers={"if-none-match": anonymous_etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "employee")
+        self.assertNotIn("Last-Modified", response)
+
+    def test_page_with_pending_message_is_not_cached(self):
+        response = self.client.post(
+            reverse("ticket_add_comment", args=[self.ticket.pk]),
+            {"author_name": "Иван", "message": "Сделано"},
+            follow=True,
+        )
+        self.assertContains(response, "Комментарий добавлен.")
+        self.assertNotIn("ETag", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_headers_keep_shared_caches_out(self):
+        response = self.client.get(self.url)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("Cookie", response["Vary"])
+
+
+class ConditionalListTests(TestCase):
+    def setUp(self):
+        self.printer = Ticket.objects.create(
+            title="Принтер", description="Описание", status=Ticket.Status.NEW
+        )
+        self.network = Ticket.objects.create(
+            title="Сеть", description="Описание", status=Ticket.Status.DONE
+        )
+        self.url = reverse("ticket_list")
+
+    def etag(self, **params):
+        return self.client.get(self.url, params)["ETag"]
+
+    def get(self, etag, **params):
+        return self.client.get(self.url, params, headers={"if-none-match": etag})
+
+    def test_unchanged_list_gets_304(self):
+        etag = self.etag()
+        with self.assertNumQueries(1):
+            response = self.get(etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_change_in_filtered_bucket_invalidates(self):
+        etag = self.etag(status="new")
+        self.printer.title = "Принтер сломан"
+        self.printer.save()
+        self.assertEqual(self.get(etag, status="new").status_code, 200)
+
+    def test_change_in_other_bucket_keeps_filtered_etag(self):
+        etag = self.etag(status="new")
+        self.network.title = "Сеть восстановлена"
+        self.network.save()
+        self.assertEqual(self.get(etag, status="new").status_code, 304)
+
+    def test_comment_invalidates_list(self):
+        etag = self.etag()
+        # Версия корзины поднимается после коммита комментария.
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(ticket=self.network, author_name="Иван", message="Ок")
+        self.assertEqual(self.get(etag).status_code, 200)
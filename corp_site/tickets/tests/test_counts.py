@@ -0,0 +1,106 @@
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tickets.counts import bucket_count, rebuild_counters
+from tickets.filters import TicketFilters
+from tickets.models import Ticket, TicketCounter
+
+
+def counters():
+    return {
+        (c.status, c.priority): c.count
+        for c in TicketCounter.objects.exclude(count=0)
+    }
+
+
+class TicketCounterTests(TestCase):
+    def test_create_update_delete_keep_buckets(self):
+        ticket = Ticket.objects.create(
+            title="Тикет", description="Описание", priority=Ticket.Priority.HIGH
+        )
+        self.assertEqual(counters(), {("new", 3): 1})
+
+        ticket.status = Ticket.Status.DONE
+        ticket.save()
+        self.assertEqual(counters(), {("done", 3): 1})
+
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        ticket.title = "Без смены корзины"
+        ticket.save()
+        self.assertEqual(counters(), {("done", 3): 1})
+
+        ticket.delete()
+        self.assertEqual(counters(), {})
+
+    def test_save_of_unloaded_instance_reads_previous_bucket(self):
+        ticket = Ticket.objects.create(title="Тикет", description="Описание")
+        Ticket(
+            pk=ticket.pk,
+            title="Тикет",
+            description="Описание",
+            status=Ticket.Status.IN_PROGRESS,
+            created_at=ticket.created_at,
+        ).save()
+        self.assertEqual(counters(), {("in_progress", 2): 1})
+
+    def test_rebuild_after_bulk_update(self):
+        Ticket.objects.create(title="Раз", description="Описание")
+        Ticket.objects.create(title="Два", description="Описание")
+        Ticket.objects.update(status=Ticket.Status.DONE)
+
+        call_command("rebuild_ticket_counts", stdout=mock.Mock())
+
+        self.assertEqual(counters(), {("done", 2): 2})
+
+    def test_rebuild_keeps_versions_growing(self):
+        ticket = Ticket.objects.create(title="Раз", description="Описание")
+        ticket.status = Ticket.Status.DONE
+        ticket.save()
+        before = dict(TicketCounter.objects.values_list("status", "version"))
+
+        rebuild_counters()
+
+        after = dict(TicketCounter.objects.values_list("status", "version"))
+        self.assertEqual(after, {status: version + 1 for status, version in before.items()})
+        self.assertEqual(counters(), {("done", 2): 1})
+
+    def test_bucket_count_sums_matching_buckets(self):
+        Ticket.objects.create(title="Раз", description="Описание")
+        Ticket.objects.create(
+            title="Два", description="Описание", priority=Ticket.Priority.LOW
+        )
+        Ticket.objects.create(
+            title="Три", description="Описание", status=Ticket.Status.DONE
+        )
+        rebuild_counters()
+        self.assertEqual(bucket_count(TicketFilters()), 3)
+        self.assertEqual(bucket_count(TicketFilters(status="new")), 2)
+        self.assertEqual(bucket_count(TicketFilters(status="new", priority=1)), 1)
+
+
+class TicketListCountTests(TestCase):
+    def setUp(self):
+        for i in range(12):
+            Ticket.objects.create(title=f"Принтер {i}", description="Описание")
+
+    def test_list_does_not_count_table(self):
+        # Один запрос к счётчикам и один за страницей, без COUNT(*).
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("ticket_list"))
+        self.assertContains(response, "Найдено заявок: 12")
+        self.assertTrue(response.context["is_paginated"])
+
+    @override_settings(TICKETS_COUNT_ESTIMATE_THRESHOLD=100)
+    def test_estimate_above_threshold_is_shown_as_approximate(self):
+        with mock.patch("tickets.counts.estimate_count", return_value=500):
+            response = self.client.get(reverse("ticket_list"), {"q": "принтер"})
+        self.assertContains(response, "Найдено заявок: около 500")
+
+    @override_settings(TICKETS_COUNT_ESTIMATE_THRESHOLD=1000)
+    def test_small_estimate_falls_back_to_exact_count(self):
+        with mock.patch("tickets.counts.estimate_count", return_value=500):
+            response = self.client.get(reverse("ticket_list"), {"q": "принтер"})
+        self.assertContains(response, "Найдено заявок: 12")
@@ -0,0 +1,147 @@
+import asyncio
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.signals import request_finished
+from django.db import close_old_connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tickets.events import LIST_CHANNEL, EventStream, hub, publish, ticket_channel
+from tickets.models import Comment, Ticket
+
+
+def parse(chunk):
+    if isinstance(chunk, bytes):
+        chunk = chunk.decode()
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+def close(response):
+    # Как ASGIHandler после отправки ответа; соединение с базой в тесте не
+    # закрываем — так же делает тестовый клиент.
+    request_finished.disconnect(close_old_connections)
+    try:
+        response.close()
+    finally:
+        request_finished.connect(close_old_connections)
+
+
+class EventViewTests(TestCase):
+    def setUp(self):
+        self.ticket = Ticket.objects.create(title="Принтер", description="Не печатает")
+        self.url = reverse("ticket_events", args=[self.ticket.pk])
+
+    def test_wsgi_request_gets_no_content(self):
+        # EventSource на 204 не переподключается и не держит воркер.
+        self.assertEqual(self.client.get(self.url).status_code, 204)
+        self.assertEqual(
+            self.client.get(reverse("ticket_list_events")).status_code, 204
+        )
+
+    def test_unknown_ticket_is_not_found(self):
+        url = reverse("ticket_events", args=[self.ticket.pk + 1])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def add_comment(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Comment.objects.create(
+                ticket=self.ticket, author_name="Иван", message="Смотрю"
+            )
+
+    def change_status(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ticket.status = Ticket.Status.DONE
+            self.ticket.save()
+
+    async def test_streams_comments_and_status_changes(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        try:
+            self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+
+            comment = await sync_to_async(self.add_comment)()
+            event, data = parse(await asyncio.wait_for(anext(stream), 1))
+            self.assertEqual(event, "comment")
+            self.assertEqual((data["id"], data["message"]), (comment.pk, "Смотрю"))
+
+            # Обновление счётчика комментариев события заявки не создаёт.
+            await sync_to_async(self.change_status)()
+            event, data = parse(await asyncio.wait_for(anext(stream), 1))
+            self.assertEqual(event, "ticket")
+            self.assertEqual(data["status_display"], "Завершена")
+        finally:
+            await stream.aclose()
+            close(response)
+
+        self.assertEqual(hub.subscriber_count(), 0)
+
+    async def test_list_feed_coalesces_changed_ids(self):
+        response = await self.async_client.get(reverse("ticket_list_events"))
+        stream = aiter(response.streaming_content)
+        try:
+            await anext(stream)
+            await sync_to_async(self.add_comment)()
+            await sync_to_async(self.change_status)()
+            # Доставка идёт через call_soon_threadsafe: даём циклу её выполнить.
+            await asyncio.sleep(0)
+
+            event, data = parse(await asyncio.wait_for(anext(stream), 1))
+        finally:
+            await stream.aclose()
+            close(response)
+
+        self.assertEqual(event, "changed")
+        self.assertEqual(data, {"ids": [self.ticket.pk]})
+
+
+class HubTests(TestCase):
+    @override_settings(TICKETS_EVENTS_QUEUE_SIZE=2)
+    async def test_slow_consumer_is_dropped(self):
+        stream = aiter(EventStream(ticket_channel(1)))
+        try:
+            await anext(stream)
+            for number in range(3):
+                publish(ticket_channel(1), "comment", {"id": number})
+            await asyncio.sleep(0)
+
+            self.assertEqual(hub.subscriber_count(ticket_channel(1)), 0)
+            self.assertEqual(parse(await anext(stream)), ("overflow", {}))
+            with self.assertRaises(StopAsyncIteration):
+                await anext(stream)
+        finally:
+            await stream.aclose()
+
+    @override_settings(TICKETS_EVENTS_HEARTBEAT=0.01)
+    async def test_idle_stream_sends_heartbeats(self):
+        stream = aiter(EventStream(LIST_CHANNEL))
+        try:
+            await anext(stream)
+            # asyncio.wait_for до 3.11 бросает asyncio.TimeoutError, а не
+            # встроенный TimeoutError: поток должен пережить несколько пингов.
+            for _ in range(2):
+                self.assertEqual(await asyncio.wait_for(anext(stream), 1), ": ping\n\n")
+            publish(LIST_CHANNEL, "changed", {"ids": [1]})
+            self.assertEqual(
+                parse(await asyncio.wait_for(anext(stream), 1)), ("changed", {"ids": [1]})
+            )
+        finally:
+            await stream.aclose()
+
+    def test_events_wait_for_commit(self):
+        ticket = Ticket.objects.create(title="Сеть", description="Нет доступа")
+        with mock.patch.object(hub, "publish_local") as publish_local:
+            with self.captureOnCommitCallbacks() as callbacks:
+                Comment.objects.create(
+                    ticket=ticket, author_name="Анна", message="Проверю"
+                )
+            publish_local.assert_not_called()
+
+            for callback in callbacks:
+                callback()
+
+        channels = [call.args[0]["channel"] for call in publish_local.call_args_list]
+        self.assertEqual(channels, [ticket_channel(ticket.pk), LIST_CHANNEL])
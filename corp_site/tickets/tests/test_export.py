@@ -0,0 +1,123 @@
+import csv
+import io
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from tickets import export
+from tickets.filters import TicketFilters
+from tickets.models import Comment, Ticket
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.printer = Ticket.objects.create(
+            title="Принтер", description="Не печатает, «срочно»", priority=Ticket.Priority.HIGH
+        )
+        self.server = Ticket.objects.create(
+            title="Сервер", description="Упал", status=Ticket.Status.DONE
+        )
+        Comment.objects.create(ticket=self.printer, author_name="Иван", message="Смотрю")
+        Comment.objects.create(ticket=self.printer, author_name="Анна", message="Готово")
+
+    def read_csv(self, **kwargs):
+        text = "".join(export.stream_export(TicketFilters(**kwargs.pop("filters", {})), **kwargs))
+        return list(csv.DictReader(io.StringIO(text)))
+
+    def test_csv_rows_follow_list_order(self):
+        rows = self.read_csv()
+
+        self.assertEqual([row["title"] for row in rows], ["Сервер", "Принтер"])
+        self.assertEqual(rows[1]["description"], "Не печатает, «срочно»")
+        self.assertEqual(rows[1]["due_date"], "")
+        self.assertEqual(rows[1]["created_at"], self.printer.created_at.isoformat())
+
+    def test_csv_with_comments_has_row_per_comment(self):
+        rows = self.read_csv(with_comments=True)
+
+        self.assertEqual(
+            [(row["title"], row["comment_message"]) for row in rows],
+            [("Сервер", ""), ("Принтер", "Смотрю"), ("Принтер", "Готово")],
+        )
+
+    def test_ndjson_with_comments_is_grouped_by_ticket(self):
+        chunks = export.stream_export(TicketFilters(), "ndjson", with_comments=True)
+        items = [json.loads(line) for line in "".join(chunks).splitlines()]
+
+        self.assertEqual([item["title"] for item in items], ["Сервер", "Принтер"])
+        self.assertEqual(items[0]["comments"], [])
+        self.assertEqual(
+            [comment["message"] for comment in items[1]["comments"]], ["Смотрю", "Готово"]
+        )
+
+    def test_filters(self):
+        rows = self.read_csv(filters={"status": "done"})
+        self.assertEqual([row["title"] for row in rows], ["Сервер"])
+
+        rows = self.read_csv(filters={"q": "печат"})
+        self.assertEqual([row["title"] for row in rows], ["Принтер"])
+
+    def test_rows_are_streamed_in_chunks(self):
+        for i in range(5):
+            Ticket.objects.create(title=f"Заявка {i}", description="-")
+        original = export.LINES_PER_CHUNK
+        export.LINES_PER_CHUNK = 2
+        try:
+            chunks = list(export.stream_export(TicketFilters(), "ndjson", chunk_size=3))
+        finally:
+            export.LINES_PER_CHUNK = original
+
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(sum(chunk.count("\n") for chunk in chunks), 7)
+
+    def test_command_streams_to_stdout(self):
+        out = io.StringIO()
+        call_command("export_tickets", "--format", "ndjson", "--status", "new", stdout=out)
+
+        items = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([item["title"] for item in items], ["Принтер"])
+
+
+class ExportViewTests(TestCase):
+    def setUp(self):
+        Ticket.objects.create(title="Принтер", description="Не печатает")
+        self.url = reverse("ticket_export")
+
+    def test_requires_login(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_streams_csv_attachment(self):
+        self.client.force_login(User.objects.create_user("employee", password="pass-123"))
+
+        response = self.client.get(self.url, {"status": "new"})
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn("attachment;", response["Content-Disposition"])
+        body = b"".join(response.streaming_content).decode()
+        self.assertIn("Принтер", body)
+
+    async def test_asgi_response_is_streamed(self):
+        user = await User.objects.acreate_user("employee", password="pass-123")
+        await self.async_client.aforce_login(user)
+        for i in range(4):
+            await Ticket.objects.acreate(title=f"Заявка {i}", description="-")
+
+        with mock.patch.object(export, "LINES_PER_CHUNK", 2):
+            response = await self.async_client.get(self.url)
+            # Синхронный итератор ASGI-обработчик собрал бы в память целиком.
+            self.assertTrue(response.is_async)
+            chunks = [chunk async for chunk in response.streaming_content]
+
+        # Заголовок и 5 заявок по две строки в куске.
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(b"".join(chunks).decode().count("Заявка"), 4)
+
+    def test_unknown_format(self):
+        self.client.force_login(User.objects.create_user("employee", password="pass-123"))
+        self.assertEqual(self.client.get(self.url, {"format": "xml"}).status_code, 400)
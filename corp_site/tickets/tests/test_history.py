@@ -0,0 +1,189 @@
+import io
+from datetime import UTC, date, datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tickets import bulk
+from tickets.history import status_transitions, time_in_status
+from tickets.models import Ticket, TicketChange
+
+T0 = datetime(2026, 5, 1, 9, 0, tzinfo=UTC)
+
+
+def history(ticket):
+    return [
+        (change.source, change.changes, change.status)
+        for change in TicketChange.objects.filter(ticket=ticket)
+    ]
+
+
+class TicketHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("employee", password="test-pass-123")
+        self.client.force_login(self.user)
+
+    def test_form_saves_record_changed_fields_only(self):
+        self.client.post(
+            reverse("ticket_create"),
+            {"title": "Принтер", "description": "Не печатает", "status": "new", "priority": 2},
+        )
+        ticket = Ticket.objects.get()
+        self.client.post(
+            reverse("ticket_update", args=[ticket.pk]),
+            {
+                "title": "Принтер",
+                "description": "Не печатает",
+                "status": "in_progress",
+                "priority": 3,
+                "due_date": "2026-06-01",
+            },
+        )
+
+        self.assertEqual(
+            history(ticket),
+            [
+                ("form", {"status": [None, "new"], "priority": [None, 2]}, "new"),
+                (
+                    "form",
+                    {
+                        "status": ["new", "in_progress"],
+                        "priority": [2, 3],
+                        "due_date": [None, "2026-06-01"],
+                    },
+                    "in_progress",
+                ),
+            ],
+        )
+        change = TicketChange.objects.last()
+        self.assertEqual(change.author, self.user)
+
+    def test_save_without_changes_records_nothing(self):
+        ticket = Ticket.objects.create(title="Сервер", description="Упал")
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        ticket.save()
+
+        self.assertEqual(len(history(ticket)), 1)
+
+    def test_admin_save_is_attributed(self):
+        admin = User.objects.create_superuser("admin", password="test-pass-123")
+        self.client.force_login(admin)
+        ticket = Ticket.objects.create(title="Почта", description="Не приходит")
+
+        self.client.post(
+            reverse("admin:tickets_ticket_change", args=[ticket.pk]),
+            {
+                "title": "Почта",
+                "description": "Не приходит совсем",
+                "status": "new",
+                "priority": 2,
+                "history-TOTAL_FORMS": 1,
+                "history-INITIAL_FORMS": 1,
+                "history-0-id": TicketChange.objects.get().pk,
+                "history-0-ticket": ticket.pk,
+            },
+        )
+
+        change = TicketChange.objects.last()
+        self.assertEqual(
+            (change.source, change.author, change.changes, change.status),
+            ("admin", admin, {"description": ["Не приходит", "Не приходит совсем"]}, None),
+        )
+
+    def test_bulk_update_writes_one_change_per_ticket(self):
+        tickets = [
+            Ticket.objects.create(title=f"Заявка {n}", description="Описание")
+            for n in range(3)
+        ]
+        with mock.patch.object(bulk, "BATCH_SIZE", 2):
+            bulk.update_tickets(Ticket.objects.all(), "status", "done", author=self.user)
+
+        for ticket in tickets:
+            self.assertEqual(history(ticket)[-1], ("bulk", {"status": ["new", "done"]}, "done"))
+        self.assertEqual(
+            TicketChange.objects.filter(source="bulk", author=self.user).count(), 3
+        )
+
+    def test_delete_removes_history(self):
+        ticket = Ticket.objects.create(title="Сервер", description="Упал")
+        ticket.delete()
+        self.assertFalse(TicketChange.objects.exists())
+
+    def test_history_api(self):
+        ticket = Ticket.objects.create(title="Сервер", description="Упал")
+        ticket.status = Ticket.Status.DONE
+        ticket.save()
+        url = reverse("api_ticket_history", args=[ticket.pk])
+
+        data = self.client.get(url, {"limit": 1}).json()
+        self.assertEqual(data["results"][0]["changes"], {"status": ["new", "done"]})
+        data = self.client.get(data["next"]).json()
+        self.assertEqual(data["results"][0]["changes"], {"status": [None, "new"], "priority": [None, 2]})
+        self.assertIsNone(data["next"])
+
+        self.assertEqual(
+            self.client.get(reverse("api_ticket_history", args=[ticket.pk + 1])).status_code,
+            404,
+        )
+
+
+class StatusReportTests(TestCase):
+    def transition(self, ticket, hours, previous, status):
+        TicketChange.objects.create(
+            ticket=ticket,
+            changed_at=T0 + timedelta(hours=hours),
+            source="other",
+            changes={"status": [previous, status]},
+            status=status,
+            previous_status=previous,
+        )
+
+    def setUp(self):
+        first = Ticket.objects.create(title="Принтер", description="Не печатает")
+        second = Ticket.objects.create(title="Сервер", description="Упал")
+        # Заменяем записи о создании на записи в прошлом.
+        TicketChange.objects.all().delete()
+        self.transition(first, 0, None, "new")
+        self.transition(first, 2, "new", "in_progress")
+        self.transition(first, 5, "in_progress", "done")
+        self.transition(second, 1, None, "new")
+        self.transition(second, 4, "new", "in_progress")
+
+    def test_time_in_status(self):
+        report = time_in_status(T0, T0 + timedelta(hours=10))
+
+        self.assertEqual(list(report), ["new", "in_progress", "done"])
+        self.assertEqual(report["new"].total, timedelta(hours=5))
+        self.assertEqual(report["new"].spans, 2)
+        self.assertEqual(report["new"].average, timedelta(hours=2.5))
+        self.assertEqual(report["in_progress"].total, timedelta(hours=9))
+        self.assertEqual(report["done"].total, timedelta(hours=5))
+
+    def test_spans_are_clipped_to_period(self):
+        report = time_in_status(T0 + timedelta(hours=3), T0 + timedelta(hours=6))
+
+        self.assertEqual(report["new"].total, timedelta(hours=1))
+        self.assertEqual(report["in_progress"].total, timedelta(hours=4))
+        self.assertEqual(report["done"].total, timedelta(hours=1))
+
+    def test_transitions(self):
+        self.assertEqual(
+            status_transitions(T0 + timedelta(hours=1), T0 + timedelta(hours=5)),
+            {(None, "new"): 1, ("new", "in_progress"): 2},
+        )
+
+    def test_command(self):
+        out = io.StringIO()
+        day = timezone.localdate(T0)
+        call_command(
+            "ticket_status_report", since=day, until=date(2026, 5, 1), stdout=out
+        )
+        output = out.getvalue()
+
+        self.assertIn("Новая: 5.0, 2, 2.5", output)
+        self.assertIn("Новая → В работе: 2", output)
+        self.assertIn("создана → Новая: 2", output)
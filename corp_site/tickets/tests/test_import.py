@@ -0,0 +1,220 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import UTC, date, datetime
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.test import TestCase
+
+from tickets.counts import bucket_count
+from tickets.filters import TicketFilters
+from tickets.importer import BulkCreateWriter
+from tickets.models import Comment, Ticket, TicketDailyStats
+
+
+class ImportTicketsCommandTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, text):
+        path = Path(self.tmp.name) / name
+        path.write_text(text, encoding="utf-8")
+        return str(path)
+
+    def write_ndjson(self, name, items):
+        return self.write(
+            name, "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items)
+        )
+
+    def run_import(self, *args):
+        out = io.StringIO()
+        call_command("import_tickets", *args, stdout=out, stderr=io.StringIO())
+        return out.getvalue()
+
+    def test_ndjson_with_inline_comments_keeps_original_dates(self):
+        path = self.write_ndjson(
+            "tickets.ndjson",
+            [
+                {
+                    "external_id": "HD-1",
+                    "title": "Принтер",
+                    "description": "Не печатает",
+                    "status": "in_progress",
+                    "priority": 3,
+                    "due_date": "2019-05-20",
+                    "created_at": "2019-05-01T09:00:00+00:00",
+                    "updated_at": "2019-05-02T10:00:00+00:00",
+                    "comments": [
+                        {"author_name": "Иван", "message": "Смотрю", "created_at": "2019-05-01T10:00:00+00:00"},
+                        {"author_name": "Анна", "message": "Готово", "created_at": "2019-05-03T12:00:00+00:00"},
+                    ],
+                },
+                {"external_id": "HD-2", "title": "Сервер", "description": "Упал"},
+            ],
+        )
+
+        started = datetime.now(UTC)
+        output = self.run_import(path, "--batch-size", "1")
+
+        self.assertIn("Заявок: 2, комментариев: 2", output)
+        self.assertIn("строк/с", output)
+        ticket = Ticket.objects.get(external_id="HD-1")
+        self.assertEqual(ticket.created_at, datetime(2019, 5, 1, 9, tzinfo=UTC))
+        # updated_at — время импорта, чтобы заявку увидела лента изменений.
+        self.assertGreaterEqual(ticket.updated_at, started)
+        self.assertEqual(ticket.comment_count, 2)
+        self.assertEqual(ticket.last_activity_at, datetime(2019, 5, 3, 12, tzinfo=UTC))
+        self.assertEqual(
+            list(ticket.comments.values_list("message", "created_at")),
+            [
+                ("Смотрю", datetime(2019, 5, 1, 10, tzinfo=UTC)),
+                ("Готово", datetime(2019, 5, 3, 12, tzinfo=UTC)),
+            ],
+        )
+        self.assertFalse(Path(path + ".rejects").exists())
+        # Счётчики списка пересчитаны после вставки в обход сигналов.
+        self.assertEqual(bucket_count(TicketFilters()), 2)
+
+    def test_auto_now_add_is_restored_after_import(self):
+        path = self.write_ndjson(
+            "tickets.ndjson",
+            [{"title": "Старая", "description": "-", "created_at": "2019-01-01T00:00:00+00:00"}],
+        )
+        self.run_import(path)
+
+        ticket = Ticket.objects.create(title="Новая", description="-")
+
+        self.assertGreater(ticket.created_at.year, 2019)
+
+    def test_bad_rows_go_to_reject_file(self):
+        path = self.write(
+            "tickets.csv",
+            "external_id,title,description,status,priority\n"
+            "A-1,Принтер,Не печатает,new,1\n"
+            "A-2,,Без заголовка,new,1\n"
+            "A-3,Сервер,Упал,lost,9\n"
+            "A-1,Дубль,В том же файле,new,1\n",
+        )
+
+        output = self.run_import(path)
+
+        self.assertIn("Заявок: 1", output)
+        self.assertIn("отклонено: 3", output)
+        with open(path + ".rejects", encoding="utf-8") as fh:
+            rejects = list(csv.DictReader(fh))
+        self.assertEqual([row["external_id"] for row in rejects], ["A-2", "A-3", "A-1"])
+        self.assertEqual([row["_line"] for row in rejects], ["3", "4", "5"])
+        self.assertIn("title", rejects[0]["_error"])
+        self.assertIn("status", rejects[1]["_error"])
+        self.assertIn("priority", rejects[1]["_error"])
+
+    def test_invalid_json_line_is_rejected(self):
+        path = self.write("tickets.ndjson", '{"title": "Ок", "description": "-"}\n{oops\n')
+
+        output = self.run_import(path)
+
+        self.assertIn("Заявок: 1", output)
+        with open(path + ".rejects", encoding="utf-8") as fh:
+            reject = json.loads(fh.readline())
+        self.assertEqual(reject["_raw"], "{oops")
+        self.assertEqual(reject["_line"], 2)
+
+    def test_rerun_skips_imported_tickets(self):
+        path = self.write_ndjson(
+            "tickets.ndjson", [{"external_id": "X-1", "title": "Один", "description": "-"}]
+        )
+        self.run_import(path)
+
+        output = self.run_import(path)
+
+        self.assertIn("Заявок: 0", output)
+        self.assertIn("пропущено повторов: 1", output)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_comments_file_maps_by_external_id(self):
+        Ticket.objects.create(title="Есть", description="-", external_id="OLD-7")
+        path = self.write(
+            "comments.csv",
+            "ticket_external_id,author_name,message,created_at\n"
+            "OLD-7,Иван,Первый,2020-01-01 10:00:00\n"
+            "OLD-8,Иван,Потерянный,2020-01-01 10:00:00\n",
+        )
+
+        output = self.run_import("--comments", path)
+
+        self.assertIn("комментариев: 1", output)
+        self.assertIn("отклонено: 1", output)
+        ticket = Ticket.objects.get(external_id="OLD-7")
+        self.assertEqual(ticket.comment_count, 1)
+        self.assertEqual(Comment.objects.get().created_at.year, 2020)
+
+    def test_database_errors_reject_only_failing_rows(self):
+        path = self.write_ndjson(
+            "tickets.ndjson",
+            [
+                {"external_id": "OK-1", "title": "Первая", "description": "-"},
+                {"external_id": "BAD-1", "title": "Сломанная", "description": "-"},
+                {"external_id": "OK-2", "title": "Третья", "description": "-"},
+            ],
+        )
+        original = BulkCreateWriter.write
+
+        def write(writer, model, objs):
+            # Например, параллельный импорт успел занять external_id.
+            if any(getattr(obj, "title", "") == "Сломанная" for obj in objs):
+                raise IntegrityError("UNIQUE constraint failed")
+            return original(writer, model, objs)
+
+        with mock.patch.object(BulkCreateWriter, "write", write):
+            output = self.run_import(path)
+
+        self.assertIn("Заявок: 2", output)
+        self.assertIn("отклонено: 1", output)
+        self.assertEqual(
+            set(Ticket.objects.values_list("external_id", flat=True)), {"OK-1", "OK-2"}
+        )
+        with open(path + ".rejects", encoding="utf-8") as fh:
+            reject = json.loads(fh.readline())
+        self.assertEqual(reject["external_id"], "BAD-1")
+        self.assertIn("UNIQUE", reject["_error"])
+
+    def test_copy_requires_postgres(self):
+        path = self.write_ndjson("tickets.ndjson", [])
+        with self.assertRaises(CommandError):
+            self.run_import(path, "--method", "copy")
+
+    def test_imported_tickets_get_history_and_daily_stats(self):
+        path = self.write_ndjson(
+            "tickets.ndjson",
+            [
+                {
+                    "external_id": "HD-1",
+                    "title": "Принтер",
+                    "description": "Не печатает",
+                    "status": "done",
+                    "created_at": "2019-05-01T09:00:00+00:00",
+                    "updated_at": "2019-05-02T10:00:00+00:00",
+                },
+            ],
+        )
+
+        self.run_import(path)
+
+        ticket = Ticket.objects.get()
+        self.assertEqual(ticket.closed_at, datetime(2019, 5, 2, 10, tzinfo=UTC))
+        self.assertEqual(
+            list(ticket.history.values_list("changed_at", "status")),
+            [
+                (datetime(2019, 5, 1, 9, tzinfo=UTC), "new"),
+                (datetime(2019, 5, 2, 10, tzinfo=UTC), "done"),
+            ],
+        )
+        self.assertEqual(
+            list(TicketDailyStats.objects.values_list("day", "created", "closed")),
+            [(date(2019, 5, 1), 1, 0), (date(2019, 5, 2), 0, 1)],
+        )
@@ -0,0 +1,108 @@
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test import TestCase
+from django.utils import timezone
+
+from tickets.history import timeline
+from tickets.models import Comment, Ticket, TicketChange, Tombstone
+from tickets.stats import overdue_tickets
+from tickets.sync import COMMENT_STREAM, DELETED_STREAM, TICKET_STREAM
+
+
+class QueryPlanTests(TestCase):
+    """Планы запросов списка и комментариев должны идти по индексам.
+
+    Если поменять модель и потерять индекс, тест покажет это раньше прода.
+    """
+
+    def explain(self, queryset):
+        if connection.vendor == "postgresql":
+            # На пустой таблице планировщик Postgres честно выбирает seq scan,
+            # поэтому запрещаем его, чтобы проверить саму пригодность индекса.
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+                return queryset.explain()
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index_names):
+        plan = self.explain(queryset)
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            f"Ни один из индексов {index_names} не используется:\n{plan}",
+        )
+        # Сортировка тоже должна браться из индекса, а не отдельным шагом.
+        self.assertNotIn("TEMP B-TREE FOR ORDER BY", plan)
+        self.assertNotRegex(plan, r"(?m)^\s*(->\s*)?Sort\b")
+
+    def test_unfiltered_list_sorted_by_index(self):
+        self.assertUsesIndex(Ticket.objects.all()[:10], ["ticket_created_idx"])
+
+    def test_status_filter(self):
+        self.assertUsesIndex(
+            Ticket.objects.filter(status=Ticket.Status.NEW)[:10],
+            ["ticket_status_created_idx", "ticket_status_prio_created_idx"],
+        )
+
+    def test_priority_filter(self):
+        self.assertUsesIndex(
+            Ticket.objects.filter(priority=Ticket.Priority.HIGH)[:10],
+            ["ticket_priority_created_idx"],
+        )
+
+    def test_status_and_priority_filter(self):
+        self.assertUsesIndex(
+            Ticket.objects.filter(
+                status=Ticket.Status.NEW, priority=Ticket.Priority.HIGH
+            )[:10],
+            ["ticket_status_prio_created_idx"],
+        )
+
+    def test_keyset_page(self):
+        # Условие страницы из CursorPaginator: created_at <= v AND (< v OR id < pk).
+        now = timezone.now()
+        self.assertUsesIndex(
+            Ticket.objects.filter(
+                Q(status=Ticket.Status.NEW),
+                Q(created_at__lte=now),
+                Q(created_at__lt=now) | Q(pk__lt=100),
+            )[:11],
+            ["ticket_status_created_idx", "ticket_status_prio_created_idx"],
+        )
+
+    def test_ticket_comments(self):
+        ticket = Ticket.objects.create(title="Тикет", description="Описание")
+        self.assertUsesIndex(
+            ticket.comments.all(), ["comment_ticket_created_idx"]
+        )
+
+    def test_changes_streams(self):
+        now = timezone.now()
+        position = [now.isoformat(), 100]
+        for stream, model, index in [
+            (TICKET_STREAM, Ticket, "ticket_updated_idx"),
+            (COMMENT_STREAM, Comment, "comment_recorded_idx"),
+            (DELETED_STREAM, Tombstone, "tombstone_deleted_idx"),
+        ]:
+            with self.subTest(index=index):
+                self.assertUsesIndex(
+                    stream.after(model.objects.values("id"), position, now, 50), [index]
+                )
+
+    def test_overdue_count_uses_partial_index(self):
+        # COUNT(*) сортировку отбрасывает, как и order_by() здесь.
+        self.assertUsesIndex(
+            overdue_tickets().order_by().values("id"), ["ticket_overdue_idx"]
+        )
+
+    def test_ticket_timeline(self):
+        self.assertUsesIndex(timeline(1), ["ticketchange_ticket_idx"])
+
+    def test_status_transitions_in_range(self):
+        now = timezone.now()
+        self.assertUsesIndex(
+            TicketChange.objects.filter(
+                status__isnull=False, changed_at__gte=now, changed_at__lt=now
+            ).order_by(),
+            ["ticketchange_status_idx"],
+        )
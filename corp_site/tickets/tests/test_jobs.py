@@ -0,0 +1,183 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from tickets.jobs import (
+    Worker,
+    enqueue,
+    enqueue_on_commit,
+    heartbeat,
+    retry_jobs,
+    task,
+)
+from tickets.models import Job
+
+CALLS = []
+
+
+@task("tests.record")
+def record(value):
+    CALLS.append(value)
+
+
+@task("tests.fail", max_attempts=2)
+def fail():
+    raise RuntimeError("Сломалось")
+
+
+@task("tests.long")
+def long():
+    # Аренда будто бы почти истекла, потом очередная порция работы.
+    Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+    CALLS.append(heartbeat())
+    CALLS.append(Job.objects.get().locked_at)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def run_worker(self):
+        return Worker().run(burst=True)
+
+    def test_runs_and_deletes_job(self):
+        enqueue("tests.record", {"value": 1})
+        enqueue("tests.record", {"value": 2})
+
+        stats = self.run_worker()
+
+        self.assertEqual(CALLS, [1, 2])
+        self.assertEqual(stats["done"], 2)
+        self.assertFalse(Job.objects.exists())
+
+    def test_claim_without_returning(self):
+        enqueue("tests.record", {"value": 1})
+        with mock.patch.object(connection.features, "can_return_columns_from_insert", False):
+            stats = self.run_worker()
+        self.assertEqual((CALLS, stats["done"]), ([1], 1))
+
+    def test_enqueue_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            enqueue_on_commit("tests.record", {"value": 1})
+            self.assertFalse(Job.objects.exists())
+        callbacks[0]()
+        self.assertEqual(Job.objects.get().payload, {"value": 1})
+
+    def test_unknown_task(self):
+        with self.assertRaises(LookupError):
+            enqueue_on_commit("tests.missing")
+
+    def test_delayed_job_waits(self):
+        enqueue("tests.record", {"value": 1}, delay=60)
+        self.run_worker()
+        self.assertEqual(CALLS, [])
+        self.assertEqual(Job.objects.get().status, Job.Status.QUEUED)
+
+    def test_retry_with_backoff_then_dead(self):
+        job = enqueue("tests.fail")
+        before = timezone.now()
+
+        with self.assertLogs("tickets.jobs", "WARNING"):
+            stats = self.run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(stats["retried"], 1)
+        self.assertEqual(job.status, Job.Status.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=8))
+        self.assertIn("Сломалось", job.last_error)
+
+        Job.objects.update(run_at=timezone.now())
+        with self.assertLogs("tickets.jobs", "ERROR"):
+            stats = self.run_worker()
+
+        job.refresh_from_db()
+        self.assertEqual(stats["dead"], 1)
+        self.assertEqual(job.status, Job.Status.DEAD)
+        self.assertEqual(job.attempts, 2)
+
+        retry_jobs(Job.objects.all())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.last_error), (Job.Status.QUEUED, 0, ""))
+
+    def test_stale_job_is_requeued(self):
+        job = enqueue("tests.record", {"value": 1})
+        stale = timezone.now() - timedelta(hours=1)
+        Job.objects.update(status=Job.Status.RUNNING, attempts=1, locked_at=stale)
+
+        self.run_worker()
+
+        self.assertEqual(CALLS, [1])
+        self.assertFalse(Job.objects.filter(pk=job.pk).exists())
+
+    def test_heartbeat_renews_lease(self):
+        started = timezone.now()
+        enqueue("tests.long")
+
+        with self.settings(TICKETS_JOBS_LEASE_SECONDS=0):
+            self.run_worker()
+
+        renewed, locked_at = CALLS
+        self.assertTrue(renewed)
+        self.assertGreaterEqual(locked_at, started)
+        self.assertFalse(Job.objects.exists())
+        # Вне задачи продлевать нечего.
+        self.assertTrue(heartbeat())
+
+    def test_stale_jobs_are_swept_under_load(self):
+        enqueue("tests.record", {"value": 1})
+        stale = enqueue("tests.record", {"value": 2})
+        Job.objects.filter(pk=stale.pk).update(
+            status=Job.Status.RUNNING,
+            attempts=1,
+            locked_at=timezone.now() - timedelta(hours=1),
+        )
+        worker = Worker()
+        claim = worker.claim
+
+        def claim_and_stop():
+            # Очередь не пустеет: воркер всё время занят задачами.
+            worker.stop()
+            return claim()
+
+        with mock.patch.object(worker, "claim", claim_and_stop):
+            worker.run(burst=True)
+
+        self.assertEqual(CALLS, [1])
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, Job.Status.QUEUED)
+
+    def test_stale_job_without_attempts_is_dead(self):
+        enqueue("tests.fail")
+        stale = timezone.now() - timedelta(hours=1)
+        Job.objects.update(status=Job.Status.RUNNING, attempts=2, locked_at=stale)
+
+        self.run_worker()
+
+        self.assertEqual(Job.objects.get().status, Job.Status.DEAD)
+
+    def test_command(self):
+        enqueue("tests.record", {"value": 1})
+        out = StringIO()
+        call_command("run_worker", "--burst", "--concurrency", "1", stdout=out, stderr=StringIO())
+        self.assertEqual(CALLS, [1])
+        self.assertIn("Выполнено: 1", out.getvalue())
+
+
+class ConcurrentWorkerTests(TransactionTestCase):
+    def test_each_job_runs_once(self):
+        CALLS.clear()
+        Job.objects.bulk_create(
+            Job(name="tests.record", payload={"value": n}) for n in range(50)
+        )
+
+        stats = Worker(concurrency=4).run(burst=True)
+
+        self.assertEqual(stats["done"], 50)
+        self.assertEqual(sorted(CALLS), list(range(50)))
+        self.assertFalse(Job.objects.exists())
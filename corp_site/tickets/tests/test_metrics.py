@@ -0,0 +1,137 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from tickets.instrumentation import RequestProfile
+from tickets.metrics import (
+    collect,
+    flush,
+    local_metrics,
+    observe,
+    render_prometheus,
+    reset_metrics,
+)
+from tickets.profiling import reset_profiling
+
+
+def profile(total_ms, queries=1):
+    return RequestProfile(
+        queries=[("SELECT 1", 1.0)] * queries, sql_ms=queries, total_ms=total_ms
+    )
+
+
+@override_settings(TICKETS_METRICS_DIR="")
+class HistogramTests(SimpleTestCase):
+    def setUp(self):
+        reset_metrics()
+
+    def test_renders_cumulative_prometheus_histogram(self):
+        observe("ticket_list", profile(3))
+        observe("ticket_list", profile(40, queries=2))
+        observe("ticket_list", profile(20000))
+
+        text = render_prometheus(collect())
+
+        self.assertIn("# TYPE tickets_request_seconds histogram", text)
+        self.assertIn(
+            'tickets_request_seconds_bucket{view="ticket_list",le="0.005"} 1', text
+        )
+        self.assertIn(
+            'tickets_request_seconds_bucket{view="ticket_list",le="0.05"} 2', text
+        )
+        self.assertIn(
+            'tickets_request_seconds_bucket{view="ticket_list",le="10"} 2', text
+        )
+        self.assertIn(
+            'tickets_request_seconds_bucket{view="ticket_list",le="+Inf"} 3', text
+        )
+        self.assertIn('tickets_request_seconds_count{view="ticket_list"} 3', text)
+        self.assertIn('tickets_request_seconds_sum{view="ticket_list"} 20.043', text)
+        self.assertIn('tickets_queries_bucket{view="ticket_list",le="1"} 2', text)
+
+    def test_collect_adds_other_workers_files(self):
+        observe("ticket_list", profile(3))
+        with tempfile.TemporaryDirectory() as directory:
+            other = Path(directory, "999999.json")
+            other.write_text(json.dumps(local_metrics()))
+            Path(directory, "broken.json").write_text("{")
+            with override_settings(TICKETS_METRICS_DIR=directory):
+                merged = collect()
+                flush()
+
+                self.assertTrue(Path(directory, f"{os.getpid()}.json").exists())
+                # Свой файл не складывается с собственными счётчиками дважды.
+                self.assertEqual(collect(), merged)
+
+        self.assertEqual(merged["request_seconds"]["ticket_list"][0], 2)
+
+
+class MetricsViewTests(TestCase):
+    def setUp(self):
+        reset_metrics()
+
+    def test_requires_staff(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 302)
+
+        self.client.force_login(User.objects.create_user("agent"))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 302)
+
+    def test_staff_sees_histograms_of_served_views(self):
+        self.client.get(reverse("ticket_list"))
+        self.client.force_login(User.objects.create_user("admin", is_staff=True))
+
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertContains(response, 'tickets_queries_count{view="ticket_list"} 1')
+
+    @override_settings(TICKETS_METRICS_TOKEN="secret")
+    def test_token_for_scrapers(self):
+        ok = self.client.get(
+            reverse("metrics"), headers={"Authorization": "Bearer secret"}
+        )
+        wrong = self.client.get(
+            reverse("metrics"), headers={"Authorization": "Bearer nope"}
+        )
+
+        self.assertEqual(ok.status_code, 200)
+        self.assertEqual(wrong.status_code, 302)
+
+
+class SlowRequestProfilingTests(TestCase):
+    def setUp(self):
+        reset_profiling()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_profiles_next_slow_request_after_every_n(self):
+        directory = Path(self.directory.name)
+        with override_settings(
+            TICKETS_PROFILE_EVERY=2,
+            TICKETS_PROFILE_SLOW_MS=0,
+            TICKETS_PROFILE_DIR=self.directory.name,
+        ):
+            for _ in range(2):
+                self.client.get(reverse("ticket_list"))
+            self.assertEqual(list(directory.iterdir()), [])
+
+            with self.assertLogs("tickets.profiling", "WARNING"):
+                self.client.get(reverse("ticket_list"))
+
+        saved = list(directory.glob("*.prof"))
+        self.assertEqual(len(saved), 1)
+        self.assertTrue(saved[0].name.startswith("ticket_list-"))
+
+    @override_settings(TICKETS_PROFILE_EVERY=0)
+    def test_disabled_by_default(self):
+        for _ in range(3):
+            self.client.get(reverse("ticket_list"))
+
+        self.assertEqual(list(Path(self.directory.name).iterdir()), [])
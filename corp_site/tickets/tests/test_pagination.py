@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tickets.models import Ticket
+from tickets.pagination import CursorPaginator, decode_cursor
+
+
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        base = timezone.now()
+        for i in range(25):
+            ticket = Ticket.objects.create(title=f"Заявка {i}", description="Описание")
+            # Попарно одинаковое время — проверяем разрыв ничьих по id.
+            Ticket.objects.filter(pk=ticket.pk).update(
+                created_at=base - timedelta(minutes=i // 2)
+            )
+        self.expected = list(Ticket.objects.order_by("-created_at", "-id"))
+
+    def walk_forward(self, paginator):
+        page = paginator.page()
+        seen = list(page)
+        while page.has_next:
+            page = paginator.page(decode_cursor(page.next_token))
+            seen.extend(page)
+        return seen, page
+
+    def test_forward_walk_covers_every_row_once(self):
+        seen, last_page = self.walk_forward(CursorPaginator(Ticket.objects.all(), 10))
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(len(last_page), 5)
+        self.assertTrue(last_page.has_previous)
+
+    def test_backward_walk_returns_previous_pages(self):
+        paginator = CursorPaginator(Ticket.objects.all(), 10)
+        first = paginator.page()
+        second = paginator.page(decode_cursor(first.next_token))
+        back = paginator.page(decode_cursor(second.previous_token))
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous)
+        self.assertTrue(back.has_next)
+
+    def test_token_keeps_params(self):
+        paginator = CursorPaginator(Ticket.objects.all(), 10, params={"status": "new"})
+        cursor = decode_cursor(paginator.page().next_token)
+        self.assertEqual(cursor.params, {"status": "new"})
+
+    def test_tampered_token_is_ignored(self):
+        self.assertIsNone(decode_cursor("garbage"))
+
+
+@override_settings(TICKETS_LIST_PAGINATION="cursor")
+class TicketListCursorModeTests(TestCase):
+    def setUp(self):
+        for i in range(12):
+            Ticket.objects.create(
+                title=f"Принтер {i}",
+                description="Описание",
+                status=Ticket.Status.NEW,
+            )
+        Ticket.objects.create(
+            title="Закрытая", description="Описание", status=Ticket.Status.DONE
+        )
+
+    def test_page_needs_no_count_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("ticket_list"))
+        self.assertFalse([q for q in queries if "COUNT(" in q["sql"]])
+        self.assertEqual(len(response.context["tickets"]), 10)
+        self.assertIsNone(response.context["page_obj"])
+        self.assertContains(response, "?cursor=")
+        self.assertNotContains(response, "?page=")
+
+    def test_next_link_keeps_filters(self):
+        response = self.client.get(reverse("ticket_list"), {"status": "new"})
+        token = response.context["cursor_page"].next_token
+
+        response = self.client.get(reverse("ticket_list"), {"cursor": token})
+
+        self.assertEqual(len(response.context["tickets"]), 2)
+        self.assertEqual(response.context["status_filter"], "new")
+        self.assertNotContains(response, "Закрытая")
+        self.assertContains(response, "Назад")
+        self.assertNotContains(response, "Вперед")
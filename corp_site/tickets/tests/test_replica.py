@@ -0,0 +1,64 @@
+import time
+
+from django.contrib.auth.models import User
+from django.db import router
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tickets.models import Ticket
+from tickets.routers import STICKY_COOKIE
+
+
+@override_settings(TICKETS_DB_REPLICA="replica")
+class ReplicaRoutingTests(TestCase):
+    # «Реплика» в тестах — отдельная база: заявка, которая есть только на ней,
+    # показывает, откуда читала страница.
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.user = User.objects.create_user("employee", password="test-pass-123")
+        self.client.force_login(self.user)
+        self.ticket = Ticket.objects.using("replica").create(
+            title="С реплики", description="Только на реплике"
+        )
+
+    def test_read_views_use_replica(self):
+        self.assertContains(self.client.get(reverse("ticket_list")), "С реплики")
+        self.assertContains(
+            self.client.get(reverse("ticket_detail", args=[self.ticket.pk])), "Только на реплике"
+        )
+        response = self.client.get(reverse("ticket_stats"))
+        self.assertEqual(response.context["stats"].total, 1)
+        response = self.client.get(reverse("ticket_export"))
+        self.assertIn("С реплики", b"".join(response.streaming_content).decode())
+
+    def test_reads_stick_to_primary_after_write(self):
+        response = self.client.post(
+            reverse("ticket_create"),
+            {"title": "С основной", "description": "Новая", "status": "new", "priority": 2},
+        )
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertTrue(Ticket.objects.using("default").filter(title="С основной").exists())
+        self.assertFalse(Ticket.objects.using("replica").filter(title="С основной").exists())
+
+        response = self.client.get(reverse("ticket_list"))
+        self.assertContains(response, "С основной")
+        self.assertNotContains(response, "С реплики")
+
+        self.client.cookies[STICKY_COOKIE] = str(time.time() - 1)
+        response = self.client.get(reverse("ticket_list"))
+        self.assertContains(response, "С реплики")
+
+    def test_other_reads_and_writes_use_primary(self):
+        self.assertFalse(Ticket.objects.exists())
+        ticket = Ticket.objects.using("replica").get()
+        self.assertEqual(router.db_for_write(Ticket, instance=ticket), "default")
+
+
+class WithoutReplicaTests(TestCase):
+    def test_no_sticky_cookie(self):
+        response = self.client.post(
+            reverse("ticket_create"),
+            {"title": "Принтер", "description": "Не печатает", "status": "new", "priority": 2},
+        )
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
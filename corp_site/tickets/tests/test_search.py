@@ -0,0 +1,95 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from tickets.models import Ticket
+from tickets.search import (
+    IContainsSearchBackend,
+    PostgresSearchBackend,
+    SQLiteFTSSearchBackend,
+    get_search_backend,
+)
+
+
+class SearchBackendSelectionTests(TestCase):
+    @override_settings(TICKETS_SEARCH_BACKEND="icontains")
+    def test_explicit_backend(self):
+        self.assertIsInstance(get_search_backend(), IContainsSearchBackend)
+
+    @override_settings(TICKETS_SEARCH_BACKEND="tickets.search.IContainsSearchBackend")
+    def test_dotted_path(self):
+        self.assertIsInstance(get_search_backend(), IContainsSearchBackend)
+
+    @override_settings(TICKETS_SEARCH_BACKEND="auto")
+    def test_auto_follows_database_vendor(self):
+        expected = {
+            "sqlite": SQLiteFTSSearchBackend,
+            "postgresql": PostgresSearchBackend,
+        }.get(connection.vendor, IContainsSearchBackend)
+        self.assertIsInstance(get_search_backend(), expected)
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        self.printer = Ticket.objects.create(
+            title="Сломан принтер",
+            description="Не печатает ни одна страница",
+        )
+        self.network = Ticket.objects.create(
+            title="Нет сети",
+            description="Второй этаж без интернета",
+        )
+        self.backend = get_search_backend()
+
+    def search(self, query):
+        return list(self.backend.search(Ticket.objects.all(), query))
+
+    @skipUnless(connection.vendor in ("sqlite", "postgresql"), "нужен FTS")
+    def test_case_insensitive_word_match(self):
+        self.assertEqual(self.search("ВТОРОЙ"), [self.network])
+
+    @skipUnless(connection.vendor == "sqlite", "префиксный поиск FTS5")
+    def test_prefix_match(self):
+        self.assertEqual(self.search("принт"), [self.printer])
+
+    @skipUnless(connection.vendor == "postgresql", "русская морфология")
+    def test_stemming(self):
+        self.assertEqual(self.search("принтеры"), [self.printer])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.printer.title = "Сломан сканер"
+        self.printer.save()
+        self.assertEqual(self.search("сканер"), [self.printer])
+        self.assertEqual(self.search("принтер"), [])
+
+        self.printer.delete()
+        self.assertEqual(self.search("сканер"), [])
+
+    def test_queryset_update_is_indexed(self):
+        Ticket.objects.filter(pk=self.network.pk).update(description="Упал роутер")
+        self.assertEqual(self.search("роутер"), [self.network])
+
+    def test_list_view_uses_backend(self):
+        response = self.client.get(reverse("ticket_list"), {"q": "интернета"})
+        self.assertContains(response, self.network.title)
+        self.assertNotContains(response, self.printer.title)
+
+    # Манифест статики появляется только после collectstatic.
+    @override_settings(
+        STORAGES={
+            "staticfiles": {
+                "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+            },
+        }
+    )
+    def test_admin_search_uses_backend(self):
+        admin = User.objects.create_superuser("admin", password="test-pass-123")
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse("admin:tickets_ticket_changelist"), {"q": "интернета"}
+        )
+        self.assertContains(response, self.network.title)
+        self.assertNotContains(response, self.printer.title)
@@ -0,0 +1,153 @@
+import io
+from datetime import UTC, date, datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from tickets import bulk
+from tickets.models import Ticket, TicketDailyStats
+from tickets.stats import load_stats, rebuild_stats
+
+
+def daily():
+    return {
+        row.day: (row.created, row.closed)
+        for row in TicketDailyStats.objects.exclude(created=0, closed=0)
+    }
+
+
+class DailyStatsTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+
+    def assertMatchesRebuild(self):
+        maintained = daily()
+        rebuild_stats()
+        self.assertEqual(maintained, daily())
+
+    def test_create_close_reopen_delete(self):
+        ticket = Ticket.objects.create(title="Принтер", description="Не печатает")
+        self.assertIsNone(ticket.closed_at)
+        self.assertEqual(daily(), {self.today: (1, 0)})
+
+        ticket.status = Ticket.Status.DONE
+        ticket.save()
+        self.assertIsNotNone(ticket.closed_at)
+        self.assertEqual(daily(), {self.today: (1, 1)})
+        self.assertMatchesRebuild()
+
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        ticket.title = "Принтер в переговорной"
+        ticket.save()
+        self.assertEqual(daily(), {self.today: (1, 1)})
+
+        ticket.status = Ticket.Status.IN_PROGRESS
+        ticket.save(update_fields=["status"])
+        ticket.refresh_from_db()
+        self.assertIsNone(ticket.closed_at)
+        self.assertEqual(daily(), {self.today: (1, 0)})
+
+        ticket.delete()
+        self.assertEqual(daily(), {})
+
+    def test_reopen_takes_closing_from_its_day(self):
+        ticket = Ticket.objects.create(
+            title="Сервер", description="Упал", status=Ticket.Status.DONE
+        )
+        # 22:30 UTC — уже следующий день по Москве.
+        closed_at = datetime(2026, 3, 1, 22, 30, tzinfo=UTC)
+        Ticket.objects.filter(pk=ticket.pk).update(closed_at=closed_at)
+        rebuild_stats()
+        self.assertEqual(daily(), {self.today: (1, 0), date(2026, 3, 2): (0, 1)})
+
+        ticket = Ticket.objects.get(pk=ticket.pk)
+        ticket.status = Ticket.Status.NEW
+        ticket.save()
+
+        self.assertEqual(daily(), {self.today: (1, 0)})
+
+    def test_bulk_actions_update_days(self):
+        tickets = [
+            Ticket.objects.create(title=f"Заявка {n}", description="Описание")
+            for n in range(3)
+        ]
+        with mock.patch.object(bulk, "BATCH_SIZE", 2):
+            bulk.update_tickets(Ticket.objects.all(), "status", Ticket.Status.DONE)
+            self.assertEqual(daily(), {self.today: (3, 3)})
+            self.assertMatchesRebuild()
+
+            bulk.update_tickets(
+                Ticket.objects.filter(pk=tickets[0].pk), "status", Ticket.Status.NEW
+            )
+            self.assertEqual(daily(), {self.today: (3, 2)})
+            self.assertMatchesRebuild()
+
+            bulk.delete_tickets(Ticket.objects.all())
+        self.assertEqual(daily(), {})
+
+    def test_rebuild_command_backfills_closing_time(self):
+        ticket = Ticket.objects.create(title="Почта", description="Не приходит")
+        # В обход ORM: ни closed_at, ни сводки не меняются.
+        Ticket.objects.filter(pk=ticket.pk).update(status=Ticket.Status.DONE)
+        self.assertEqual(daily(), {self.today: (1, 0)})
+
+        out = io.StringIO()
+        call_command("rebuild_ticket_stats", stdout=out)
+
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.closed_at, ticket.updated_at)
+        self.assertEqual(daily(), {self.today: (1, 1)})
+        self.assertIn("1 дней", out.getvalue())
+
+
+class StatsViewTests(TestCase):
+    def setUp(self):
+        self.url = reverse("ticket_stats")
+        self.user = User.objects.create_user("employee", password="test-pass-123")
+        self.client.force_login(self.user)
+        yesterday = timezone.localdate() - timedelta(days=1)
+        Ticket.objects.create(
+            title="Принтер", description="Не печатает", due_date=yesterday
+        )
+        Ticket.objects.create(
+            title="Сервер",
+            description="Упал",
+            priority=Ticket.Priority.HIGH,
+            due_date=yesterday,
+            status=Ticket.Status.DONE,
+        )
+        Ticket.objects.create(
+            title="Почта", description="Не приходит", due_date=timezone.localdate()
+        )
+
+    def test_summary(self):
+        stats = load_stats(period=7)
+
+        self.assertEqual(stats.overdue, 1)
+        self.assertEqual(stats.total, 3)
+        self.assertEqual(stats.count(status=Ticket.Status.NEW), 2)
+        self.assertEqual(stats.priority_totals, [0, 2, 1])
+        self.assertEqual(len(stats.days), 7)
+        self.assertEqual(stats.days[-1].day, timezone.localdate())
+        self.assertEqual((stats.created, stats.closed), (3, 1))
+
+    def test_page(self):
+        response = self.client.get(self.url, {"days": "7"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<div class="fs-3 text-danger" data-overdue>1</div>')
+        self.assertEqual(response.context["period"], 7)
+        self.assertEqual(len(response.context["stats"].days), 7)
+
+    def test_unknown_period_falls_back_to_default(self):
+        response = self.client.get(self.url, {"days": "100000"})
+        self.assertEqual(response.context["period"], 30)
+
+    def test_anonymous_redirected_to_login(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, f"{reverse('login')}?next={self.url}")
@@ -0,0 +1,213 @@
+import io
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from tickets.models import Comment, Ticket, Tombstone
+
+
+@override_settings(TICKETS_SYNC_SETTLE_SECONDS=0)
+class TicketChangesTests(TestCase):
+    def setUp(self):
+        self.url = reverse("api_ticket_changes")
+        self.printer = Ticket.objects.create(title="Принтер", description="Не печатает")
+        self.server = Ticket.objects.create(title="Сервер", description="Упал")
+        self.comment = Comment.objects.create(
+            ticket=self.printer, author_name="Иван", message="Смотрю"
+        )
+
+    def get(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def sync(self, since=None, **params):
+        """Все страницы ленты: (заявки, комментарии, удаления, курсор)."""
+        tickets, comments, deleted = [], [], {"tickets": [], "comments": []}
+        data = self.get(**params, **({"since": since} if since else {}))
+        while True:
+            tickets += [row["id"] for row in data["tickets"]]
+            comments += [row["id"] for row in data["comments"]]
+            for kind in deleted:
+                deleted[kind] += data["deleted"][kind]
+            if not data["has_more"]:
+                self.assertIsNone(data["next"])
+                return tickets, comments, deleted, data["cursor"]
+            data = self.client.get(data["next"]).json()
+
+    def test_initial_sync_returns_everything(self):
+        data = self.get()
+
+        self.assertEqual(
+            [row["id"] for row in data["tickets"]], [self.printer.pk, self.server.pk]
+        )
+        self.assertEqual(data["tickets"][0]["title"], "Принтер")
+        self.assertEqual(
+            data["comments"],
+            [
+                {
+                    "id": self.comment.pk,
+                    "ticket": self.printer.pk,
+                    "author_name": "Иван",
+                    "message": "Смотрю",
+                    "created_at": data["comments"][0]["created_at"],
+                }
+            ],
+        )
+        self.assertEqual(data["deleted"], {"tickets": [], "comments": []})
+        self.assertFalse(data["has_more"])
+
+    def test_deletions_before_first_sync_are_skipped(self):
+        self.server.delete()
+
+        _, _, deleted, _ = self.sync()
+
+        self.assertEqual(deleted, {"tickets": [], "comments": []})
+
+    def test_incremental_changes(self):
+        *_, cursor = self.sync()
+        self.assertEqual(self.sync(cursor)[:3], ([], [], {"tickets": [], "comments": []}))
+
+        self.server.status = Ticket.Status.DONE
+        self.server.save()
+        reply = Comment.objects.create(ticket=self.server, author_name="Анна", message="Ок")
+        comment_pk = self.comment.pk
+        self.comment.delete()
+
+        tickets, comments, deleted, cursor = self.sync(cursor)
+
+        self.assertEqual(tickets, [self.server.pk])
+        self.assertEqual(comments, [reply.pk])
+        self.assertEqual(deleted, {"tickets": [], "comments": [comment_pk]})
+        self.assertEqual(self.sync(cursor)[:2], ([], []))
+
+    def test_imported_rows_reach_synced_clients(self):
+        *_, cursor = self.sync()
+        Ticket.objects.filter(pk=self.printer.pk).update(external_id="OLD-1")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        tickets_path = Path(tmp.name) / "tickets.ndjson"
+        tickets_path.write_text(
+            json.dumps(
+                {
+                    "external_id": "HD-1",
+                    "title": "Сканер",
+                    "description": "Старая заявка",
+                    "created_at": "2019-05-01T09:00:00+00:00",
+                    "updated_at": "2019-05-02T10:00:00+00:00",
+                    "comments": [{"author_name": "Иван", "message": "Давно"}],
+                }
+            ),
+            encoding="utf-8",
+        )
+        comments_path = Path(tmp.name) / "comments.csv"
+        comments_path.write_text(
+            "ticket_external_id,author_name,message,created_at\n"
+            "OLD-1,Анна,Из архива,2019-05-01 10:00:00\n",
+            encoding="utf-8",
+        )
+
+        call_command(
+            "import_tickets",
+            str(tickets_path),
+            "--comments",
+            str(comments_path),
+            stdout=io.StringIO(),
+            stderr=io.StringIO(),
+        )
+
+        tickets, comments, *_ = self.sync(cursor)
+        # Даты в прошлом, но курсор, выданный до импорта, их отдаёт.
+        self.assertEqual(tickets, [Ticket.objects.get(external_id="HD-1").pk])
+        self.assertCountEqual(
+            comments, Comment.objects.exclude(pk=self.comment.pk).values_list("pk", flat=True)
+        )
+        self.assertEqual(len(comments), 2)
+
+    def test_deleted_ticket_does_not_list_its_comments(self):
+        *_, cursor = self.sync()
+        ticket_pk = self.printer.pk
+
+        self.printer.delete()
+
+        _, _, deleted, _ = self.sync(cursor)
+        self.assertEqual(deleted, {"tickets": [ticket_pk], "comments": []})
+
+    def test_delete_view_records_tombstone(self):
+        # Заодно проверяет бюджет запросов удаления заявки с комментариями.
+        self.client.force_login(User.objects.create_user("employee"))
+        *_, cursor = self.sync()
+
+        self.client.post(reverse("ticket_delete", args=[self.printer.pk]))
+
+        _, _, deleted, _ = self.sync(cursor)
+        self.assertEqual(deleted["tickets"], [self.printer.pk])
+
+    def test_pages_do_not_skip_equal_timestamps(self):
+        moment = timezone.now() - timedelta(minutes=1)
+        extra = Ticket.objects.bulk_create(
+            Ticket(title=f"Заявка {i}", description="Описание") for i in range(5)
+        )
+        Ticket.objects.update(updated_at=moment)
+
+        tickets, *_ = self.sync(limit=2)
+
+        self.assertEqual(
+            tickets, [self.printer.pk, self.server.pk, *(ticket.pk for ticket in extra)]
+        )
+
+    def test_sparse_fields(self):
+        data = self.get(fields="id,status")
+        self.assertEqual(
+            data["tickets"][0], {"id": self.printer.pk, "status": Ticket.Status.NEW}
+        )
+        next_data = self.client.get(f"{self.url}?since={data['cursor']}&fields=id").json()
+        self.assertEqual(next_data["tickets"], [])
+
+    @override_settings(TICKETS_SYNC_SETTLE_SECONDS=60)
+    def test_recent_changes_wait_until_settled(self):
+        data = self.get()
+        self.assertEqual(data["tickets"], [])
+        self.assertEqual(data["comments"], [])
+
+    def test_cursor_of_another_endpoint_is_rejected(self):
+        token = self.client.get(reverse("api_ticket_list"), {"limit": 1}).json()["next"]
+        token = token.split("cursor=", 1)[1]
+
+        response = self.client.get(self.url, {"since": token})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"since": "x"}).status_code, 400)
+
+    def test_cursor_older_than_tombstones_expires(self):
+        cursor = self.get()["cursor"]
+
+        with self.settings(TICKETS_SYNC_TOMBSTONE_DAYS=0):
+            response = self.client.get(self.url, {"since": cursor})
+
+        self.assertEqual(response.status_code, 410)
+        self.assertIn("без since", response.json()["error"])
+
+    def test_prune_tombstones(self):
+        comment_pk = self.comment.pk
+        self.server.delete()
+        self.comment.delete()
+        Tombstone.objects.filter(kind=Tombstone.Kind.TICKET).update(
+            deleted_at=timezone.now() - timedelta(days=365)
+        )
+        out = io.StringIO()
+
+        call_command("prune_tombstones", stdout=out)
+
+        self.assertIn("Удалено записей: 1.", out.getvalue())
+        self.assertEqual(
+            list(Tombstone.objects.values_list("kind", "object_id")),
+            [(Tombstone.Kind.COMMENT, comment_pk)],
+        )
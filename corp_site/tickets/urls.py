@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.urls import path
 
+from . import async_views
 from .views import (
     TicketCreateView,
     TicketDeleteView,
@@ -7,13 +9,42 @@ from .views import (
     TicketListView,
     TicketUpdateView,
     add_comment,
+    ticket_bulk,
+    ticket_comments,
+    ticket_events,
+    ticket_export,
+    ticket_list_events,
+    ticket_stats,
 )
 
-urlpatterns = [
-    path('', TicketListView.as_view(), name='ticket_list'),
-    path('create/', TicketCreateView.as_view(), name='ticket_create'),
-    path('<int:pk>/', TicketDetailView.as_view(), name='ticket_detail'),
-    path('<int:pk>/edit/', TicketUpdateView.as_view(), name='ticket_update'),
-    path('<int:pk>/delete/', TicketDeleteView.as_view(), name='ticket_delete'),
-    path('<int:pk>/comment/', add_comment, name='ticket_add_comment'),
-]
+
+def ticket_patterns(use_async=False):
+    """Маршруты заявок; ``use_async`` — async-варианты списка, страницы
+    заявки и комментариев (TICKETS_ASYNC_VIEWS)."""
+    if use_async:
+        list_view = async_views.AsyncTicketListView.as_view()
+        detail_view = async_views.AsyncTicketDetailView.as_view()
+        comment_view = async_views.add_comment
+        comments_view = async_views.ticket_comments
+    else:
+        list_view = TicketListView.as_view()
+        detail_view = TicketDetailView.as_view()
+        comment_view = add_comment
+        comments_view = ticket_comments
+    return [
+        path('', list_view, name='ticket_list'),
+        path('create/', TicketCreateView.as_view(), name='ticket_create'),
+        path('bulk/', ticket_bulk, name='ticket_bulk'),
+        path('export/', ticket_export, name='ticket_export'),
+        path('stats/', ticket_stats, name='ticket_stats'),
+        path('events/', ticket_list_events, name='ticket_list_events'),
+        path('<int:pk>/', detail_view, name='ticket_detail'),
+        path('<int:pk>/edit/', TicketUpdateView.as_view(), name='ticket_update'),
+        path('<int:pk>/delete/', TicketDeleteView.as_view(), name='ticket_delete'),
+        path('<int:pk>/comment/', comment_view, name='ticket_add_comment'),
+        path('<int:pk>/comments/', comments_view, name='ticket_comments'),
+        path('<int:pk>/events/', ticket_events, name='ticket_events'),
+    ]
+
+
+urlpatterns = ticket_patterns(settings.TICKETS_ASYNC_VIEWS)
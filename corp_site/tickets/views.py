@@ -1,80 +1,295 @@
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
-from django.db.models import Q
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    QueryDict,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject, cached_property
+from django.utils.http import urlencode
+from django.views.decorators.http import require_GET, require_POST
 from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView
 
-from .forms import CommentForm, TicketForm
-from .models import Ticket
+from .bulk import delete_tickets, update_tickets
+from .cache import current_versions, ticket_version
+from .conditional import ConditionalGetMixin
+from .counts import bucket_rows, count_tickets
+from .events import LIST_CHANNEL, EventStream, ticket_channel
+from .export import FORMATS, async_chunks, stream_export
+from .filters import TicketFilters
+from .forms import BulkActionForm, CommentForm, TicketForm
+from .metrics import collect, render_prometheus
+from .history import recorded_as
+from .jobs import enqueue_on_commit
+from .models import Comment, Ticket, TicketChange
+from .pagination import CountedPaginator, CursorPaginator, decode_cursor
+from .routers import ReplicaReadMixin, read_database, reads_from_replica
+from .stats import DEFAULT_PERIOD, PERIODS, load_stats
 
 
-class TicketListView(ListView):
+class TicketListView(ReplicaReadMixin, ConditionalGetMixin, ListView):
     model = Ticket
     context_object_name = "tickets"
     template_name = "tickets/ticket_list.html"
     paginate_by = 10
+    # "offset" — обычный Paginator с номерами страниц, "cursor" — ссылки
+    # «назад/вперёд» без COUNT(*) и OFFSET. None — взять из настроек.
+    pagination_mode = None
+
+    def get_pagination_mode(self):
+        return self.pagination_mode or settings.TICKETS_LIST_PAGINATION
+
+    @cached_property
+    def cursor(self):
+        if self.get_pagination_mode() != "cursor":
+            return None
+        return decode_cursor(self.request.GET.get("cursor"))
+
+    @cached_property
+    def filters(self):
+        # Курсор хранит фильтры сам, поэтому ссылки пагинации их не повторяют.
+        params = self.cursor.params if self.cursor else self.request.GET
+        return TicketFilters.from_params(params)
+
+    @cached_property
+    def buckets(self):
+        return bucket_rows(self.filters)
+
+    def get_data_version(self):
+        # Версии корзин под фильтр меняются при любой правке их заявок.
+        version = ";".join(
+            f"{status}/{priority}:{count}:{version}"
+            for status, priority, count, version, _ in self.buckets
+        )
+        changed = [row[4] for row in self.buckets if row[4] is not None]
+        return version, max(changed, default=None)
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        q = self.request.GET.get("q", "").strip()
-        status = self.request.GET.get("status", "")
-        priority = self.request.GET.get("priority", "")
-        if q:
-            queryset = queryset.filter(
-                Q(title__icontains=q) | Q(description__icontains=q)
-            )
-        if status in Ticket.Status.values:
-            queryset = queryset.filter(status=status)
-        if priority.isdigit() and int(priority) in Ticket.Priority.values:
-            queryset = queryset.filter(priority=int(priority))
-        return queryset
+        ranked = self.get_pagination_mode() != "cursor"
+        return self.filters.apply(super().get_queryset(), ranked=ranked)
+
+    @cached_property
+    def result_count(self):
+        return count_tickets(self.object_list, self.filters, rows=self.buckets)
+
+    def get_paginator(
+        self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs
+    ):
+        return CountedPaginator(
+            queryset,
+            per_page,
+            count=self.result_count.value,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            **kwargs,
+        )
+
+    def get_paginate_by(self, queryset):
+        if self.get_pagination_mode() == "cursor":
+            return None
+        return super().get_paginate_by(queryset)
+
+    # Страница — в cached_property, чтобы асинхронный вариант представления
+    # мог заранее прочитать её через async ORM.
+    def get_offset_page(self):
+        """(paginator, page, object_list, is_paginated) в режиме offset."""
+        return super().paginate_queryset(self.object_list, self.paginate_by)
+
+    @cached_property
+    def offset_page(self):
+        return self.get_offset_page()
+
+    def paginate_queryset(self, queryset, page_size):
+        return self.offset_page
+
+    def get_cursor_paginator(self):
+        return CursorPaginator(
+            self.object_list,
+            self.paginate_by,
+            key=self.filters.sort_key,
+            params=self.filters.as_params(),
+        )
+
+    @cached_property
+    def cursor_page(self):
+        if self.get_pagination_mode() != "cursor":
+            return None
+        return self.get_cursor_paginator().page(self.cursor)
 
     def get_context_data(self, **kwargs):
+        cursor_page = self.cursor_page
+        if cursor_page is not None:
+            kwargs["object_list"] = cursor_page.object_list
         context = super().get_context_data(**kwargs)
-        context["search_query"] = self.request.GET.get("q", "").strip()
-        context["status_filter"] = self.request.GET.get("status", "")
-        context["priority_filter"] = self.request.GET.get("priority", "")
+        context["cursor_page"] = cursor_page
+        context["rows_cache_key"] = self.get_rows_cache_key(context)
+        context["result_count"] = self.result_count if cursor_page is None else None
+        context["search_query"] = self.filters.q
+        context["status_filter"] = self.filters.status
+        context["priority_filter"] = str(self.filters.priority or "")
+        context["sort"] = self.filters.sort
+        context["sort_choices"] = TicketFilters.SORT_CHOICES
         context["status_choices"] = Ticket.Status.choices
         context["priority_choices"] = Ticket.Priority.choices
         # Строка запроса без page — чтобы пагинация не сбрасывала фильтры.
         params = self.request.GET.copy()
         params.pop("page", None)
         context["querystring"] = params.urlencode()
+        context["filters_querystring"] = urlencode(self.filters.as_params())
+        if self.request.user.is_authenticated:
+            context["bulk_form"] = BulkActionForm(
+                initial={"filters": context["filters_querystring"]}
+            )
         return context
 
+    def get_rows_cache_key(self, context):
+        """Ключ кэша таблицы: набор фильтров, страница и есть ли флажки
+        массовых действий (только для вошедших)."""
+        if context["cursor_page"] is not None:
+            page = self.request.GET.get("cursor", "")
+        elif context["page_obj"] is not None:
+            page = context["page_obj"].number
+        else:
+            page = ""
+        filters = urlencode(sorted(self.filters.as_params().items()))
+        bulk = int(self.request.user.is_authenticated)
+        key = f"{self.get_pagination_mode()}:{self.paginate_by}:{filters}:{page}:{bulk}"
+        if read_database():
+            # Отстающая реплика отрендерила бы старые строки под уже новой
+            # версией кэша. Версии корзин прочитаны с той же реплики и
+            # меняются вместе со строками.
+            key = f"{key}:{self.get_data_version()[0]}"
+        return key
+
+
+# Только то, что выводит шаблон комментария.
+COMMENT_FIELDS = ("id", "ticket", "author_name", "message", "created_at")
+
 
-class TicketDetailView(DetailView):
+def _comments_paginator(ticket_pk):
+    return CursorPaginator(
+        Comment.objects.filter(ticket_id=ticket_pk).only(*COMMENT_FIELDS),
+        settings.TICKETS_COMMENTS_PAGE_SIZE,
+        params={"ticket": ticket_pk},
+    )
+
+
+def _comments_page_context(ticket_pk, page):
+    # Страница идёт от новых к старым, а выводим по хронологии.
+    page.object_list.reverse()
+    earlier_url = None
+    if page.has_next:
+        earlier_url = "{}?{}".format(
+            reverse("ticket_comments", args=[ticket_pk]),
+            urlencode({"before": page.next_token}),
+        )
+    return {
+        "comments": page,
+        "comments_earlier_url": earlier_url,
+        "comments_version": ticket_version(ticket_pk),
+    }
+
+
+def comments_context(ticket_pk, cursor=None):
+    """Последние комментарии заявки (или более ранние, чем курсор).
+
+    На странице видны только TICKETS_COMMENTS_PAGE_SIZE последних, остальные
+    подгружаются кнопкой «Показать более ранние» через ticket_comments.
+    """
+    page = _comments_paginator(ticket_pk).page(cursor)
+    return _comments_page_context(ticket_pk, page)
+
+
+async def acomments_context(ticket_pk, cursor=None):
+    page = await _comments_paginator(ticket_pk).apage(cursor)
+    return _comments_page_context(ticket_pk, page)
+
+
+def lazy_comments_context(ticket_pk):
+    """То же, что comments_context, но комментарии читаются при первом
+    обращении — если блок комментариев нашёлся в кэше, запроса не будет."""
+    context = SimpleLazyObject(lambda: comments_context(ticket_pk))
+    return {
+        "comments": SimpleLazyObject(lambda: context["comments"]),
+        "comments_earlier_url": SimpleLazyObject(
+            lambda: context["comments_earlier_url"]
+        ),
+        "comments_version": ticket_version(ticket_pk),
+    }
+
+
+class TicketDetailView(ReplicaReadMixin, ConditionalGetMixin, DetailView):
     model = Ticket
     context_object_name = "ticket"
     template_name = "tickets/ticket_detail.html"
 
+    def get_object(self, queryset=None):
+        # Заявка нужна и для ETag, и для страницы — читаем её один раз.
+        if not hasattr(self, "_object"):
+            self._object = super().get_object(queryset)
+        return self._object
+
+    def get_data_version(self):
+        ticket = self.get_object()
+        # Версия фрагментов заявки растёт и при правке текста комментария,
+        # которая не трогает ни заявку, ни её счётчики.
+        (fragments,) = current_versions(ticket_version(ticket.pk))
+        version = (
+            f"{ticket.pk}:{ticket.updated_at.isoformat()}:"
+            f"{ticket.last_activity_at.isoformat()}:{ticket.comment_count}:{fragments}"
+        )
+        return version, max(ticket.updated_at, ticket.last_activity_at)
+
+    def get_comments_context(self):
+        return lazy_comments_context(self.object.pk)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["comments"] = self.object.comments.all()
+        context.update(self.get_comments_context())
         context["comment_form"] = CommentForm()
         return context
 
 
-class TicketCreateView(SuccessMessageMixin, CreateView):
+def ticket_comments(request, pk):
+    """HTML-фрагмент с комментариями, более ранними, чем курсор ``before``."""
+    cursor = decode_cursor(request.GET.get("before"))
+    if cursor is None or cursor.params.get("ticket") != pk:
+        raise Http404("Некорректный курсор комментариев.")
+    return render(request, "tickets/_comments.html", comments_context(pk, cursor))
+
+
+class TicketFormMixin:
     model = Ticket
     form_class = TicketForm
     template_name = "tickets/ticket_form.html"
-    success_message = "Заявка создана."
+
+    def form_valid(self, form):
+        # Заявка, счётчики и запись истории — одной транзакцией.
+        with transaction.atomic(), recorded_as(TicketChange.Source.FORM, self.request.user):
+            return super().form_valid(form)
 
     def get_success_url(self):
         return self.object.get_absolute_url()
 
 
-class TicketUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
-    model = Ticket
-    form_class = TicketForm
-    template_name = "tickets/ticket_form.html"
-    success_message = "Заявка обновлена."
+class TicketCreateView(TicketFormMixin, SuccessMessageMixin, CreateView):
+    success_message = "Заявка создана."
 
-    def get_success_url(self):
-        return self.object.get_absolute_url()
+
+class TicketUpdateView(LoginRequiredMixin, TicketFormMixin, SuccessMessageMixin, UpdateView):
+    success_message = "Заявка обновлена."
 
 
 class TicketDeleteView(LoginRequiredMixin, SuccessMessageMixin, DeleteView):
@@ -93,7 +308,9 @@ def add_comment(request, pk):
     if form.is_valid():
         comment = form.save(commit=False)
         comment.ticket = ticket
-        comment.save()
+        # Сигнал увеличивает comment_count через F() в той же транзакции.
+        with transaction.atomic():
+            comment.save()
         messages.success(request, "Комментарий добавлен.")
         return redirect("ticket_detail", pk=ticket.pk)
 
@@ -101,7 +318,134 @@ def add_comment(request, pk):
     # чтобы введённый текст не потерялся.
     context = {
         "ticket": ticket,
-        "comments": ticket.comments.all(),
         "comment_form": form,
+        **comments_context(ticket.pk),
     }
     return render(request, "tickets/ticket_detail.html", context)
+
+
+@login_required
+@require_POST
+def ticket_bulk(request):
+    """Статус, приоритет или удаление для отмеченных либо всех найденных заявок."""
+    form = BulkActionForm(request.POST)
+    if not form.is_valid():
+        errors = [error for field in form.errors.values() for error in field]
+        messages.error(request, " ".join(errors))
+        filters = TicketFilters.from_params(QueryDict(request.POST.get("filters", "")))
+    else:
+        action = form.cleaned_data["action"]
+        filters = form.cleaned_data["filters"]
+        queryset = form.get_queryset()
+        if (
+            form.cleaned_data["select_all"]
+            and count_tickets(queryset, filters).value > settings.TICKETS_BULK_INLINE_LIMIT
+        ):
+            # Пачки по тысячам заявок не держат запрос: их выполнит воркер,
+            # а открытые списки обновятся по событиям каждой пачки. Граница
+            # по id: заявки, созданные после нажатия, под действие не попадут.
+            enqueue_on_commit(
+                "tickets.bulk_action",
+                {
+                    "action": action,
+                    "value": form.cleaned_data.get(action),
+                    "filters": urlencode(filters.as_params()),
+                    "max_id": queryset.order_by("-pk").values_list("pk", flat=True).first(),
+                    "author": request.user.pk,
+                },
+            )
+            messages.info(
+                request, "Заявок много: действие выполняется в фоне, список обновится сам."
+            )
+        elif action == "delete":
+            messages.success(request, f"Удалено заявок: {delete_tickets(queryset)}.")
+        else:
+            count = update_tickets(
+                queryset, action, form.cleaned_data[action], author=request.user
+            )
+            messages.success(request, f"Изменено заявок: {count}.")
+    query = urlencode(filters.as_params())
+    return redirect(f"{reverse('ticket_list')}?{query}" if query else reverse("ticket_list"))
+
+
+@login_required
+@reads_from_replica
+def ticket_stats(request):
+    """Сводка по заявкам: корзины, просроченные и динамика по дням."""
+    period = request.GET.get("days", "")
+    period = int(period) if period.isdigit() and int(period) in PERIODS else DEFAULT_PERIOD
+    context = {
+        "stats": load_stats(period),
+        "period": period,
+        "periods": PERIODS,
+        "priorities": Ticket.Priority.choices,
+    }
+    return render(request, "tickets/ticket_stats.html", context)
+
+
+@login_required
+@reads_from_replica
+def ticket_export(request):
+    """Выгрузка заявок с фильтрами списка: ``?format=csv|ndjson&comments=1``."""
+    fmt = request.GET.get("format", "csv")
+    if fmt not in FORMATS:
+        return HttpResponseBadRequest("Формат выгрузки: csv или ndjson.")
+    filters = TicketFilters.from_params(request.GET)
+    with_comments = request.GET.get("comments") in ("1", "true", "yes")
+    # Строки читаются уже после представления — база задаётся явно.
+    chunks = stream_export(filters, fmt, with_comments, using=read_database())
+    if isinstance(request, ASGIRequest):
+        chunks = async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=FORMATS[fmt])
+    filename = f"tickets-{timezone.localdate():%Y%m%d}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _event_response(request, channel, coalesce=False):
+    if not isinstance(request, ASGIRequest):
+        # Под WSGI бесконечный поток занял бы воркер целиком. На 204
+        # EventSource больше не переподключается, страница работает как раньше.
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(
+        EventStream(channel, coalesce), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # nginx и похожие прокси иначе копят поток в буфере.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@require_GET
+async def ticket_events(request, pk):
+    """SSE заявки: новые комментарии (comment), изменения (ticket), удаление."""
+    if not await Ticket.objects.filter(pk=pk).aexists():
+        raise Http404("Заявка не найдена.")
+    return _event_response(request, ticket_channel(pk))
+
+
+@require_GET
+async def ticket_list_events(request):
+    """SSE списка: id изменённых заявок (changed)."""
+    return _event_response(request, LIST_CHANNEL, coalesce=True)
+
+
+def _metrics_response():
+    return HttpResponse(
+        render_prometheus(collect()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@staff_member_required
+def _staff_metrics(request):
+    return _metrics_response()
+
+
+def metrics(request):
+    """Гистограммы запросов в формате Prometheus: для staff или по токену."""
+    token = settings.TICKETS_METRICS_TOKEN
+    header = request.headers.get("Authorization", "")
+    if token and constant_time_compare(header, f"Bearer {token}"):
+        return _metrics_response()
+    return _staff_metrics(request)